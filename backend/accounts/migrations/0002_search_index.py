@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-17 13:30
+
+from django.db import migrations
+
+from accounts.search import USER_INDEX
+
+
+def install(apps, schema_editor):
+    USER_INDEX.install(schema_editor)
+
+
+def remove(apps, schema_editor):
+    USER_INDEX.remove(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, remove),
+    ]
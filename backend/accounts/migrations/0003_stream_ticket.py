@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-17 18:30
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StreamTicket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key_hash', models.CharField(max_length=64, unique=True)),
+                ('expires_at', models.DateTimeField()),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stream_tickets', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'stream_tickets',
+                'indexes': [models.Index(fields=['expires_at'], name='stream_tickets_expires_idx')],
+            },
+        ),
+    ]
@@ -35,3 +35,23 @@ class User(AbstractUser):
     
     def get_full_name(self):
         return f"{self.first_name} {self.last_name}".strip() or self.username
+
+
+class StreamTicket(models.Model):
+    """
+    Short-lived, single-use credential for connections that cannot send an
+    ``Authorization`` header (EventSource, WebSocket), so the access token
+    never appears in a URL. Only a hash of the ticket is stored.
+    """
+    key_hash = models.CharField(max_length=64, unique=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='stream_tickets')
+    expires_at = models.DateTimeField()
+    
+    class Meta:
+        db_table = 'stream_tickets'
+        indexes = [
+            models.Index(fields=['expires_at'], name='stream_tickets_expires_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Stream ticket for {self.user_id} until {self.expires_at}"
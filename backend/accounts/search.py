@@ -0,0 +1,12 @@
+"""
+Full-text index over user names and e-mail addresses.
+"""
+from taskflow.search import FullTextIndex
+
+# Names are not English words: no stemming
+USER_INDEX = FullTextIndex(
+    'users',
+    [('first_name', 'A'), ('last_name', 'A'), ('username', 'B'), ('email', 'C')],
+    config='simple',
+    fuzzy_expression="first_name || ' ' || last_name",
+)
@@ -0,0 +1,54 @@
+"""
+Check the task counters on every project against the tasks table and fix
+any that have drifted (e.g. after raw SQL or queryset updates that bypass
+``Task.save``).
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from projects.models import Project
+from tasks.counters import COUNTER_FIELDS, counted_values
+
+
+class Command(BaseCommand):
+    help = 'Verify the per-status task counters on projects and repair any that are wrong'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=200, help='Projects per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Report wrong counters without fixing them')
+
+    def handle(self, *args, chunk_size, dry_run, **options):
+        checked = repaired = 0
+        last_id = 0
+        while True:
+            with transaction.atomic():
+                # Lock the projects before counting: task writes queue behind the
+                # lock, so their counter moves land on top of the repaired values
+                projects = list(
+                    Project.objects.select_for_update().filter(id__gt=last_id).order_by('id')[:chunk_size]
+                )
+                if not projects:
+                    break
+                expected = counted_values(Project.objects.filter(id__in=[project.id for project in projects]))
+                wrong = []
+                for project in projects:
+                    drift = {
+                        field: value for field, value in expected[project.id].items()
+                        if getattr(project, field) != value
+                    }
+                    if not drift:
+                        continue
+                    self.stdout.write(f'Project {project.id}: ' + ', '.join(
+                        f'{field} {getattr(project, field)} -> {value}' for field, value in drift.items()
+                    ))
+                    for field, value in drift.items():
+                        setattr(project, field, value)
+                    wrong.append(project)
+                if not dry_run:
+                    Project.objects.bulk_update(wrong, COUNTER_FIELDS)
+            checked += len(projects)
+            repaired += len(wrong)
+            last_id = projects[-1].id
+
+        action = 'wrong' if dry_run else 'repaired'
+        self.stdout.write(self.style.SUCCESS(f'Checked {checked} projects, {repaired} {action}'))
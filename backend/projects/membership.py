@@ -0,0 +1,48 @@
+"""
+Maintenance of the EffectiveMembership table.
+"""
+from tasks.models import TaskVisibility
+from .models import EffectiveMembership, ProjectMember
+
+
+def refresh_effective_membership(pairs):
+    """
+    Bring the EffectiveMembership rows of the given ``(project_id, user_id)``
+    pairs in line with active ProjectMembers and TaskVisibility, in a
+    constant number of queries regardless of how many pairs are passed.
+    """
+    pairs = {(project_id, user_id) for project_id, user_id in pairs if project_id and user_id}
+    if not pairs:
+        return
+    project_ids = {project_id for project_id, _user_id in pairs}
+    user_ids = {user_id for _project_id, user_id in pairs}
+
+    members = pairs & set(
+        ProjectMember.objects.filter(project_id__in=project_ids, user_id__in=user_ids, is_active=True)
+        .values_list('project_id', 'user_id')
+    )
+    assignees = pairs & set(
+        TaskVisibility.objects.filter(project_id__in=project_ids, user_id__in=user_ids)
+        .values_list('project_id', 'user_id').distinct()
+    )
+    existing = {
+        (row.project_id, row.user_id): row
+        for row in EffectiveMembership.objects.filter(project_id__in=project_ids, user_id__in=user_ids)
+        if (row.project_id, row.user_id) in pairs
+    }
+
+    stale = [row.id for key, row in existing.items() if key not in members | assignees]
+    if stale:
+        EffectiveMembership.objects.filter(id__in=stale).delete()
+    changed = []
+    for key, row in existing.items():
+        flags = (key in members, key in assignees)
+        if any(flags) and flags != (row.is_member, row.is_assignee):
+            row.is_member, row.is_assignee = flags
+            changed.append(row)
+    EffectiveMembership.objects.bulk_update(changed, ['is_member', 'is_assignee'])
+    EffectiveMembership.objects.bulk_create([
+        EffectiveMembership(project_id=project_id, user_id=user_id, is_member=(project_id, user_id) in members,
+                            is_assignee=(project_id, user_id) in assignees)
+        for project_id, user_id in (members | assignees) - set(existing)
+    ])
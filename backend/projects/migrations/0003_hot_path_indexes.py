@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-17 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0002_projectmessage_projectmember'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='projectmessage',
+            index=models.Index(fields=['project', 'created_at'], name='project_msg_created_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.7 on 2026-10-17 13:30
+
+from django.db import migrations
+
+from projects.search import MESSAGE_INDEX, PROJECT_INDEX
+
+
+def install(apps, schema_editor):
+    PROJECT_INDEX.install(schema_editor)
+    MESSAGE_INDEX.install(schema_editor)
+
+
+def remove(apps, schema_editor):
+    MESSAGE_INDEX.remove(schema_editor)
+    PROJECT_INDEX.remove(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0003_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, remove),
+    ]
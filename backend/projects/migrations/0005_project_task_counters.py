@@ -0,0 +1,71 @@
+# Generated by Django 4.2.7 on 2026-10-17 15:10
+
+from django.db import migrations, models
+from django.db.models import Count
+
+from projects.search import PROJECT_INDEX
+
+STATUS_COUNTERS = {
+    'todo': 'tasks_todo',
+    'in_progress': 'tasks_in_progress',
+    'review': 'tasks_review',
+    'done': 'tasks_done',
+}
+
+
+def reinstall_search_index(apps, schema_editor):
+    # Adding columns with defaults rebuilds the table on SQLite, which drops the FTS triggers
+    PROJECT_INDEX.install(schema_editor)
+
+
+def fill_counters(apps, schema_editor):
+    Project = apps.get_model('projects', 'Project')
+    Task = apps.get_model('tasks', 'Task')
+    counts = {}
+    rows = Task.objects.values('project_id', 'status').annotate(count=Count('id')).order_by()
+    for row in rows:
+        project = counts.setdefault(row['project_id'], {'tasks_total': 0})
+        project['tasks_total'] += row['count']
+        if row['status'] in STATUS_COUNTERS:
+            field = STATUS_COUNTERS[row['status']]
+            project[field] = project.get(field, 0) + row['count']
+    for project_id, values in counts.items():
+        Project.objects.filter(id=project_id).update(**values)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0004_search_index'),
+        ('tasks', '0012_task_status_snapshots'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='tasks_done',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='tasks_in_progress',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='tasks_review',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='tasks_todo',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='tasks_total',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(reinstall_search_index, migrations.RunPython.noop),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.7 on 2026-10-17 16:20
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_memberships(apps, schema_editor):
+    EffectiveMembership = apps.get_model('projects', 'EffectiveMembership')
+    ProjectMember = apps.get_model('projects', 'ProjectMember')
+    TaskVisibility = apps.get_model('tasks', 'TaskVisibility')
+    members = set(ProjectMember.objects.filter(is_active=True).values_list('project_id', 'user_id'))
+    assignees = set(TaskVisibility.objects.values_list('project_id', 'user_id').distinct())
+    EffectiveMembership.objects.bulk_create([
+        EffectiveMembership(project_id=project_id, user_id=user_id, is_member=(project_id, user_id) in members,
+                            is_assignee=(project_id, user_id) in assignees)
+        for project_id, user_id in members | assignees
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('projects', '0005_project_task_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EffectiveMembership',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_member', models.BooleanField(default=False)),
+                ('is_assignee', models.BooleanField(default=False)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='effective_members', to='projects.project')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='effective_memberships', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'project_effective_members',
+                'indexes': [models.Index(fields=['user', 'project'], name='effective_member_user_idx')],
+                'unique_together': {('project', 'user')},
+            },
+        ),
+        migrations.RunPython(fill_memberships, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,41 @@
 from django.db import models
+from django.db.models import Count, OuterRef, Prefetch, Subquery, Value
+from django.db.models.functions import Coalesce
 from django.conf import settings
 
 
+class ProjectQuerySet(models.QuerySet):
+    """
+    Custom queryset for Project with reusable query plans
+    """
+    def with_list_data(self, fields=None):
+        """
+        Bring in everything ProjectSerializer renders in a fixed number of
+        queries: the creator via a join, the member count via annotation and
+        the members (with their users) via one prefetch. Task counts are
+        columns on Project already.
+
+        ``fields`` is the set of serializer fields being rendered; joins,
+        annotations and prefetches for fields outside it are skipped.
+        """
+        def wanted(*names):
+            return fields is None or any(name in fields for name in names)
+        
+        queryset = self
+        if wanted('created_by_name'):
+            queryset = queryset.select_related('created_by')
+        if wanted('member_count'):
+            member_counts = EffectiveMembership.objects.filter(project=OuterRef('pk')).order_by().values('project').annotate(
+                total=Count('id')
+            ).values('total')
+            queryset = queryset.annotate(effective_member_total=Coalesce(Subquery(member_counts), Value(0)))
+        if wanted('members'):
+            queryset = queryset.prefetch_related(
+                Prefetch('members', queryset=ProjectMember.objects.select_related('user'))
+            )
+        return queryset
+
+
 class Project(models.Model):
     """
     Project model for organizing tasks
@@ -12,6 +46,17 @@ class Project(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
+    # Task counters, kept in step with task writes by tasks.counters
+    tasks_total = models.IntegerField(default=0)
+    tasks_todo = models.IntegerField(default=0)
+    tasks_in_progress = models.IntegerField(default=0)
+    tasks_review = models.IntegerField(default=0)
+    tasks_done = models.IntegerField(default=0)
+    
+    objects = ProjectQuerySet.as_manager()
+    
+    # Fields the tasks depend on: is_active decides visibility and the name is in every task payload
+    TASK_FIELDS = ('name', 'is_active')
     
     class Meta:
         db_table = 'projects'
@@ -20,6 +65,45 @@ class Project(models.Model):
     def __str__(self):
         return self.name
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_task_fields()
+        return instance
+    
+    def remember_task_fields(self, names=TASK_FIELDS):
+        saved = getattr(self, '_saved_task_fields', {})
+        saved.update({name: self.__dict__[name] for name in self.TASK_FIELDS if name in names and name in self.__dict__})
+        self._saved_task_fields = saved
+    
+    def changed_task_fields(self):
+        """TASK_FIELDS changed since the project was loaded or last saved (all of them when unknown)"""
+        saved = getattr(self, '_saved_task_fields', {})
+        return {name for name in self.TASK_FIELDS if name not in saved or saved[name] != getattr(self, name)}
+    
+    def save(self, *args, **kwargs):
+        """
+        Save without writing the task counters back: tasks.counters moves them
+        with ``F()`` updates that a stale in-memory copy would overwrite. New
+        projects start from the defaults; repair_project_counters writes them
+        with ``bulk_update``. As with Django's own save, deferred fields are
+        left alone rather than loaded.
+        """
+        from tasks.counters import COUNTER_FIELDS
+        
+        if not self._state.adding:
+            update_fields = kwargs.get('update_fields')
+            if update_fields is None:
+                deferred = self.get_deferred_fields()
+                update_fields = [
+                    field.name for field in self._meta.concrete_fields
+                    if not field.primary_key and field.attname not in deferred
+                ]
+            kwargs['update_fields'] = [name for name in update_fields if name not in COUNTER_FIELDS]
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        self.remember_task_fields(self.TASK_FIELDS if update_fields is None else update_fields)
+    
     @property
     def member_count(self):
         """Return the number of members assigned to this project"""
@@ -27,50 +111,49 @@ class Project(models.Model):
     
     @property
     def all_members(self):
-        """Return all members including task assignees"""
+        """Return the ids of all members including task assignees"""
+        if not self.is_active:
+            return self.assembled_members()
+        return set(self.effective_members.values_list('user_id', flat=True))
+    
+    @property
+    def effective_member_count(self):
+        """Return the count of all members including task assignees"""
+        if not self.is_active:
+            return len(self.assembled_members())
+        return self.effective_members.count()
+    
+    def assembled_members(self):
+        """
+        Active members, direct task assignees and active TaskAssignment users,
+        read from the source tables. EffectiveMembership only tracks assignees
+        of active projects, so inactive ones are counted this way.
+        """
         from tasks.models import TaskAssignment
         
-        # Get direct project members
         direct_members = set(self.members.filter(is_active=True).values_list('user_id', flat=True))
-        
-        # Get task assignees (both direct assignees and TaskAssignment records)
         direct_task_assignees = set(self.tasks.filter(assignee__isnull=False).values_list('assignee_id', flat=True))
         task_assignees = set(
-            TaskAssignment.objects.filter(
-                task__project=self,
-                is_active=True
-            ).values_list('user_id', flat=True)
+            TaskAssignment.objects.filter(task__project=self, is_active=True).values_list('user_id', flat=True)
         )
-        
-        # Combine all sets
-        all_member_ids = direct_members.union(direct_task_assignees).union(task_assignees)
-        return all_member_ids
-    
-    @property
-    def effective_member_count(self):
-        """Return the count of all members including task assignees"""
-        return len(self.all_members)
+        return direct_members | direct_task_assignees | task_assignees
     
     @property
     def progress_percentage(self):
         """Calculate project progress based on task completion"""
-        total_tasks = self.tasks.count()
-        if total_tasks == 0:
+        if self.tasks_total <= 0:
             return 0
-        completed_tasks = self.tasks.filter(status='done').count()
-        return round((completed_tasks / total_tasks) * 100, 1)
+        return round((self.tasks_done / self.tasks_total) * 100, 1)
     
     @property
     def task_stats(self):
         """Return task statistics for the project"""
-        tasks = self.tasks.all()
-        total_count = tasks.count()
         return {
-            'total': total_count,
-            'todo': tasks.filter(status='todo').count(),
-            'in_progress': tasks.filter(status='in_progress').count(),
-            'review': tasks.filter(status='review').count(),
-            'done': tasks.filter(status='done').count(),
+            'total': self.tasks_total,
+            'todo': self.tasks_todo,
+            'in_progress': self.tasks_in_progress,
+            'review': self.tasks_review,
+            'done': self.tasks_done,
         }
 
 
@@ -98,6 +181,31 @@ class ProjectMember(models.Model):
         return f"{self.user.get_full_name()} - {self.project.name} ({self.get_role_display()})"
 
 
+class EffectiveMembership(models.Model):
+    """
+    Everyone who belongs to a project: active ProjectMembers and users who
+    can see one of its tasks (TaskVisibility: direct assignees and active
+    TaskAssignments, on active projects). One row per (project, user), kept
+    current by projects.membership.refresh_effective_membership. Inactive
+    projects keep only their members here; Project.all_members reads the
+    source tables for them.
+    """
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='effective_members')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='effective_memberships')
+    is_member = models.BooleanField(default=False)
+    is_assignee = models.BooleanField(default=False)
+    
+    class Meta:
+        db_table = 'project_effective_members'
+        unique_together = ['project', 'user']
+        indexes = [
+            models.Index(fields=['user', 'project'], name='effective_member_user_idx'),
+        ]
+    
+    def __str__(self):
+        return f"User {self.user_id} in project {self.project_id}"
+
+
 class ProjectMessage(models.Model):
     """
     Model for project-specific messaging/chat
@@ -112,6 +220,9 @@ class ProjectMessage(models.Model):
     class Meta:
         db_table = 'project_messages'
         ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['project', 'created_at'], name='project_msg_created_idx'),
+        ]
     
     def __str__(self):
         return f"Message by {self.author.get_full_name()} in {self.project.name}"
\ No newline at end of file
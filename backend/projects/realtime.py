@@ -0,0 +1,63 @@
+"""
+Real-time project chat: message creations and edits pushed over WebSockets.
+
+Clients connect to ``/ws/projects/<id>/chat/?ticket=<ticket>`` with a
+single-use ticket from ``POST /api/stream/ticket/``, so the access token
+never appears in the URL. The ticket and chat access are checked once, at
+connect time; after that the
+socket receives ``{"type": "message.created" | "message.updated",
+"message": {...}}`` events with the same message payload as the REST list.
+"""
+import re
+
+from asgiref.sync import sync_to_async
+
+from taskflow.realtime import get_broker, query_param, redeem_ticket, serve_websocket
+
+CHAT_PATH = re.compile(r'^/ws/projects/(?P<project_id>\d+)/chat/?$')
+# Close codes sent before accepting (browsers report them as a failed handshake)
+CLOSE_UNAUTHORIZED = 4401
+CLOSE_FORBIDDEN = 4403
+
+
+def chat_topic(project_id):
+    return f'project:{project_id}:chat'
+
+
+def publish_message(message_id, event_type):
+    """Push one message to the project's chat subscribers"""
+    from .models import ProjectMessage
+    from .serializers import ProjectMessageSerializer
+
+    message = ProjectMessage.objects.select_related('author').filter(id=message_id).first()
+    if message is None:
+        return
+    get_broker().publish([chat_topic(message.project_id)], {
+        'type': event_type,
+        'message': ProjectMessageSerializer(message).data,
+    })
+
+
+def chat_access(ticket, project_id):
+    """Close code for a connection attempt, or None when the user may follow the chat"""
+    from .views import can_use_project_chat
+
+    user = redeem_ticket(ticket)
+    if user is None:
+        return CLOSE_UNAUTHORIZED
+    if not can_use_project_chat(user, project_id):
+        return CLOSE_FORBIDDEN
+    return None
+
+
+async def chat_websocket(scope, receive, send, project_id):
+    message = await receive()
+    if message['type'] != 'websocket.connect':
+        return
+    denied = await sync_to_async(chat_access)(query_param(scope, 'ticket'), project_id)
+    if denied is not None:
+        await send({'type': 'websocket.close', 'code': denied})
+        return
+    subscription = get_broker().subscribe([chat_topic(project_id)])
+    await send({'type': 'websocket.accept'})
+    await serve_websocket(receive, send, subscription)
@@ -0,0 +1,7 @@
+"""
+Full-text indexes over projects and project chat messages.
+"""
+from taskflow.search import FullTextIndex
+
+PROJECT_INDEX = FullTextIndex('projects', [('name', 'A'), ('description', 'B')], fuzzy_expression='name')
+MESSAGE_INDEX = FullTextIndex('project_messages', [('content', 'A')])
@@ -1,6 +1,11 @@
+import logging
+
 from rest_framework import serializers
+from taskflow.serializers import SparseFieldsetMixin
 from .models import Project, ProjectMember, ProjectMessage
 
+logger = logging.getLogger(__name__)
+
 
 class ProjectMemberSerializer(serializers.ModelSerializer):
     """
@@ -45,7 +50,10 @@ class ProjectMessageSerializer(serializers.ModelSerializer):
         return obj.author.get_full_name()
     
     def get_author_role(self, obj):
-        # Get the author's role in this specific project
+        # Get the author's role in this specific project (list views pass the page's roles in)
+        roles = self.context.get('author_roles')
+        if roles is not None:
+            return roles.get(obj.author_id) or obj.author.get_role_display()
         try:
             member = ProjectMember.objects.get(project=obj.project, user=obj.author)
             return member.get_role_display()
@@ -53,9 +61,9 @@ class ProjectMessageSerializer(serializers.ModelSerializer):
             return obj.author.get_role_display()
 
 
-class ProjectSerializer(serializers.ModelSerializer):
+class ProjectSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
-    Serializer for Project model
+    Serializer for Project model (supports ?fields= / ?omit=)
     """
     created_by_name = serializers.SerializerMethodField()
     task_count = serializers.SerializerMethodField()
@@ -74,19 +82,7 @@ class ProjectSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'created_by', 'created_at', 'updated_at')
     
     def get_task_count(self, obj):
-        # Use annotated task_count if available, otherwise count manually
-        if hasattr(obj, 'task_count') and obj.task_count is not None:
-            task_count = obj.task_count
-            print(f"Project {obj.name} - Using annotated task count: {task_count}")
-        else:
-            task_count = obj.tasks.count()
-            print(f"Project {obj.name} - Using manual task count: {task_count}")
-        
-        # Additional debugging - show actual tasks
-        actual_tasks = list(obj.tasks.values_list('id', 'title', 'status'))
-        print(f"Project {obj.name} - Actual tasks: {actual_tasks}")
-        
-        return task_count
+        return obj.tasks_total
 
     def get_created_by_name(self, obj):
         try:
@@ -95,33 +91,20 @@ class ProjectSerializer(serializers.ModelSerializer):
             return getattr(obj.created_by, 'username', '')
     
     def get_member_count(self, obj):
-        try:
+        # Use annotated member count if available, otherwise count manually; the
+        # annotation leaves out the task assignees of inactive projects
+        if hasattr(obj, 'effective_member_total') and obj.is_active:
+            member_count = obj.effective_member_total
+        else:
             member_count = obj.effective_member_count
-            print(f"Project {obj.name} - Member count: {member_count}")
-            return member_count
-        except Exception as e:
-            print(f"Project {obj.name} - Member count error: {e}")
-            return 0
+        logger.debug('Project %s: %s tasks, %s members', obj.id, obj.tasks_total, member_count)
+        return member_count
     
     def get_progress_percentage(self, obj):
-        try:
-            progress = obj.progress_percentage
-            print(f"Project {obj.name} - Progress: {progress}% (Total tasks: {obj.tasks.count()}, Completed: {obj.tasks.filter(status='done').count()})")
-            return progress
-        except Exception as e:
-            print(f"Project {obj.name} - Progress error: {e}")
-            return 0
+        return obj.progress_percentage
     
     def get_task_stats(self, obj):
-        try:
-            return obj.task_stats
-        except Exception as e:
-            return {
-                'total': 0,
-                'todo': 0,
-                'in_progress': 0,
-                'done': 0,
-            }
+        return obj.task_stats
 
 
 class ProjectDetailSerializer(ProjectSerializer):
@@ -0,0 +1,31 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from accounts.models import User
+from tasks.inbox import notify_message
+from taskflow.signals import deleted_through
+from .membership import refresh_effective_membership
+from .models import Project, ProjectMember, ProjectMessage
+from .realtime import publish_message
+
+
+@receiver(post_save, sender=ProjectMember)
+def project_member_changed(sender, instance, **kwargs):
+    refresh_effective_membership([(instance.project_id, instance.user_id)])
+
+
+@receiver(post_delete, sender=ProjectMember)
+def project_member_deleted(sender, instance, **kwargs):
+    # Deleting the project or the user removes their memberships anyway
+    if deleted_through(kwargs.get('origin'), Project, User):
+        return
+    refresh_effective_membership([(instance.project_id, instance.user_id)])
+
+
+@receiver(post_save, sender=ProjectMessage)
+def project_message_saved(sender, instance, created, using, **kwargs):
+    if created:
+        notify_message(instance)
+    event_type = 'message.created' if created else 'message.updated'
+    transaction.on_commit(lambda: publish_message(instance.id, event_type), using=using)
@@ -8,6 +8,7 @@ urlpatterns = [
     path('<int:pk>/', views.ProjectDetailView.as_view(), name='project_detail'),
     path('<int:project_id>/analytics/', views.project_analytics, name='project_analytics'),
     path('<int:project_id>/member-performance/', views.project_member_performance, name='project_member_performance'),
+    path('<int:project_id>/status-history/', views.project_status_history, name='project_status_history'),
     path('<int:project_id>/members/', views.ProjectMemberListView.as_view(), name='project_members'),
     path('<int:project_id>/members/<int:pk>/', views.ProjectMemberDetailView.as_view(), name='project_member_detail'),
     path('<int:project_id>/messages/', views.ProjectMessageListView.as_view(), name='project_messages'),
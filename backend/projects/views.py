@@ -1,16 +1,39 @@
+import logging
+
 from rest_framework import generics, permissions, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
-from django.db.models import Count, Q
+from django.db.models import Count, Exists, Max, OuterRef, Q
 from django.shortcuts import get_object_or_404
-from .models import Project, ProjectMember, ProjectMessage
+from taskflow.conditional import ConditionalListMixin, conditional_get, latest_timestamp
+from taskflow.pagination import MessageWindowPagination
+from .models import EffectiveMembership, Project, ProjectMember, ProjectMessage
 from .serializers import (
     ProjectSerializer, ProjectDetailSerializer, ProjectCreateUpdateSerializer,
     ProjectMemberSerializer, ProjectMessageSerializer
 )
 
+logger = logging.getLogger(__name__)
+
 
-class ProjectListCreateView(generics.ListCreateAPIView):
+def project_validators(projects):
+    """
+    Conditional GET validators for a set of projects: the projects themselves,
+    their active members, and the tasks behind their stats
+    """
+    from tasks.models import Task
+    from tasks.sync import task_validators
+    
+    summary = projects.order_by().aggregate(total=Count('id', distinct=True), last_updated=Max('updated_at'))
+    members = ProjectMember.objects.filter(project__in=projects.values('id'), is_active=True).aggregate(
+        total=Count('id'), last_joined=Max('joined_at')
+    )
+    task_parts, tasks_modified = task_validators(Task.objects.filter(project__in=projects.values('id')))
+    parts = [summary['total'], summary['last_updated'], members['total'], members['last_joined'], *task_parts]
+    return parts, latest_timestamp(summary['last_updated'], members['last_joined'], tasks_modified)
+
+
+class ProjectListCreateView(ConditionalListMixin, generics.ListCreateAPIView):
     """
     List all projects or create a new project (Scrum Master only)
     """
@@ -20,26 +43,26 @@ class ProjectListCreateView(generics.ListCreateAPIView):
     def get_queryset(self):
         user = self.request.user
         if user.is_scrum_master():
-            projects = Project.objects.filter(is_active=True).annotate(
-                task_count=Count('tasks', distinct=True)
-            ).order_by('-created_at')
-            
-            # Debug logging
-            for project in projects:
-                print(f"Scrum Master View - Project: {project.name}, Annotated task_count: {project.task_count}")
-            
-            return projects
+            logger.debug('Listing all active projects for Scrum Master %s', user.id)
+            return Project.objects.filter(is_active=True).order_by('-created_at').with_list_data(
+                fields=self.get_serializer().fields
+            )
         return Project.objects.none()
     
+    def get_validators(self, queryset):
+        return project_validators(queryset)
+    
     def perform_create(self, serializer):
         if not self.request.user.is_scrum_master():
             raise permissions.PermissionDenied("Only Scrum Masters can create projects")
         serializer.save(created_by=self.request.user)
 
 
-class MyProjectsListView(generics.ListAPIView):
+class MyProjectsListView(ConditionalListMixin, generics.ListAPIView):
     """
-    List projects assigned to the current user (Employee only)
+    List projects assigned to the current user (Employee only): those they
+    are an active member of or hold a task in, the same set the project's
+    member list counts them in
     """
     serializer_class = ProjectSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -47,34 +70,19 @@ class MyProjectsListView(generics.ListAPIView):
     def get_queryset(self):
         user = self.request.user
         if user.is_employee():
-            # Get projects where user is a member OR assigned to tasks
-            from tasks.models import TaskAssignment
-            
-            # Projects where user is a direct member
-            direct_member_projects = Project.objects.filter(
-                is_active=True,
-                members__user=user,
-                members__is_active=True
-            )
-            
-            # Projects where user is assigned to tasks
-            task_assigned_projects = Project.objects.filter(
-                is_active=True,
-                tasks__assignments__user=user,
-                tasks__assignments__is_active=True
-            )
-            
-            # Combine both querysets
-            all_projects = (direct_member_projects | task_assigned_projects).distinct().annotate(
-                task_count=Count('tasks', distinct=True)
-            ).order_by('-created_at')
-            
-            # Debug logging
-            for project in all_projects:
-                print(f"Employee View - Project: {project.name}, Annotated task_count: {project.task_count}")
-            
-            return all_projects
+            # Projects where the user is an active member or works on one of the tasks,
+            # whether assigned directly (Task.assignee) or through a TaskAssignment.
+            # A semi-join: one probe of the (user, project) index per project, with
+            # no join to tasks or assignments, so no DISTINCT over exploded rows;
+            # the per-project counts are counter columns and a correlated subquery.
+            logger.debug('Listing member projects for employee %s', user.id)
+            return Project.objects.filter(is_active=True).filter(
+                Exists(EffectiveMembership.objects.filter(project=OuterRef('pk'), user=user))
+            ).order_by('-created_at').with_list_data(fields=self.get_serializer().fields)
         return Project.objects.none()
+    
+    def get_validators(self, queryset):
+        return project_validators(queryset)
 
 
 class ProjectDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -87,7 +95,7 @@ class ProjectDetailView(generics.RetrieveUpdateDestroyAPIView):
     def get_queryset(self):
         user = self.request.user
         if user.is_scrum_master():
-            return Project.objects.filter(is_active=True)
+            return Project.objects.filter(is_active=True).with_list_data(fields=self.get_serializer().fields)
         return Project.objects.none()
     
     def perform_update(self, serializer):
@@ -99,7 +107,7 @@ class ProjectDetailView(generics.RetrieveUpdateDestroyAPIView):
         if not self.request.user.is_scrum_master():
             raise permissions.PermissionDenied("Only Scrum Masters can delete projects")
         instance.is_active = False
-        instance.save()
+        instance.save(update_fields=['is_active', 'updated_at'])
 
 
 class ProjectMemberListView(generics.ListCreateAPIView):
@@ -155,193 +163,123 @@ class ProjectMemberDetailView(generics.DestroyAPIView):
         instance.save()
 
 
+def can_use_project_chat(user, project_id):
+    """
+    Whether ``user`` may read and post in the project chat: the project owner
+    and everyone in its effective membership (one indexed lookup)
+    """
+    return Project.objects.filter(id=project_id, is_active=True).filter(
+        Q(created_by=user) | Exists(EffectiveMembership.objects.filter(project=OuterRef('pk'), user=user))
+    ).exists()
+
+
+def author_roles(project_id, user_ids):
+    """Map user id to the display label of their role in the project, for members only"""
+    labels = dict(ProjectMember.ROLE_CHOICES)
+    roles = ProjectMember.objects.filter(project_id=project_id, user_id__in=user_ids).values_list('user_id', 'role')
+    return {user_id: labels.get(role, role) for user_id, role in roles}
+
+
 class ProjectMessageListView(generics.ListCreateAPIView):
     """
-    List and create project messages (Project members only)
+    List and create project messages (Project members only). Chat clients
+    poll with ``?after_id=`` and load history with ``?before_id=``.
     """
     serializer_class = ProjectMessageSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = MessageWindowPagination
     
     def get_queryset(self):
         project_id = self.kwargs['project_id']
-        user = self.request.user
-        
-        # Check if user is a member of this project OR assigned to tasks in this project
-        from tasks.models import TaskAssignment
-        
-        # Allow project owner (Scrum Master who created the project)
-        try:
-            project_obj = Project.objects.only('id', 'created_by_id', 'is_active').get(id=project_id, is_active=True)
-            is_project_owner = project_obj.created_by_id == user.id
-        except Project.DoesNotExist:
-            is_project_owner = False
-
-        is_project_member = ProjectMember.objects.filter(
-            project_id=project_id,
-            user=user,
-            is_active=True
-        ).exists()
-        
-        is_task_assignee = TaskAssignment.objects.filter(
-            task__project_id=project_id,
-            user=user,
-            is_active=True
-        ).exists()
-        
-        if is_project_owner or is_project_member or is_task_assignee:
+        if can_use_project_chat(self.request.user, project_id):
             return ProjectMessage.objects.filter(
                 project_id=project_id
-            ).order_by('created_at')
+            ).select_related('author').order_by('created_at')
         return ProjectMessage.objects.none()
     
+    def get_serializer(self, *args, **kwargs):
+        if kwargs.get('many') and args:
+            # Resolve every author's project role in one query for the whole page
+            context = kwargs.setdefault('context', self.get_serializer_context())
+            context['author_roles'] = author_roles(self.kwargs['project_id'], {message.author_id for message in args[0]})
+        return super().get_serializer(*args, **kwargs)
+    
     def perform_create(self, serializer):
         project_id = self.kwargs['project_id']
         user = self.request.user
         
-        # Check if user is a member of this project OR assigned to tasks in this project
-        from tasks.models import TaskAssignment
-        
-        # Allow project owner (Scrum Master who created the project)
-        try:
-            project_obj = Project.objects.only('id', 'created_by_id', 'is_active').get(id=project_id, is_active=True)
-            is_project_owner = project_obj.created_by_id == user.id
-        except Project.DoesNotExist:
-            is_project_owner = False
-
-        is_project_member = ProjectMember.objects.filter(
-            project_id=project_id,
-            user=user,
-            is_active=True
-        ).exists()
-        
-        is_task_assignee = TaskAssignment.objects.filter(
-            task__project_id=project_id,
-            user=user,
-            is_active=True
-        ).exists()
-        
-        if not (is_project_owner or is_project_member or is_task_assignee):
+        if not can_use_project_chat(user, project_id):
             raise permissions.PermissionDenied("You must be a project member or task assignee to send messages")
         
         project = get_object_or_404(Project, id=project_id, is_active=True)
         serializer.save(project=project, author=user)
 
 
+def analytics_projects():
+    """Projects with everything the embedded ProjectSerializer renders already loaded"""
+    return Project.objects.with_list_data()
+
+
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def project_analytics(request, project_id):
     """
-    Get project analytics (Scrum Master only)
+    Get project analytics (answers 304 while the project and its tasks are unchanged)
     """
+    # Allow both scrum masters and employees to access project analytics
+    if not (request.user.is_scrum_master() or request.user.is_employee()):
+        return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+    
     try:
-        # Allow both scrum masters and employees to access project analytics
-        if not (request.user.is_scrum_master() or request.user.is_employee()):
-            return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
-        
-        try:
-            project = Project.objects.get(id=project_id, is_active=True)
-        except Project.DoesNotExist:
-            return Response({'error': 'Project not found'}, status=status.HTTP_404_NOT_FOUND)
+        project = analytics_projects().get(id=project_id, is_active=True)
+    except Project.DoesNotExist:
+        return Response({'error': 'Project not found'}, status=status.HTTP_404_NOT_FOUND)
     
-        from tasks.models import Task, TaskAssignment
-        from django.utils import timezone
-        from datetime import timedelta
+    parts, last_modified = project_validators(Project.objects.filter(id=project.id))
+    return conditional_get(request, parts, last_modified, lambda: build_project_analytics(project))
+
+
+def build_project_analytics(project):
+    """
+    Compute the analytics payload for one project
+    """
+    try:
+        from tasks.analytics import (
+            cycle_time_stats, member_breakdown, priority_breakdown, recent_completed_tasks, status_totals
+        )
         
         tasks = project.tasks.all()
-        total_tasks = tasks.count()
-        completed_tasks = tasks.filter(status='done').count()
-        in_progress_tasks = tasks.filter(status='in_progress').count()
-        review_tasks = tasks.filter(status='review').count()
-        todo_tasks = tasks.filter(status='todo').count()
-        
-        
+        totals = status_totals(tasks)
+        total_tasks = totals['total']
+        completed_tasks = totals['completed']
+        in_progress_tasks = totals['in_progress']
+        review_tasks = totals['review']
+        todo_tasks = totals['todo']
         
         # Calculate completion rate
         completion_rate = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
         
-        # Get team members count - users who have tasks assigned in this project
-        # Include both direct assignees and TaskAssignment records
-        direct_assignee_ids = tasks.filter(assignee__isnull=False).values_list('assignee_id', flat=True).distinct()
-        task_assignee_ids = TaskAssignment.objects.filter(
-            task__project=project,
-            is_active=True
-        ).values_list('user_id', flat=True).distinct()
-        
-        # Combine both sets and get unique count
-        all_assignee_ids = set(direct_assignee_ids) | set(task_assignee_ids)
-        team_members = len(all_assignee_ids)
-        
+        # Team performance - users with tasks in this project, directly or via TaskAssignment
+        members = member_breakdown(project)
+        team_members = len(members)
+        team_performance = [
+            {
+                'name': member['name'],
+                'email': member['email'],
+                'completed_tasks': member['completed'],
+                'in_progress_tasks': member['in_progress'],
+                'review_tasks': member['review'],
+                'total_assigned': member['total']
+            }
+            for member in members
+        ]
         
-        # Get recently completed tasks
-        recent_completed_tasks = tasks.filter(status='done').order_by('-updated_at')[:10]
-        recent_completed_data = []
-        for task in recent_completed_tasks:
-            recent_completed_data.append({
-                'title': task.title,
-                'completed_at': task.updated_at,
-                'completed_by': task.assignee.get_full_name() if task.assignee else 'Unknown',
-                'priority': task.priority
-            })
+        recent_completed_data = recent_completed_tasks(tasks)
+        tasks_by_priority = priority_breakdown(tasks)
         
-        # Get tasks by priority for charts
-        from django.db.models import Count as DjCount
-        tasks_by_priority = list(
-            tasks.values('priority').annotate(count=DjCount('id')).order_by('priority')
-        )
-
-        # Get team performance - users who have tasks assigned in this project
-        team_performance = []
-        
-        # Get all users who have tasks assigned in this project (both direct and via TaskAssignment)
-        for user_id in all_assignee_ids:
-            try:
-                from accounts.models import User
-                user = User.objects.get(id=user_id)
-                
-                # Get tasks assigned directly to this user
-                direct_tasks = tasks.filter(assignee=user)
-                
-                # Get tasks assigned via TaskAssignment
-                assigned_task_ids = TaskAssignment.objects.filter(
-                    task__project=project,
-                    user=user,
-                    is_active=True
-                ).values_list('task_id', flat=True)
-                assigned_tasks = tasks.filter(id__in=assigned_task_ids)
-                
-                # Combine both sets of tasks
-                user_tasks = (direct_tasks | assigned_tasks).distinct()
-                completed_count = user_tasks.filter(status='done').count()
-                in_progress_count = user_tasks.filter(status='in_progress').count()
-                review_count = user_tasks.filter(status='review').count()
-                
-                team_performance.append({
-                    'name': user.get_full_name(),
-                    'email': user.email,
-                    'completed_tasks': completed_count,
-                    'in_progress_tasks': in_progress_count,
-                    'review_tasks': review_count,
-                    'total_assigned': user_tasks.count()
-                })
-            except User.DoesNotExist:
-                continue
-        
-        # Calculate average task duration
-        completed_tasks_with_dates = tasks.filter(
-            status='done',
-            created_at__isnull=False,
-            updated_at__isnull=False
-        )
-        avg_duration = 0
-        avg_duration_minutes = 0
-        if completed_tasks_with_dates.exists():
-            total_duration_seconds = 0
-            for task in completed_tasks_with_dates:
-                duration_seconds = (task.updated_at - task.created_at).total_seconds()
-                total_duration_seconds += duration_seconds
-            avg_duration_seconds = total_duration_seconds / completed_tasks_with_dates.count()
-            avg_duration = avg_duration_seconds / (24 * 60 * 60)  # Convert to days
-            avg_duration_minutes = avg_duration_seconds / 60  # Convert to minutes
+        # Lead time (created -> done) and cycle time (started -> done), computed in SQL
+        lead_time = cycle_time_stats(tasks, start_field='created_at')
+        cycle_time = cycle_time_stats(tasks)
         
         analytics = {
             'project': ProjectSerializer(project).data,
@@ -357,14 +295,16 @@ def project_analytics(request, project_id):
             'team_performance': team_performance,
             'project_start_date': project.created_at,
             'last_activity': project.updated_at,
-            'avg_task_duration': round(avg_duration, 1),
-            'avg_task_duration_minutes': round(avg_duration_minutes, 1)
+            'avg_task_duration': round(lead_time['mean_seconds'] / (24 * 60 * 60), 1),
+            'avg_task_duration_minutes': round(lead_time['mean_seconds'] / 60, 1),
+            'lead_time': lead_time,
+            'cycle_time': cycle_time
         }
         
         return Response(analytics)
     
     except Exception as e:
-        print(f"Error in project analytics: {str(e)}")
+        logger.exception('Analytics calculation failed for project %s', project.id)
         return Response({'error': f'Analytics calculation failed: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
@@ -375,7 +315,7 @@ def project_member_performance(request, project_id):
     Per-member performance and recent history for a project (Scrum Master only)
     """
     try:
-        project = Project.objects.get(id=project_id, is_active=True)
+        project = analytics_projects().get(id=project_id, is_active=True)
     except Project.DoesNotExist:
         return Response({'error': 'Project not found'}, status=status.HTTP_404_NOT_FOUND)
 
@@ -383,50 +323,72 @@ def project_member_performance(request, project_id):
     if not (request.user.is_scrum_master() or project.created_by_id == request.user.id or request.user.is_employee()):
         return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
 
-    from tasks.models import Task, TaskAssignment
+    from tasks.analytics import member_breakdown, member_roles, recent_tasks_by_member
 
-    # Only show users who have tasks assigned in this project (both direct and via TaskAssignment)
-    direct_assignee_ids = project.tasks.filter(assignee__isnull=False).values_list('assignee_id', flat=True).distinct()
-    task_assignee_ids = TaskAssignment.objects.filter(task__project=project, is_active=True).values_list('user_id', flat=True).distinct()
-    assignee_user_ids = set(direct_assignee_ids) | set(task_assignee_ids)
-    
-    # Helper to get role label if exists
-    def role_label_for(user_id: int) -> str:
-        try:
-            member = ProjectMember.objects.get(project=project, user_id=user_id, is_active=True)
-            return member.get_role_display()
-        except ProjectMember.DoesNotExist:
-            return 'Employee'
-
-    from accounts.models import User
-    users = User.objects.filter(id__in=assignee_user_ids)
-
-    data = []
-    for u in users:
-        direct = Task.objects.filter(project=project, assignee=u)
-        assigned_ids = TaskAssignment.objects.filter(task__project=project, user=u, is_active=True).values_list('task_id', flat=True)
-        indirect = Task.objects.filter(id__in=assigned_ids)
-        user_tasks = (direct | indirect).distinct().order_by('-updated_at')
-
-        data.append({
-            'user_id': u.id,
-            'name': u.get_full_name(),
-            'email': u.email,
-            'role': role_label_for(u.id),
-            'total_tasks': user_tasks.count(),
-            'completed_tasks': user_tasks.filter(status='done').count(),
-            'in_progress_tasks': user_tasks.filter(status='in_progress').count(),
-            'todo_tasks': user_tasks.filter(status='todo').count(),
-            'recent_tasks': [
-                {
-                    'id': t.id,
-                    'title': t.title,
-                    'status': t.status,
-                    'priority': t.priority,
-                    'updated_at': t.updated_at,
-                }
-                for t in user_tasks[:5]
-            ],
-        })
+    # Only users with tasks in this project, directly or via TaskAssignment
+    members = member_breakdown(project)
+    roles = member_roles(project, [member['user_id'] for member in members])
+    recent_tasks = recent_tasks_by_member(project)
+
+    data = [
+        {
+            'user_id': member['user_id'],
+            'name': member['name'],
+            'email': member['email'],
+            'role': roles[member['user_id']],
+            'total_tasks': member['total'],
+            'completed_tasks': member['completed'],
+            'in_progress_tasks': member['in_progress'],
+            'todo_tasks': member['todo'],
+            'recent_tasks': recent_tasks.get(member['user_id'], []),
+        }
+        for member in members
+    ]
 
     return Response({'project': ProjectSerializer(project).data, 'members': data})
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def project_status_history(request, project_id):
+    """
+    Daily task counts per status for burndown and cumulative-flow charts.
+
+    ``?start=`` and ``?end=`` (YYYY-MM-DD, inclusive) default to the last
+    ``STATUS_HISTORY_DEFAULT_DAYS`` days. Served from the snapshot rollup
+    kept current by the ``rollup_task_status`` command.
+    """
+    from datetime import timedelta
+    from django.conf import settings
+    from django.utils import timezone
+    from django.utils.dateparse import parse_date
+    from tasks.snapshots import status_history
+    
+    if not (request.user.is_scrum_master() or request.user.is_employee()):
+        return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+    
+    try:
+        project = Project.objects.get(id=project_id, is_active=True)
+    except Project.DoesNotExist:
+        return Response({'error': 'Project not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    try:
+        end = parse_date(request.query_params.get('end') or str(timezone.localdate()))
+        start = parse_date(request.query_params.get('start') or '') if 'start' in request.query_params else None
+    except ValueError:
+        start = end = None
+    if end is not None and 'start' not in request.query_params:
+        start = end - timedelta(days=settings.STATUS_HISTORY_DEFAULT_DAYS - 1)
+    if start is None or end is None:
+        return Response({'error': 'start and end must be dates (YYYY-MM-DD)'}, status=status.HTTP_400_BAD_REQUEST)
+    if start > end:
+        return Response({'error': 'start must not be after end'}, status=status.HTTP_400_BAD_REQUEST)
+    if (end - start).days + 1 > settings.STATUS_HISTORY_MAX_DAYS:
+        return Response({'error': f'At most {settings.STATUS_HISTORY_MAX_DAYS} days can be requested'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    return Response({
+        'project_id': project.id,
+        'start': start,
+        'end': end,
+        'days': status_history(project, start, end),
+    })
@@ -1,5 +1,9 @@
 """
 ASGI config for taskflow project.
+
+HTTP requests go to Django; WebSocket connections to the real-time
+endpoints (see ``projects.realtime``). Server startup (the ASGI lifespan
+protocol) starts the due date scan (see ``tasks.due``).
 """
 
 import os
@@ -8,4 +12,37 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'taskflow.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported after setup so the apps are loaded
+from projects.realtime import CHAT_PATH, chat_websocket  # noqa: E402
+from tasks.realtime import start_due_soon_alerts  # noqa: E402
+
+
+async def lifespan_application(scope, receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            start_due_soon_alerts()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def websocket_application(scope, receive, send):
+    match = CHAT_PATH.match(scope['path'])
+    if match is None:
+        await receive()
+        await send({'type': 'websocket.close', 'code': 4404})
+        return
+    await chat_websocket(scope, receive, send, int(match.group('project_id')))
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'websocket':
+        await websocket_application(scope, receive, send)
+    elif scope['type'] == 'lifespan':
+        await lifespan_application(scope, receive, send)
+    else:
+        await django_application(scope, receive, send)
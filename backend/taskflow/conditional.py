@@ -0,0 +1,60 @@
+"""
+Conditional GET support (ETag / Last-Modified / 304 Not Modified).
+
+Views describe the data behind a response with cheap validators - row counts,
+latest timestamps, change sequences - and answer 304 before running any
+serializer when the client's copy is still current. Validators are scoped to
+the requesting user and the full request path, so one user's cached response
+never validates another's.
+"""
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+
+def build_etag(request, parts):
+    """Hash the user, request path and validator parts into a quoted ETag"""
+    raw = '|'.join(str(part) for part in [request.user.pk, request.get_full_path(), *parts])
+    return '"%s"' % hashlib.sha1(raw.encode()).hexdigest()
+
+
+def latest_timestamp(*timestamps):
+    """Return the newest non-empty timestamp (None if there are none)"""
+    present = [timestamp for timestamp in timestamps if timestamp is not None]
+    return max(present) if present else None
+
+
+def conditional_get(request, parts, last_modified, render):
+    """
+    Answer 304 when the client's validators match, otherwise call ``render()``.
+    Either way the response carries ETag, Last-Modified and Vary headers.
+    """
+    etag = build_etag(request, parts)
+    last_modified_ts = last_modified.timestamp() if last_modified else None
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified_ts)
+    if response is None:
+        response = render()
+
+    if response.status_code in (200, 304):
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified_ts)
+        patch_vary_headers(response, ['Authorization'])
+        # Responses are per user: let the browser revalidate, keep shared caches out
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+class ConditionalListMixin:
+    """
+    Mixin for list views: define ``get_validators(queryset)`` returning
+    ``(parts, last_modified)`` for the filtered queryset.
+    """
+    def get_validators(self, queryset):
+        raise NotImplementedError
+
+    def list(self, request, *args, **kwargs):
+        parts, last_modified = self.get_validators(self.filter_queryset(self.get_queryset()))
+        return conditional_get(request, parts, last_modified, lambda: super(ConditionalListMixin, self).list(request, *args, **kwargs))
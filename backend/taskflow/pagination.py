@@ -0,0 +1,200 @@
+"""
+Pagination classes shared by the list endpoints.
+"""
+import base64
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError as RequestValidationError
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(PageNumberPagination):
+    """
+    Page-number pagination by default, with an opt-in keyset (cursor) mode.
+
+    Clients switch to keyset mode with ``?pagination=cursor`` and then follow
+    the ``next`` link, which carries an opaque ``cursor`` holding the last row's
+    ``ordering`` values. Keyset pages never run COUNT(*) or OFFSET, so deep
+    pages cost the same as the first. ``?include_total=1`` adds an approximate
+    total taken from the planner (PostgreSQL) or a capped count elsewhere.
+    Keyset pages follow the fixed ``ordering``, so they reject ``?ordering=``
+    and ``?search=`` (ranked) requests instead of ignoring them; only they
+    accept ``?page_size=`` (up to ``max_page_size``). Page-number pages keep
+    the fixed ``PAGE_SIZE``.
+    """
+    ordering = ('-created_at', '-id')
+    cursor_query_param = 'cursor'
+    mode_query_param = 'pagination'
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    total_count_cap = 1000
+
+    def use_keyset(self, request):
+        params = request.query_params
+        return self.cursor_query_param in params or params.get(self.mode_query_param) == 'cursor'
+
+    def get_page_size(self, request):
+        if not self.use_keyset(request):
+            return self.page_size
+        return super().get_page_size(request)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = self.use_keyset(request)
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        conflicting = [
+            name for name in (api_settings.ORDERING_PARAM, api_settings.SEARCH_PARAM) if request.query_params.get(name)
+        ]
+        if conflicting:
+            raise RequestValidationError({'error': f'Cursor pagination cannot be combined with {", ".join(conflicting)}'})
+        page_size = self.get_page_size(request)
+        position = self.decode_cursor(queryset.model, request.query_params.get(self.cursor_query_param))
+
+        queryset = queryset.order_by(*self.ordering)
+        self.total_estimate = self.estimate_total(queryset) if request.query_params.get('include_total') else None
+        if position is not None:
+            queryset = queryset.filter(self.position_filter(position))
+
+        rows = list(queryset[:page_size + 1])
+        self.has_next = len(rows) > page_size
+        self.page_rows = rows[:page_size]
+        return self.page_rows
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        payload = OrderedDict([('next', self.get_next_link()), ('results', data)])
+        if self.total_estimate is not None:
+            payload['total_estimate'] = self.total_estimate
+        return Response(payload)
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.mode_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page_rows[-1]))
+
+    def get_previous_link(self):
+        if self.keyset:
+            return None
+        return super().get_previous_link()
+
+    def field_names(self):
+        return [field.lstrip('-') for field in self.ordering]
+
+    def encode_cursor(self, row):
+        values = [getattr(row, name) for name in self.field_names()]
+        raw = json.dumps([value.isoformat() if hasattr(value, 'isoformat') else value for value in values])
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def decode_cursor(self, model, cursor):
+        if not cursor:
+            return None
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+            names = self.field_names()
+            if not isinstance(values, list) or len(values) != len(names):
+                raise ValueError(cursor)
+            return [model._meta.get_field(name).to_python(value) for name, value in zip(names, values)]
+        except (TypeError, ValueError, UnicodeError, ValidationError):
+            raise NotFound('Invalid cursor')
+
+    def position_filter(self, position):
+        """
+        Build ``(a, b) < (x, y)`` (or ``>`` for ascending orderings) as
+        ``a < x OR (a = x AND b < y)`` so each term can use the index.
+        """
+        descending = self.ordering[0].startswith('-')
+        lookup = 'lt' if descending else 'gt'
+        condition = Q()
+        equal_prefix = {}
+        for name, value in zip(self.field_names(), position):
+            condition |= Q(**equal_prefix, **{f'{name}__{lookup}': value})
+            equal_prefix[name] = value
+        return condition
+
+    def estimate_total(self, queryset):
+        connection = connections[queryset.db]
+        if connection.vendor == 'postgresql':
+            plan = json.loads(queryset.explain(format='json'))
+            return int(plan[0]['Plan']['Plan Rows'])
+        return queryset.order_by()[:self.total_count_cap].count()
+
+
+class StartTimeKeysetPagination(KeysetPagination):
+    """Keyset pagination for time sessions, newest first"""
+    ordering = ('-start_time', '-id')
+
+
+class ChronologicalKeysetPagination(KeysetPagination):
+    """Keyset pagination for chat-style lists, oldest first"""
+    ordering = ('created_at', 'id')
+
+
+class MessageWindowPagination(ChronologicalKeysetPagination):
+    """
+    Chat pagination around message ids, on top of the chronological keyset.
+
+    ``?after_id=N`` returns the messages posted after N (oldest first) for
+    incremental polling; ``has_more`` means another page is already waiting.
+    ``?before_id=N`` returns the newest page older than N and
+    ``?pagination=window`` the newest page overall; there ``has_more`` means
+    older messages remain. Pages are capped at ``CHAT_MAX_PAGE_SIZE``.
+    """
+    after_query_param = 'after_id'
+    before_query_param = 'before_id'
+
+    def window_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, settings.CHAT_PAGE_SIZE))
+        except ValueError:
+            size = settings.CHAT_PAGE_SIZE
+        return max(1, min(size, settings.CHAT_MAX_PAGE_SIZE))
+
+    def message_id(self, request, name):
+        value = request.query_params.get(name)
+        if value is None:
+            return None
+        try:
+            return int(value)
+        except ValueError:
+            raise NotFound(f'Invalid {name}')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        after_id = self.message_id(request, self.after_query_param)
+        before_id = self.message_id(request, self.before_query_param)
+        self.window = (
+            after_id is not None or before_id is not None
+            or request.query_params.get(self.mode_query_param) == 'window'
+        )
+        if not self.window:
+            return super().paginate_queryset(queryset, request, view)
+
+        page_size = self.window_page_size(request)
+        if after_id is not None:
+            rows = list(queryset.filter(id__gt=after_id).order_by('id')[:page_size + 1])
+        else:
+            if before_id is not None:
+                queryset = queryset.filter(id__lt=before_id)
+            rows = list(queryset.order_by('-id')[:page_size + 1])
+        self.has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        return rows if after_id is not None else rows[::-1]
+
+    def get_paginated_response(self, data):
+        if not self.window:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([('has_more', self.has_more), ('results', data)]))
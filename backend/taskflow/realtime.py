@@ -0,0 +1,247 @@
+"""
+In-process publish/subscribe for the real-time endpoints.
+
+Publishers call ``get_broker().publish(topics, event)`` from ordinary
+(synchronous) Django code - usually from ``transaction.on_commit`` so only
+committed changes go out. Subscribers are ASGI connections that iterate a
+``Subscription`` on the event loop. ``REALTIME_BROKER`` names the broker
+class; ``InMemoryBroker`` fans out within one process, which is enough for a
+single ASGI worker and for tests. A multi-process deployment plugs in a broker
+backed by a shared channel implementing ``BaseBroker``.
+"""
+import asyncio
+import hashlib
+import json
+import secrets
+import threading
+from collections import deque
+from datetime import timedelta
+from urllib.parse import parse_qs
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+_broker = None
+_broker_lock = threading.Lock()
+
+RESYNC_EVENT = {'type': 'resync'}
+
+
+class Subscription:
+    """
+    ``(event_id, event)`` pairs for one subscriber, in publish order, starting
+    with any events replayed at subscribe time. When the subscriber falls
+    more than ``REALTIME_QUEUE_SIZE`` events behind, further events are
+    dropped and the next ``get()`` returns a ``resync`` event (with no id) so
+    the client reloads over HTTP instead of holding the server's memory.
+    """
+    def __init__(self, broker, topics, loop, maxsize):
+        self.broker = broker
+        self.topics = frozenset(topics)
+        self.loop = loop
+        self.backlog = deque()
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+    def deliver(self, event_id, event):
+        # Runs on the subscriber's event loop
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait((event_id, event))
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    async def get(self):
+        if self.backlog:
+            return self.backlog.popleft()
+        if self.overflowed and self.queue.empty():
+            self.overflowed = False
+            return None, RESYNC_EVENT
+        return await self.queue.get()
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class BaseBroker:
+    """Interface of the pluggable brokers"""
+    def subscribe(self, topics, after_id=None):
+        """
+        Start a ``Subscription`` to ``topics``; call from the event loop. With
+        ``after_id`` (a ``Last-Event-ID``) the events published since are
+        replayed first, or a ``resync`` event when they are no longer held.
+        """
+        raise NotImplementedError
+
+    def unsubscribe(self, subscription):
+        raise NotImplementedError
+
+    def publish(self, topics, event):
+        """
+        Send the JSON-serializable ``event`` once to every subscriber of any
+        of ``topics`` and return its id; safe from any thread
+        """
+        raise NotImplementedError
+
+
+class InMemoryBroker(BaseBroker):
+    """
+    Fan-out to the subscribers of this process. The last
+    ``REALTIME_REPLAY_SIZE`` events are kept in a ring buffer for replay.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscribers = {}
+        self.history = deque(maxlen=settings.REALTIME_REPLAY_SIZE)
+        self.last_id = 0
+
+    def subscribe(self, topics, after_id=None):
+        subscription = Subscription(self, topics, asyncio.get_running_loop(), settings.REALTIME_QUEUE_SIZE)
+        # Registering and replaying under one lock hands every event over exactly once
+        with self.lock:
+            for topic in subscription.topics:
+                self.subscribers.setdefault(topic, set()).add(subscription)
+            if after_id is not None:
+                subscription.backlog.extend(self.replay(subscription.topics, after_id))
+        return subscription
+
+    def replay(self, topics, after_id):
+        """Events for ``topics`` published after ``after_id``; call with the lock held"""
+        if after_id == self.last_id:
+            return []
+        oldest = self.history[0][0] if self.history else self.last_id + 1
+        if after_id > self.last_id or after_id < oldest - 1:
+            # From before a restart, or already evicted
+            return [(None, RESYNC_EVENT)]
+        return [(event_id, event) for event_id, event_topics, event in self.history
+                if event_id > after_id and event_topics & topics]
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            for topic in subscription.topics:
+                subscribers = self.subscribers.get(topic)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self.subscribers[topic]
+
+    def publish(self, topics, event):
+        topics = frozenset(topics)
+        with self.lock:
+            self.last_id += 1
+            event_id = self.last_id
+            self.history.append((event_id, topics, event))
+            subscribers = set().union(*(self.subscribers.get(topic, ()) for topic in topics))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, event_id, event)
+            except RuntimeError:
+                # The subscriber's loop is closed; it is going away
+                pass
+        return event_id
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = import_string(settings.REALTIME_BROKER)()
+    return _broker
+
+
+def query_param(scope, name):
+    """First value of ``name`` in an ASGI scope's query string (None if absent)"""
+    values = parse_qs(scope.get('query_string', b'').decode('latin-1')).get(name)
+    return values[0] if values else None
+
+
+def authenticate_token(raw_token):
+    """
+    The active user a JWT access token belongs to, or None. Synchronous:
+    wrap it in ``sync_to_async`` on the event loop.
+    """
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+    if not raw_token:
+        return None
+    authentication = JWTAuthentication()
+    try:
+        user = authentication.get_user(authentication.get_validated_token(raw_token))
+    except (InvalidToken, AuthenticationFailed):
+        return None
+    return user if user.is_active else None
+
+
+def _ticket_hash(ticket):
+    return hashlib.sha256(ticket.encode()).hexdigest()
+
+
+def issue_ticket(user):
+    """
+    A single-use ticket authenticating one stream or socket connection for
+    ``user`` within ``REALTIME_TICKET_SECONDS``. Expired tickets are cleared
+    on the way.
+    """
+    from accounts.models import StreamTicket
+
+    now = timezone.now()
+    StreamTicket.objects.filter(expires_at__lte=now).delete()
+    ticket = secrets.token_urlsafe(32)
+    StreamTicket.objects.create(
+        key_hash=_ticket_hash(ticket), user=user, expires_at=now + timedelta(seconds=settings.REALTIME_TICKET_SECONDS)
+    )
+    return ticket
+
+
+def redeem_ticket(ticket):
+    """
+    The active user a ticket was issued to, or None when it is unknown,
+    expired or already used. Synchronous: wrap it in ``sync_to_async`` on
+    the event loop.
+    """
+    from accounts.models import StreamTicket
+
+    if not ticket:
+        return None
+    issued = StreamTicket.objects.select_related('user').filter(
+        key_hash=_ticket_hash(ticket), expires_at__gt=timezone.now()
+    ).first()
+    # Deleting is the claim: of two connections racing on one ticket only one deletes the row
+    if issued is None or not StreamTicket.objects.filter(id=issued.id).delete()[0]:
+        return None
+    return issued.user if issued.user.is_active else None
+
+
+async def serve_websocket(receive, send, subscription):
+    """
+    Push a subscription's events to an accepted WebSocket as JSON text frames
+    until the client disconnects. Messages from the client are ignored apart
+    from ``ping``, answered with ``{"type": "pong"}``.
+    """
+    async def forward():
+        while True:
+            _event_id, event = await subscription.get()
+            await send({'type': 'websocket.send', 'text': json.dumps(event, default=str)})
+
+    forwarder = asyncio.ensure_future(forward())
+    try:
+        while True:
+            message = await receive()
+            if message['type'] == 'websocket.disconnect':
+                break
+            if message['type'] == 'websocket.receive' and message.get('text') == 'ping':
+                await send({'type': 'websocket.send', 'text': json.dumps({'type': 'pong'})})
+    finally:
+        forwarder.cancel()
+        subscription.close()
+
+
+def format_sse(event_id, event):
+    """One Server-Sent Events frame; events without an id (``resync``) carry none"""
+    lines = [] if event_id is None else [f'id: {event_id}']
+    lines += [f"event: {event['type']}", f'data: {json.dumps(event, default=str)}']
+    return '\n'.join(lines) + '\n\n'
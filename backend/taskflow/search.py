@@ -0,0 +1,235 @@
+"""
+Full-text search indexes shared by the API apps.
+
+A ``FullTextIndex`` describes the searchable columns of one table. On
+PostgreSQL it is a generated, weighted ``tsvector`` column with a GIN index,
+plus a ``pg_trgm`` index for typo tolerance; on SQLite it is an
+external-content FTS5 table kept in sync by triggers, plus an ``fts5vocab``
+table used to correct misspelled terms. Other databases fall back to
+``icontains``. Indexes are created from migrations with ``install()``.
+"""
+import re
+from contextlib import contextmanager
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField
+from django.db import connections, transaction
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+# bm25() column weights standing in for PostgreSQL's A-D tsvector weights
+SQLITE_WEIGHTS = {'A': 10.0, 'B': 4.0, 'C': 2.0, 'D': 1.0}
+
+# Vocabulary corrections must share at least this many trigrams (0-1)
+FUZZY_THRESHOLD = 0.3
+FUZZY_CORRECTIONS = 3
+
+
+def search_terms(text):
+    """Split free text into lower-case word tokens (punctuation is dropped)"""
+    return re.findall(r'\w+', (text or '').lower())
+
+
+def trigrams(word):
+    padded = f'  {word} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def trigram_similarity(a, b):
+    """Share of trigrams two words have in common, as pg_trgm computes it"""
+    a, b = trigrams(a), trigrams(b)
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+
+@contextmanager
+def statement_budget(using, milliseconds):
+    """
+    Cap the statements run inside the block at ``milliseconds`` on PostgreSQL
+    (cancelled statements raise ``OperationalError``). Elsewhere a no-op.
+    """
+    if connections[using].vendor != 'postgresql':
+        yield
+        return
+    with transaction.atomic(using=using):
+        with connections[using].cursor() as cursor:
+            cursor.execute('SET LOCAL statement_timeout = %s', [max(1, int(milliseconds))])
+        yield
+
+
+class FullTextIndex:
+    """
+    Searchable columns of ``table``: ``columns`` is a list of
+    ``(column, weight)`` pairs with weights ``'A'`` (highest) to ``'D'``.
+    ``fuzzy_expression`` is the SQL expression PostgreSQL matches with
+    trigrams when the full-text pass finds too little.
+    """
+    def __init__(self, table, columns, config='english', tokenizer='unicode61 remove_diacritics 2', fuzzy_expression=None):
+        self.table = table
+        self.columns = columns
+        self.config = config
+        self.tokenizer = tokenizer
+        self.fuzzy_expression = fuzzy_expression
+        self.fts_table = f'{table}_fts'
+        self.vocab_table = f'{table}_fts_vocab'
+
+    # -- schema ------------------------------------------------------------
+
+    def postgres_install(self):
+        document = ' || '.join(
+            f"setweight(to_tsvector('{self.config}', coalesce({column}, '')), '{weight}')"
+            for column, weight in self.columns
+        )
+        statements = [
+            f'ALTER TABLE {self.table} ADD COLUMN IF NOT EXISTS search_vector tsvector '
+            f'GENERATED ALWAYS AS ({document}) STORED',
+            f'CREATE INDEX IF NOT EXISTS {self.table}_search_vector_idx ON {self.table} USING gin (search_vector)',
+        ]
+        if self.fuzzy_expression:
+            statements += [
+                'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+                f'CREATE INDEX IF NOT EXISTS {self.table}_trgm_idx ON {self.table} '
+                f'USING gin (({self.fuzzy_expression}) gin_trgm_ops)',
+            ]
+        return statements
+
+    def postgres_remove(self):
+        return [
+            f'DROP INDEX IF EXISTS {self.table}_trgm_idx',
+            f'DROP INDEX IF EXISTS {self.table}_search_vector_idx',
+            f'ALTER TABLE {self.table} DROP COLUMN IF EXISTS search_vector',
+        ]
+
+    def sqlite_install(self):
+        names = [column for column, _weight in self.columns]
+        column_list = ', '.join(names)
+        new_values = ', '.join(f'new.{column}' for column in names)
+        old_values = ', '.join(f'old.{column}' for column in names)
+        delete_old = (
+            f"INSERT INTO {self.fts_table}({self.fts_table}, rowid, {column_list}) "
+            f"VALUES ('delete', old.id, {old_values});"
+        )
+        insert_new = f'INSERT INTO {self.fts_table}(rowid, {column_list}) VALUES (new.id, {new_values});'
+        return [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.fts_table} USING fts5("
+            f"{column_list}, content='{self.table}', content_rowid='id', tokenize='{self.tokenizer}')",
+            f'CREATE TRIGGER IF NOT EXISTS {self.fts_table}_insert AFTER INSERT ON {self.table} BEGIN {insert_new} END',
+            f'CREATE TRIGGER IF NOT EXISTS {self.fts_table}_delete AFTER DELETE ON {self.table} BEGIN {delete_old} END',
+            f'CREATE TRIGGER IF NOT EXISTS {self.fts_table}_update AFTER UPDATE OF {column_list} ON {self.table} '
+            f'BEGIN {delete_old} {insert_new} END',
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.vocab_table} USING fts5vocab({self.fts_table}, 'row')",
+            f"INSERT INTO {self.fts_table}({self.fts_table}) VALUES ('rebuild')",
+        ]
+
+    def sqlite_remove(self):
+        return [
+            f'DROP TABLE IF EXISTS {self.vocab_table}',
+            f'DROP TRIGGER IF EXISTS {self.fts_table}_insert',
+            f'DROP TRIGGER IF EXISTS {self.fts_table}_delete',
+            f'DROP TRIGGER IF EXISTS {self.fts_table}_update',
+            f'DROP TABLE IF EXISTS {self.fts_table}',
+        ]
+
+    def install(self, schema_editor):
+        """
+        Create the index for the connection's vendor. Safe to re-run, e.g.
+        after a migration that rebuilds the table on SQLite (which drops its
+        triggers).
+        """
+        vendor = schema_editor.connection.vendor
+        statements = {'postgresql': self.postgres_install, 'sqlite': self.sqlite_install}.get(vendor)
+        for statement in statements() if statements else []:
+            schema_editor.execute(statement)
+
+    def remove(self, schema_editor):
+        vendor = schema_editor.connection.vendor
+        statements = {'postgresql': self.postgres_remove, 'sqlite': self.sqlite_remove}.get(vendor)
+        for statement in statements() if statements else []:
+            schema_editor.execute(statement)
+
+    # -- queries -----------------------------------------------------------
+
+    def search(self, queryset, text):
+        """
+        Filter ``queryset`` to rows matching every word of ``text`` as a word
+        prefix (for search-as-you-type) and annotate ``search_rank``, higher
+        being better. PostgreSQL also stems words; the SQLite tokenizer does
+        not, as FTS5 stems prefix queries inconsistently with whole words.
+        """
+        terms = search_terms(text)
+        if not terms:
+            return queryset
+
+        vendor = connections[queryset.db].vendor
+        if vendor == 'postgresql':
+            query = SearchQuery(' & '.join(f'{term}:*' for term in terms), config=self.config, search_type='raw')
+            return self._postgres_match(queryset, query)
+        if vendor == 'sqlite':
+            match = ' '.join(f'"{term}"*' for term in terms)
+            return self._sqlite_match(queryset, match)
+
+        condition = Q()
+        for term in terms:
+            term_condition = Q()
+            for column, _weight in self.columns:
+                term_condition |= Q(**{f'{column}__icontains': term})
+            condition &= term_condition
+        return queryset.filter(condition).annotate(search_rank=RawSQL('0', [], output_field=FloatField()))
+
+    def fuzzy_search(self, queryset, text):
+        """
+        Typo-tolerant pass for when ``search()`` finds too little. Returns a
+        queryset annotated with ``search_rank`` or None when the backend (or
+        this index) has nothing better to offer.
+        """
+        terms = search_terms(text)
+        if not terms:
+            return None
+
+        connection = connections[queryset.db]
+        if connection.vendor == 'postgresql' and self.fuzzy_expression:
+            expression = f'({self.fuzzy_expression})'
+            text = ' '.join(terms)
+            return queryset.filter(
+                RawSQL(f'%s <%% {expression}', [text], output_field=BooleanField())
+            ).annotate(search_rank=RawSQL(f'word_similarity(%s, {expression})', [text], output_field=FloatField()))
+
+        if connection.vendor == 'sqlite':
+            groups = []
+            corrected = False
+            for term in terms:
+                corrections = self._vocabulary_corrections(connection, term)
+                corrected = corrected or bool(corrections)
+                options = [f'"{term}"*'] + [f'"{word}"' for word in corrections]
+                groups.append('(' + ' OR '.join(options) + ')')
+            if corrected:
+                return self._sqlite_match(queryset, ' '.join(groups))
+        return None
+
+    def _postgres_match(self, queryset, query):
+        document = RawSQL(f'"{self.table}"."search_vector"', [], output_field=SearchVectorField())
+        return queryset.alias(search_document=document).filter(search_document=query).annotate(
+            search_rank=SearchRank(document, query)
+        )
+
+    def _sqlite_match(self, queryset, match):
+        # bm25() is negative, lower being better; negated so higher ranks first, as with ts_rank
+        weights = ', '.join(str(SQLITE_WEIGHTS[weight]) for _column, weight in self.columns)
+        return queryset.filter(
+            id__in=RawSQL(f'SELECT rowid FROM {self.fts_table} WHERE {self.fts_table} MATCH %s', [match])
+        ).annotate(search_rank=RawSQL(
+            f'SELECT -bm25({self.fts_table}, {weights}) FROM {self.fts_table} '
+            f'WHERE {self.fts_table} MATCH %s AND {self.fts_table}.rowid = "{self.table}"."id"',
+            [match], output_field=FloatField()
+        ))
+
+    def _vocabulary_corrections(self, connection, term):
+        """Indexed words closest to ``term``, looked up among words with the same first letter"""
+        if len(term) < 3:
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT term FROM {self.vocab_table} WHERE term >= %s AND term < %s AND length(term) BETWEEN %s AND %s',
+                [term[0], chr(ord(term[0]) + 1), len(term) - 2, len(term) + 2]
+            )
+            scored = [(trigram_similarity(term, word), word) for (word,) in cursor.fetchall() if word != term]
+        scored = sorted((item for item in scored if item[0] >= FUZZY_THRESHOLD), reverse=True)
+        return [word for _score, word in scored[:FUZZY_CORRECTIONS]]
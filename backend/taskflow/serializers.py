@@ -0,0 +1,30 @@
+"""
+Serializer helpers shared by the API apps.
+"""
+
+
+def parse_field_list(value):
+    """Split a comma-separated query parameter into a set of names (None if absent)"""
+    if value is None:
+        return None
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+class SparseFieldsetMixin:
+    """
+    Serializer mixin adding ``?fields=a,b`` and ``?omit=c`` support on GET
+    requests. Unselected fields are removed before serialization, so their
+    SerializerMethodFields never run; views can read ``serializer.fields`` to
+    skip the queries those fields would have needed.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or request.method != 'GET':
+            return
+
+        only = parse_field_list(request.query_params.get('fields'))
+        omit = parse_field_list(request.query_params.get('omit')) or set()
+        for name in list(self.fields):
+            if (only is not None and name not in only) or name in omit:
+                self.fields.pop(name)
@@ -77,6 +77,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'taskflow.wsgi.application'
+ASGI_APPLICATION = 'taskflow.asgi.application'
 
 # Database
 # Database configuration
@@ -158,6 +159,49 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 20,
 }
 
+# Kanban board: tasks returned per column on first load, and the most a client may request
+KANBAN_COLUMN_LIMIT = config('KANBAN_COLUMN_LIMIT', default=50, cast=int)
+KANBAN_MAX_COLUMN_LIMIT = config('KANBAN_MAX_COLUMN_LIMIT', default=200, cast=int)
+
+# Task delta sync: changes returned per poll, how long a change must age before the token moves past it,
+# and how many days of changes prune_task_changes keeps (older tokens must do a full sync)
+TASK_SYNC_BATCH_SIZE = config('TASK_SYNC_BATCH_SIZE', default=500, cast=int)
+TASK_SYNC_SETTLE_SECONDS = config('TASK_SYNC_SETTLE_SECONDS', default=5, cast=int)
+TASK_SYNC_RETENTION_DAYS = config('TASK_SYNC_RETENTION_DAYS', default=30, cast=int)
+
+# Global search: default and maximum results per request, and the time budget per request
+SEARCH_RESULT_LIMIT = config('SEARCH_RESULT_LIMIT', default=10, cast=int)
+SEARCH_MAX_RESULT_LIMIT = config('SEARCH_MAX_RESULT_LIMIT', default=50, cast=int)
+SEARCH_TIME_BUDGET_MS = config('SEARCH_TIME_BUDGET_MS', default=250, cast=int)
+
+# Project status history (burndown / cumulative flow): days served by default, and the longest range
+STATUS_HISTORY_DEFAULT_DAYS = config('STATUS_HISTORY_DEFAULT_DAYS', default=30, cast=int)
+STATUS_HISTORY_MAX_DAYS = config('STATUS_HISTORY_MAX_DAYS', default=366, cast=int)
+
+# Project chat: messages per window page (after_id / before_id), and the most a client may request
+CHAT_PAGE_SIZE = config('CHAT_PAGE_SIZE', default=50, cast=int)
+CHAT_MAX_PAGE_SIZE = config('CHAT_MAX_PAGE_SIZE', default=200, cast=int)
+
+# Real-time push (WebSockets, Server-Sent Events): broker class, how many events a slow subscriber
+# may fall behind, how many recent events are kept for Last-Event-ID replay, the SSE keep-alive,
+# and how long a connection ticket stays valid
+REALTIME_BROKER = config('REALTIME_BROKER', default='taskflow.realtime.InMemoryBroker')
+REALTIME_QUEUE_SIZE = config('REALTIME_QUEUE_SIZE', default=256, cast=int)
+REALTIME_REPLAY_SIZE = config('REALTIME_REPLAY_SIZE', default=1000, cast=int)
+REALTIME_HEARTBEAT_SECONDS = config('REALTIME_HEARTBEAT_SECONDS', default=15, cast=int)
+REALTIME_TICKET_SECONDS = config('REALTIME_TICKET_SECONDS', default=30, cast=int)
+
+# Notification inbox: entries returned per page by default, and the most a client may request
+NOTIFICATION_PAGE_SIZE = config('NOTIFICATION_PAGE_SIZE', default=20, cast=int)
+NOTIFICATION_MAX_PAGE_SIZE = config('NOTIFICATION_MAX_PAGE_SIZE', default=100, cast=int)
+
+# Due dates: how far ahead a task counts as due soon, and how often the ASGI server scans for tasks
+# crossing a threshold (0 disables). Under WSGI nothing scans in-process: schedule
+# `manage.py scan_due_tasks` every minute, or due-soon and overdue alerts are never sent
+# (overdue flags and counts still fall back to the due date)
+DUE_SOON_HOURS = config('DUE_SOON_HOURS', default=48, cast=int)
+DUE_ALERT_SCAN_SECONDS = config('DUE_ALERT_SCAN_SECONDS', default=60, cast=int)
+
 # JWT Configuration
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=24),
@@ -200,3 +244,16 @@ EMAIL_PORT = config('EMAIL_PORT', default=587, cast=int)
 EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=True, cast=bool)
 EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
+
+# Logging: app diagnostics are logged at DEBUG; set APP_LOG_LEVEL=DEBUG to see them
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        app: {'handlers': ['console'], 'level': config('APP_LOG_LEVEL', default='INFO'), 'propagate': False}
+        for app in ('accounts', 'projects', 'tasks', 'taskflow')
+    },
+}
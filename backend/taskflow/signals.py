@@ -0,0 +1,15 @@
+"""
+Helpers shared by the apps' signal receivers.
+"""
+from django.db.models import QuerySet
+
+
+def deleted_through(origin, *models):
+    """
+    Whether a ``post_delete`` is part of a cascade started by deleting one of
+    ``models`` (``origin`` is the instance or queryset ``delete()`` was
+    called on). Receivers that rebuild derived rows skip those cascades: the
+    rows they would rebuild are being deleted too.
+    """
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return model in models
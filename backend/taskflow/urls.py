@@ -4,6 +4,7 @@ URL configuration for taskflow project.
 from django.contrib import admin
 from django.urls import path, include
 from tasks import views as task_views
+from taskflow.views import event_stream, global_search, stream_ticket
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
@@ -20,6 +21,8 @@ def root_view(_request):
             '/api/auth/',
             '/api/tasks/',
             '/api/projects/',
+            '/api/search/',
+            '/api/stream/',
             '/admin/'
         ]
     })
@@ -34,9 +37,13 @@ urlpatterns = [
     path('auth/', include('accounts.urls')),
     path('api/tasks/', include('tasks.urls')),
     path('api/projects/', include('projects.urls')),
+    path('api/search/', global_search, name='global_search'),
+    path('api/stream/', event_stream, name='event_stream'),
+    path('api/stream/ticket/', stream_ticket, name='stream_ticket'),
     # Expose non-/api routes to match frontend calls
     path('tasks/', include('tasks.urls')),
     path('projects/', include('projects.urls')),
+    path('search/', global_search, name='global_search_root'),
     # Time-tracking routes at root level (frontend calls /time-tracking/*)
     path('time-tracking/sessions/', task_views.TimeSessionListCreateView.as_view(), name='time_session_list_create_root'),
     path('time-tracking/sessions/<int:pk>/', task_views.TimeSessionDetailView.as_view(), name='time_session_detail_root'),
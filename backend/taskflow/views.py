@@ -0,0 +1,261 @@
+"""
+Cross-app API views.
+"""
+import asyncio
+import heapq
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import OperationalError
+from django.db.models import Exists, F, OuterRef, Q
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework import permissions, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from accounts.models import User
+from accounts.search import USER_INDEX
+from projects.models import EffectiveMembership, Project, ProjectMessage
+from projects.search import MESSAGE_INDEX, PROJECT_INDEX
+from tasks.models import Task
+from tasks.realtime import start_due_soon_alerts, stream_topics
+from tasks.search import TASK_INDEX
+from .realtime import authenticate_token, format_sse, get_broker, issue_ticket, redeem_ticket
+from .search import search_terms, statement_budget
+
+SEARCH_TYPES = ('task', 'project', 'message', 'user')
+# Scores are normalised per type, as ts_rank, bm25 and word_similarity are not on one scale:
+# a type's word and prefix hits span these bounds, and its typo-corrected hits the lower ones
+EXACT_SCORE_RANGE = (0.5, 1.0)
+FUZZY_SCORE_RANGE = (0.1, 0.45)
+SNIPPET_LENGTH = 160
+
+
+def _snippet(text):
+    text = text or ''
+    return text if len(text) <= SNIPPET_LENGTH else text[:SNIPPET_LENGTH - 1].rstrip() + '…'
+
+
+def _searchable_tasks(user):
+    return Task.objects.visible_to(user).select_related('project').only(
+        'id', 'title', 'description', 'status', 'project__id', 'project__name'
+    )
+
+
+def _searchable_projects(user):
+    projects = Project.objects.filter(is_active=True).only('id', 'name', 'description')
+    if user.is_scrum_master():
+        return projects
+    return projects.filter(Exists(EffectiveMembership.objects.filter(project=OuterRef('pk'), user=user)))
+
+
+def _searchable_messages(user):
+    # Same audience as the project chat: the owner and the effective members
+    return ProjectMessage.objects.filter(project__is_active=True).filter(
+        Q(project__created_by=user) |
+        Exists(EffectiveMembership.objects.filter(project=OuterRef('project_id'), user=user))
+    ).select_related('project', 'author').only(
+        'id', 'content', 'created_at', 'project__id', 'project__name',
+        'author__id', 'author__first_name', 'author__last_name', 'author__username'
+    )
+
+
+def _searchable_users(user):
+    # Only Scrum Masters may browse the user directory
+    if not user.is_scrum_master():
+        return None
+    return User.objects.filter(is_active=True).only('id', 'first_name', 'last_name', 'username', 'email', 'role')
+
+
+def _task_result(task):
+    return {
+        'title': task.title,
+        'description': _snippet(task.description),
+        'status': task.status,
+        'project': task.project.name,
+        'project_id': task.project_id,
+    }
+
+
+def _project_result(project):
+    return {'title': project.name, 'description': _snippet(project.description)}
+
+
+def _message_result(message):
+    return {
+        'title': message.project.name,
+        'description': _snippet(message.content),
+        'project_id': message.project_id,
+        'author': message.author.get_full_name(),
+        'created_at': message.created_at,
+    }
+
+
+def _user_result(user):
+    return {'title': user.get_full_name(), 'description': user.get_role_display(), 'email': user.email}
+
+
+SEARCHERS = {
+    'task': (TASK_INDEX, _searchable_tasks, _task_result),
+    'project': (PROJECT_INDEX, _searchable_projects, _project_result),
+    'message': (MESSAGE_INDEX, _searchable_messages, _message_result),
+    'user': (USER_INDEX, _searchable_users, _user_result),
+}
+
+
+def _normalise(rows, score_range):
+    """
+    (score, row) pairs with each row's ``search_rank`` min-max scaled into
+    ``score_range``; the best row gets the top of the range
+    """
+    low, high = score_range
+    ranks = [row.search_rank or 0.0 for row in rows]
+    if not ranks:
+        return []
+    worst, best = min(ranks), max(ranks)
+    if best == worst:
+        return [(high, row) for row in rows]
+    return [(low + (high - low) * (rank - worst) / (best - worst), row) for rank, row in zip(ranks, rows)]
+
+
+def _search_type(index, queryset, query, limit, remaining_ms):
+    """Top ``limit`` (score, row) hits for one type, topped up with typo-tolerant matches"""
+    with statement_budget(queryset.db, remaining_ms()):
+        rows = list(index.search(queryset, query).order_by(F('search_rank').desc(), '-id')[:limit])
+        hits = _normalise(rows, EXACT_SCORE_RANGE)
+        if len(hits) < limit and remaining_ms() > 0:
+            fuzzy = index.fuzzy_search(queryset.exclude(id__in=[row.id for row in rows]), query)
+            if fuzzy is not None:
+                extra = list(fuzzy.order_by(F('search_rank').desc(), '-id')[:limit - len(hits)])
+                hits += _normalise(extra, FUZZY_SCORE_RANGE)
+    return hits
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def global_search(request):
+    """
+    Search tasks, projects, project messages and users in one request.
+
+    Every word of ``?q=`` must match as a word prefix; if a type has too few
+    hits, misspelled words are corrected by trigram similarity. Each
+    type returns its own top ``limit``, scored relative to its other hits,
+    and the merged list keeps the best ``limit`` overall. ``?types=task,project`` narrows the search. Types not
+    reached within ``SEARCH_TIME_BUDGET_MS`` are skipped and ``partial`` is set.
+    """
+    query = request.query_params.get('q', '').strip()
+    types = [name for name in request.query_params.get('types', ','.join(SEARCH_TYPES)).split(',') if name in SEARCHERS]
+    try:
+        limit = int(request.query_params.get('limit', settings.SEARCH_RESULT_LIMIT))
+    except ValueError:
+        limit = settings.SEARCH_RESULT_LIMIT
+    limit = max(1, min(limit, settings.SEARCH_MAX_RESULT_LIMIT))
+
+    if len(query) < 2 or not search_terms(query):
+        return Response({'query': query, 'results': [], 'partial': False})
+
+    started = time.monotonic()
+
+    def remaining_ms():
+        return settings.SEARCH_TIME_BUDGET_MS - (time.monotonic() - started) * 1000
+
+    hits = []
+    partial = False
+    for type_name in types:
+        index, searchable, _result = SEARCHERS[type_name]
+        queryset = searchable(request.user)
+        if queryset is None:
+            continue
+        if remaining_ms() <= 0:
+            partial = True
+            break
+        try:
+            hits += [(score, type_name, row) for score, row in _search_type(index, queryset, query, limit, remaining_ms)]
+        except OperationalError:
+            # Statement cancelled by the time budget (PostgreSQL)
+            if remaining_ms() > 0:
+                raise
+            partial = True
+            break
+
+    results = []
+    for score, type_name, row in heapq.nlargest(limit, hits, key=lambda hit: hit[0]):
+        result = {'type': type_name, 'id': row.id, 'score': round(score, 4)}
+        result.update(SEARCHERS[type_name][2](row))
+        results.append(result)
+    return Response({'query': query, 'results': results, 'partial': partial})
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def stream_ticket(request):
+    """
+    Issue a single-use ticket for one event stream or chat socket
+    connection. EventSource and WebSocket cannot send headers, and a ticket
+    in the URL is harmless once used, unlike the access token.
+    """
+    return Response(
+        {'ticket': issue_ticket(request.user), 'expires_in': settings.REALTIME_TICKET_SECONDS},
+        status=status.HTTP_201_CREATED
+    )
+
+
+def _stream_user(request):
+    header = request.headers.get('Authorization', '')
+    if header.startswith('Bearer '):
+        return authenticate_token(header[len('Bearer '):])
+    return redeem_ticket(request.GET.get('ticket'))
+
+
+def _last_event_id(request):
+    value = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+async def event_stream(request):
+    """
+    Server-Sent Events for the current user: ``task.created``,
+    ``task.updated``, ``task.assignment``, ``activity.created`` and
+    ``task.due_soon`` for the tasks they can see.
+
+    Authenticate with ``Authorization: Bearer`` or, from browsers, a
+    ``?ticket=`` from ``stream_ticket`` (one per connection). Reconnecting
+    clients send ``Last-Event-ID`` (or ``?last_event_id=``) and get the
+    events they missed from the replay buffer, or a ``resync`` event when
+    those are gone. Needs the ASGI server.
+    """
+    if request.method != 'GET':
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({'error': 'The event stream is only served by the ASGI application'}, status=503)
+    user = await sync_to_async(_stream_user)(request)
+    if user is None:
+        return JsonResponse({'error': 'Authentication required'}, status=401)
+
+    start_due_soon_alerts()
+    topics = stream_topics(user)
+    last_event_id = _last_event_id(request)
+
+    async def events():
+        subscription = get_broker().subscribe(topics, after_id=last_event_id)
+        try:
+            yield f'retry: {settings.REALTIME_HEARTBEAT_SECONDS * 1000}\n\n'
+            while True:
+                try:
+                    event_id, event = await asyncio.wait_for(subscription.get(), settings.REALTIME_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ': keep-alive\n\n'
+                    continue
+                yield format_sse(event_id, event)
+        finally:
+            subscription.close()
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,245 @@
+"""
+Analytics queries shared by the task and project dashboards.
+
+Every helper runs a fixed number of queries however many tasks or members
+are involved. Per-member numbers come from ``TaskVisibility``, which holds
+one row per (user, task) for direct assignees and active TaskAssignments on
+active projects.
+"""
+from django.core.exceptions import EmptyResultSet
+from django.db import connections
+from django.db.models import Case, Count, F, FloatField, IntegerField, Q, Value, When, Window
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import RowNumber
+
+from .due import overdue_filter
+from .models import TaskVisibility
+
+# Cycle-time histogram buckets: (label, upper bound in seconds); the last is open-ended
+CYCLE_TIME_BUCKETS = [
+    ('<1h', 60 * 60),
+    ('<1d', 24 * 60 * 60),
+    ('<3d', 3 * 24 * 60 * 60),
+    ('<1w', 7 * 24 * 60 * 60),
+    ('<2w', 14 * 24 * 60 * 60),
+    ('<30d', 30 * 24 * 60 * 60),
+    ('30d+', None),
+]
+CYCLE_TIME_PERCENTILES = (50, 85, 95)
+# (percentile, 1-based offset) of the two ranks each percentile interpolates between
+RANK_KEYS = [(percentile, offset) for percentile in CYCLE_TIME_PERCENTILES for offset in (1, 2)]
+
+
+def full_name(first_name, last_name, username):
+    """Same rule as ``User.get_full_name`` for rows read with ``values()``"""
+    return f"{first_name} {last_name}".strip() or username
+
+
+def status_totals(tasks):
+    """
+    Count ``tasks`` overall, per status bucket and overdue in one aggregate query
+    """
+    return tasks.aggregate(
+        total=Count('id'),
+        completed=Count('id', filter=Q(status='done')),
+        in_progress=Count('id', filter=Q(status='in_progress')),
+        review=Count('id', filter=Q(status='review')),
+        todo=Count('id', filter=Q(status='todo')),
+        overdue=Count('id', filter=overdue_filter()),
+    )
+
+
+def priority_breakdown(tasks):
+    return list(tasks.values('priority').annotate(count=Count('id')).order_by('priority'))
+
+
+def member_breakdown(project=None):
+    """
+    Per-member status buckets for one project (or every active project), in
+    one GROUP BY query, ordered by name
+    """
+    links = TaskVisibility.objects.all()
+    if project is not None:
+        links = links.filter(project=project)
+    rows = links.values(
+        'user_id', 'user__first_name', 'user__last_name', 'user__username', 'user__email'
+    ).annotate(
+        total=Count('task_id'),
+        completed=Count('task_id', filter=Q(task__status='done')),
+        in_progress=Count('task_id', filter=Q(task__status='in_progress')),
+        review=Count('task_id', filter=Q(task__status='review')),
+        todo=Count('task_id', filter=Q(task__status='todo')),
+    ).order_by('user__first_name', 'user__last_name', 'user_id')
+
+    return [
+        {
+            'user_id': row['user_id'],
+            'first_name': row['user__first_name'],
+            'last_name': row['user__last_name'],
+            'name': full_name(row['user__first_name'], row['user__last_name'], row['user__username']),
+            'email': row['user__email'],
+            'total': row['total'],
+            'completed': row['completed'],
+            'in_progress': row['in_progress'],
+            'review': row['review'],
+            'todo': row['todo'],
+        }
+        for row in rows
+    ]
+
+
+def member_roles(project, user_ids):
+    """Map user id to the display label of their active project role ('Employee' if none)"""
+    from projects.models import ProjectMember
+
+    labels = dict(ProjectMember.ROLE_CHOICES)
+    roles = ProjectMember.objects.filter(project=project, user_id__in=user_ids, is_active=True).values_list('user_id', 'role')
+    found = {user_id: labels.get(role, role) for user_id, role in roles}
+    return {user_id: found.get(user_id, 'Employee') for user_id in user_ids}
+
+
+def recent_tasks_by_member(project, per_member=5):
+    """
+    Map user id to their ``per_member`` most recently updated tasks in
+    ``project``. A ROW_NUMBER() window partitioned by user keeps it to one query.
+    """
+    ranked = TaskVisibility.objects.filter(project=project).annotate(
+        member_position=Window(
+            expression=RowNumber(),
+            partition_by=[F('user_id')],
+            order_by=[F('task__updated_at').desc(), F('task_id').desc()],
+        )
+    ).filter(member_position__lte=per_member).values(
+        'user_id', 'task_id', 'task__title', 'task__status', 'task__priority', 'task__updated_at'
+    ).order_by('user_id', 'member_position')
+
+    recent = {}
+    for row in ranked:
+        recent.setdefault(row['user_id'], []).append({
+            'id': row['task_id'],
+            'title': row['task__title'],
+            'status': row['task__status'],
+            'priority': row['task__priority'],
+            'updated_at': row['task__updated_at'],
+        })
+    return recent
+
+
+def recent_completed_tasks(tasks, limit=10):
+    completed = tasks.filter(status='done').select_related('assignee').order_by(
+        F('completed_at').desc(nulls_last=True), '-updated_at'
+    )[:limit]
+    return [
+        {
+            'title': task.title,
+            'completed_at': task.completed_at or task.updated_at,
+            'completed_by': task.assignee.get_full_name() if task.assignee else 'Unknown',
+            'priority': task.priority,
+        }
+        for task in completed
+    ]
+
+
+def _seconds_between(connection, start_column, end_column):
+    """SQL for the number of seconds between two timestamp columns (PostgreSQL or SQLite)"""
+    if connection.vendor == 'postgresql':
+        return f'EXTRACT(EPOCH FROM ({end_column} - {start_column}))'
+    return f'(julianday({end_column}) - julianday({start_column})) * 86400.0'
+
+
+def cycle_time_stats(tasks, start_field='started_at', end_field='completed_at'):
+    """
+    Cycle-time statistics for the done tasks in ``tasks``: count, mean,
+    median, p85 and p95 (seconds, interpolated like ``percentile_cont``)
+    plus histograms by priority and by project - in one query. Pass
+    ``start_field='created_at'`` for lead time instead.
+
+    The inner query ranks every done task by cycle time with window
+    functions; the outer query groups by (priority, project, bucket) and
+    picks the rows sitting at each percentile's rank, so only a handful of
+    grouped rows leave the database however many tasks are done.
+    """
+    connection = connections[tasks.db]
+    opts = tasks.model._meta
+    quote = connection.ops.quote_name
+    seconds_sql = _seconds_between(
+        connection,
+        f'{quote(opts.db_table)}.{quote(opts.get_field(start_field).column)}',
+        f'{quote(opts.db_table)}.{quote(opts.get_field(end_field).column)}',
+    )
+
+    bucket = Case(
+        *[
+            When(cycle_seconds__lt=upper, then=Value(index))
+            for index, (_label, upper) in enumerate(CYCLE_TIME_BUCKETS) if upper is not None
+        ],
+        default=Value(len(CYCLE_TIME_BUCKETS) - 1),
+        output_field=IntegerField(),
+    )
+    ranked = tasks.filter(
+        status='done', **{f'{start_field}__isnull': False, f'{end_field}__isnull': False}
+    ).annotate(
+        cycle_seconds=RawSQL(seconds_sql, [], output_field=FloatField()),
+        project_name=F('project__name'),
+    ).annotate(
+        cycle_bucket=bucket,
+        cycle_position=Window(expression=RowNumber(), order_by=[F('cycle_seconds').asc(), F('id').asc()]),
+        cycle_count=Window(expression=Count('id')),
+    ).order_by().values('priority', 'project_id', 'project_name', 'cycle_bucket', 'cycle_seconds', 'cycle_position', 'cycle_count')
+
+    rank_columns = [
+        f'MAX(CASE WHEN cycle_position = ((cycle_count - 1) * {percentile}) / 100 + {offset} THEN cycle_seconds END)'
+        for percentile, offset in RANK_KEYS
+    ]
+    try:
+        inner_sql, params = ranked.query.sql_with_params()
+    except EmptyResultSet:
+        rows = []
+    else:
+        sql = (
+            'SELECT priority, project_id, project_name, cycle_bucket, COUNT(*), SUM(cycle_seconds), MAX(cycle_count), '
+            f'{", ".join(rank_columns)} FROM ({inner_sql}) cycle_times '
+            'GROUP BY priority, project_id, project_name, cycle_bucket'
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+
+    labels = [label for label, _upper in CYCLE_TIME_BUCKETS]
+    by_priority = {}
+    by_project = {}
+    rank_values = {}
+    count = 0
+    total_seconds = 0.0
+    for priority, project_id, project_name, bucket_index, bucket_count, bucket_seconds, done_count, *ranks in rows:
+        count = done_count
+        total_seconds += bucket_seconds or 0.0
+        by_priority.setdefault(priority, [0] * len(labels))[bucket_index] += bucket_count
+        project = by_project.setdefault(
+            project_id, {'project_id': project_id, 'project_name': project_name, 'counts': [0] * len(labels)}
+        )
+        project['counts'][bucket_index] += bucket_count
+        for key, value in zip(RANK_KEYS, ranks):
+            if value is not None:
+                rank_values[key] = value
+
+    stats = {'count': count, 'mean_seconds': round(total_seconds / count, 1) if count else 0}
+    for percentile in CYCLE_TIME_PERCENTILES:
+        name = 'median' if percentile == 50 else f'p{percentile}'
+        stats[f'{name}_seconds'] = _interpolate(rank_values, percentile, count)
+    stats['histogram'] = {
+        'buckets': labels,
+        'by_priority': by_priority,
+        'by_project': sorted(by_project.values(), key=lambda project: project['project_id']),
+    }
+    return stats
+
+
+def _interpolate(rank_values, percentile, count):
+    """Linear interpolation between the two ranks around the percentile, as percentile_cont does"""
+    if not count:
+        return 0
+    low = rank_values.get((percentile, 1), 0.0)
+    high = rank_values.get((percentile, 2), low)
+    fraction = ((count - 1) * percentile % 100) / 100
+    return round(low + (high - low) * fraction, 1)
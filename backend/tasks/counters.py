@@ -0,0 +1,70 @@
+"""
+Maintenance of the per-status task counters on Project.
+
+Every task write that can change a project's counts adjusts them with
+``F()`` updates in the same transaction: ``Task.save`` and ``post_delete``
+(which also covers cascades) do it for single tasks, and bulk paths call
+``adjust_project_counters`` themselves. ``repair_project_counters``
+recomputes them from the tasks table.
+"""
+from collections import Counter, defaultdict
+
+from django.db.models import Count, F
+
+from projects.models import Project
+from .models import Task
+
+STATUS_COUNTERS = {
+    'todo': 'tasks_todo',
+    'in_progress': 'tasks_in_progress',
+    'review': 'tasks_review',
+    'done': 'tasks_done',
+}
+COUNTER_FIELDS = ['tasks_total', *STATUS_COUNTERS.values()]
+
+
+def counter_changes(old, new):
+    """
+    Counter moves for one task going from ``old`` to ``new``, each a
+    ``(project_id, status)`` pair or None when the task did not / no longer exists
+    """
+    if old == new:
+        return []
+    changes = []
+    if old is not None:
+        changes.append((*old, -1))
+    if new is not None:
+        changes.append((*new, 1))
+    return changes
+
+
+def adjust_project_counters(changes, using=None):
+    """
+    Apply ``(project_id, status, delta)`` changes with one UPDATE per project
+    touched
+    """
+    deltas = defaultdict(Counter)
+    for project_id, status, delta in changes:
+        deltas[project_id]['tasks_total'] += delta
+        if status in STATUS_COUNTERS:
+            deltas[project_id][STATUS_COUNTERS[status]] += delta
+
+    projects = Project.objects.using(using) if using else Project.objects
+    for project_id, fields in sorted(deltas.items()):
+        updates = {field: F(field) + delta for field, delta in fields.items() if delta}
+        if updates:
+            projects.filter(id=project_id).update(**updates)
+
+
+def counted_values(projects):
+    """Map project id to the counter values recomputed from its tasks, in one GROUP BY"""
+    values = {project_id: dict.fromkeys(COUNTER_FIELDS, 0) for project_id in projects.values_list('id', flat=True)}
+    rows = Task.objects.filter(
+        project_id__in=list(values)
+    ).values('project_id', 'status').annotate(count=Count('id')).order_by()
+    for row in rows:
+        counts = values[row['project_id']]
+        counts['tasks_total'] += row['count']
+        if row['status'] in STATUS_COUNTERS:
+            counts[STATUS_COUNTERS[row['status']]] += row['count']
+    return values
@@ -0,0 +1,96 @@
+"""
+Due-date state of tasks, kept in ``Task.due_state``.
+
+An open task is ``due_soon`` once its due date is within ``DUE_SOON_HOURS``
+and ``overdue`` once it has passed; done tasks and tasks without a due date
+are ``none``. ``Task.save`` sets the state of the task being saved. Time
+passing is picked up by ``scan_due_tasks``, run by the ASGI server's
+in-process loop (started with the server) or by the ``scan_due_tasks``
+management command, which a WSGI deployment has to schedule. It reads only
+the tasks whose due date crossed a threshold since they were last marked,
+using the ``tasks_due_state_idx`` partial index. Each transition is therefore
+recorded and announced once. Reads trust the stored state but also count
+open tasks whose due date passed since the last scan (``overdue_filter``),
+so they stay correct when no scan is running.
+"""
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+# Only these statuses get due-soon and overdue inbox entries, and due-soon stream events
+DUE_ALERT_STATUSES = ['todo', 'in_progress']
+
+
+def due_state_for(status, due_date, now=None):
+    if due_date is None or status == 'done':
+        return 'none'
+    now = now or timezone.now()
+    if due_date <= now:
+        return 'overdue'
+    if due_date <= now + timedelta(hours=settings.DUE_SOON_HOURS):
+        return 'due_soon'
+    return 'none'
+
+
+def overdue_filter(now=None):
+    """
+    Overdue tasks: the stored state, plus open tasks whose due date passed
+    since the last scan (a range on ``tasks_due_state_idx`` that stays empty
+    while scans keep up)
+    """
+    now = now or timezone.now()
+    return Q(due_state='overdue') | (Q(due_state__in=['none', 'due_soon'], due_date__lte=now) & ~Q(status='done'))
+
+
+def record_due_transitions(transitions, using=None):
+    """
+    Fill the inboxes for tasks that just became due soon or overdue and
+    publish ``task.due_soon`` and ``task.overdue`` events after commit.
+    ``transitions`` holds ``(task_id, status, new_state)`` for the tasks
+    whose state changed.
+    """
+    from .inbox import notify_due
+    from .models import Task
+    from .realtime import publish_task_events
+
+    due_soon = [task_id for task_id, status, state in transitions if state == 'due_soon' and status in DUE_ALERT_STATUSES]
+    overdue = [task_id for task_id, _status, state in transitions if state == 'overdue']
+    alerted_overdue = [task_id for task_id, status, state in transitions if state == 'overdue' and status in DUE_ALERT_STATUSES]
+    if due_soon:
+        notify_due(Task.objects.using(using).filter(id__in=due_soon), 'due_soon')
+    if alerted_overdue:
+        notify_due(Task.objects.using(using).filter(id__in=alerted_overdue), 'overdue')
+    publish_task_events(due_soon, 'task.due_soon', using=using)
+    publish_task_events(overdue, 'task.overdue', using=using)
+
+
+def scan_due_tasks(now=None):
+    """
+    Move open tasks whose due date has crossed a threshold into ``due_soon``
+    or ``overdue`` and return how many went into each. Rows another scan or
+    save has locked are skipped; the next scan picks them up.
+    """
+    from .models import Task
+    from .sync import record_task_changes
+
+    now = now or timezone.now()
+    soon = now + timedelta(hours=settings.DUE_SOON_HOURS)
+    open_tasks = Task.objects.filter(due_date__isnull=False).exclude(status='done').order_by()
+    transitions = []
+    with transaction.atomic():
+        # Overdue first, so a task that skipped past the due-soon window is marked once
+        for state, previous, crossed in (
+            ('overdue', ['none', 'due_soon'], open_tasks.filter(due_date__lte=now)),
+            ('due_soon', ['none'], open_tasks.filter(due_date__gt=now, due_date__lte=soon)),
+        ):
+            rows = list(crossed.filter(due_state__in=previous).select_for_update(skip_locked=True).values_list('id', 'status'))
+            Task.objects.filter(id__in=[task_id for task_id, _status in rows]).update(due_state=state)
+            transitions += [(task_id, status, state) for task_id, status in rows]
+        # The serialized is_overdue changes, so delta sync clients refetch the tasks
+        record_task_changes([task_id for task_id, _status, _state in transitions])
+        record_due_transitions(transitions)
+    return Counter(state for _task_id, _status, state in transitions)
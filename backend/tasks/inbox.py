@@ -0,0 +1,218 @@
+"""
+Notification inbox, filled on write.
+
+When a TaskActivity or ProjectMessage is created, or a task becomes due
+soon or overdue, one ``Notification`` row is written per
+recipient and each recipient's ``NotificationInbox.unread_count`` is bumped.
+Those writes happen in the same transaction as the event. Reading the feed
+is then a range scan over one user's rows, and the unread badge is a single
+row. Recipients are the users who would see the event at the moment it
+happens; the actor is not notified of their own activity or message.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from accounts.models import User
+from taskflow.realtime import get_broker
+from .models import Notification, NotificationInbox, TaskActivity, TaskVisibility
+from .realtime import user_topic
+
+
+def scrum_master_ids():
+    return set(User.objects.filter(role='scrum_master', is_active=True).values_list('id', flat=True))
+
+
+def task_recipients(active_by_task):
+    """
+    Map task id to the users who see it: every Scrum Master when the project
+    is active, plus the users linked through TaskVisibility.
+    ``active_by_task`` maps task id to whether its project is active.
+    """
+    masters = scrum_master_ids() if any(active_by_task.values()) else set()
+    recipients = {task_id: set(masters) if active else set() for task_id, active in active_by_task.items()}
+    links = TaskVisibility.objects.filter(task_id__in=list(active_by_task)).values_list('task_id', 'user_id')
+    for task_id, user_id in links:
+        recipients[task_id].add(user_id)
+    return recipients
+
+
+def deliver(notifications):
+    """Write inbox entries, bump their users' unread counters and push them to open streams"""
+    if not notifications:
+        return
+    Notification.objects.bulk_create(notifications)
+    counts = defaultdict(int)
+    for notification in notifications:
+        counts[notification.user_id] += 1
+    NotificationInbox.objects.bulk_create(
+        [NotificationInbox(user_id=user_id) for user_id in sorted(counts)], ignore_conflicts=True
+    )
+    users_by_amount = defaultdict(list)
+    for user_id, amount in counts.items():
+        users_by_amount[amount].append(user_id)
+    for amount, user_ids in users_by_amount.items():
+        NotificationInbox.objects.filter(user_id__in=user_ids).update(unread_count=F('unread_count') + amount)
+
+    events = [(notification.user_id, notification.payload) for notification in notifications]
+
+    def publish():
+        broker = get_broker()
+        for user_id, payload in events:
+            broker.publish([user_topic(user_id)], {'type': 'notification.created', 'notification': payload})
+
+    transaction.on_commit(publish)
+
+
+def notify_activities(activity_ids):
+    """Fan new TaskActivity rows out to everyone who sees their task"""
+    deliver(activity_notifications(activity_ids))
+
+
+def activity_notifications(activity_ids):
+    """Unsaved inbox entries for TaskActivity rows, one per user who sees the task"""
+    rows = list(TaskActivity.objects.filter(id__in=list(activity_ids)).values(
+        'id', 'task_id', 'task__title', 'task__project__is_active', 'user_id', 'user__first_name', 'user__last_name',
+        'description', 'created_at'
+    ).order_by('id'))
+    if not rows:
+        return []
+    recipients = task_recipients({row['task_id']: row['task__project__is_active'] for row in rows})
+    notifications = []
+    for row in rows:
+        payload = {
+            'type': 'activity',
+            'id': row['id'],
+            'task_id': row['task_id'],
+            'task_title': row['task__title'],
+            'user_name': f"{row['user__first_name']} {row['user__last_name']}",
+            'description': row['description'],
+            'created_at': row['created_at'],
+        }
+        notifications += [
+            Notification(user_id=user_id, kind='activity', object_id=row['id'], payload=payload, created_at=row['created_at'])
+            for user_id in sorted(recipients[row['task_id']] - {row['user_id']})
+        ]
+    return notifications
+
+
+def notify_message(message):
+    """Fan a new ProjectMessage out to the project's owner and effective members"""
+    deliver(message_notifications(message))
+
+
+def message_notifications(message):
+    """Unsaved inbox entries for a ProjectMessage, one per recipient"""
+    from projects.models import EffectiveMembership, Project
+
+    project = Project.objects.filter(id=message.project_id, is_active=True).values('name', 'created_by_id').first()
+    if project is None:
+        return []
+    recipients = set(EffectiveMembership.objects.filter(project_id=message.project_id).values_list('user_id', flat=True))
+    recipients.add(project['created_by_id'])
+    recipients.discard(message.author_id)
+    payload = {
+        'type': 'message',
+        'id': message.id,
+        'project_id': message.project_id,
+        'project_name': project['name'],
+        'author_name': message.author.get_full_name(),
+        'content': message.content,
+        'created_at': message.created_at,
+    }
+    return [
+        Notification(user_id=user_id, kind='message', object_id=message.id, payload=payload, created_at=message.created_at)
+        for user_id in sorted(recipients)
+    ]
+
+
+def notify_due(tasks, kind):
+    """
+    Fan ``due_soon`` or ``overdue`` entries out for ``tasks`` (a Task
+    queryset) to everyone who sees them; the caller decides which tasks
+    just crossed that threshold
+    """
+    deliver(due_notifications(tasks, kind))
+
+
+def due_notifications(tasks, kind):
+    """Unsaved ``due_soon`` or ``overdue`` inbox entries for ``tasks``, one per user who sees each"""
+    rows = list(tasks.values('id', 'title', 'due_date', 'project__name', 'project__is_active'))
+    if not rows:
+        return []
+    recipients = task_recipients({row['id']: row['project__is_active'] for row in rows})
+    now = timezone.now()
+    notifications = []
+    for row in rows:
+        payload = {
+            'type': kind,
+            'id': row['id'],
+            'task_id': row['id'],
+            'task_title': row['title'],
+            'project_name': row['project__name'],
+            'due_date': row['due_date'],
+            'created_at': now,
+        }
+        if kind == 'overdue':
+            payload['content'] = f'Task "{row["title"]}" is overdue'
+        notifications += [
+            Notification(user_id=user_id, kind=kind, object_id=row['id'], payload=payload, created_at=now)
+            for user_id in sorted(recipients[row['id']])
+        ]
+    return notifications
+
+
+def human_eta(due_date, now):
+    hours = int((due_date - now).total_seconds() // 3600)
+    if hours <= 0:
+        return 'now'
+    if hours < 24:
+        return f'in {hours}h'
+    return f'in {hours // 24}d'
+
+
+def inbox_page(user, before=None, limit=None):
+    """
+    The user's newest entries (older than the ``before`` id when given),
+    their read cursor and unread count: two indexed lookups
+    """
+    limit = limit or settings.NOTIFICATION_PAGE_SIZE
+    inbox = NotificationInbox.objects.filter(user=user).values('last_read_id', 'unread_count').first()
+    inbox = inbox or {'last_read_id': 0, 'unread_count': 0}
+    entries = Notification.objects.filter(user=user)
+    if before is not None:
+        entries = entries.filter(id__lt=before)
+    rows = list(entries.order_by('-id').values('id', 'payload')[:limit + 1])
+
+    now = timezone.now()
+    items = []
+    for row in rows[:limit]:
+        item = dict(row['payload'], notification_id=row['id'], read=row['id'] <= inbox['last_read_id'])
+        if item['type'] == 'due_soon' and item.get('due_date'):
+            # The ETA is relative to when the feed is read, not when the entry was written
+            item['content'] = f'Task "{item["task_title"]}" is due {human_eta(parse_datetime(item["due_date"]), now)}'
+        items.append(item)
+    return {
+        'items': items,
+        'unread_count': inbox['unread_count'],
+        'last_read_id': inbox['last_read_id'],
+        'next_before': rows[limit - 1]['id'] if len(rows) > limit else None,
+    }
+
+
+def mark_read(user, up_to=None):
+    """Move the read cursor to ``up_to`` (default: the newest entry) and recount what is still unread"""
+    with transaction.atomic():
+        inbox, _created = NotificationInbox.objects.select_for_update().get_or_create(user=user)
+        latest = Notification.objects.filter(user=user).order_by('-id').values_list('id', flat=True).first() or 0
+        target = latest if up_to is None else min(up_to, latest)
+        if target > inbox.last_read_id:
+            inbox.last_read_id = target
+        inbox.unread_count = Notification.objects.filter(user=user, id__gt=inbox.last_read_id).count()
+        inbox.save(update_fields=['last_read_id', 'unread_count'])
+    return inbox
+
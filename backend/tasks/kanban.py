@@ -0,0 +1,91 @@
+"""
+Kanban board engine: reads every column in a single (windowed, when
+capped) query and pages individual columns with keyset cursors.
+"""
+import base64
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
+
+from .models import Task
+
+KANBAN_STATUSES = [value for value, _label in Task.STATUS_CHOICES]
+COLUMN_ORDERING = ('-created_at', '-id')
+
+
+class InvalidCursor(ValueError):
+    """Raised when a column cursor cannot be decoded"""
+
+
+def get_column_limit(raw_limit=None):
+    """Resolve the per-column limit from a query parameter, clamped to the configured maximum"""
+    default = getattr(settings, 'KANBAN_COLUMN_LIMIT', 50)
+    maximum = getattr(settings, 'KANBAN_MAX_COLUMN_LIMIT', 200)
+    if raw_limit in (None, ''):
+        return default
+    try:
+        limit = int(raw_limit)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(limit, maximum))
+
+
+def encode_cursor(task):
+    """Encode the position of the last task shown in a column"""
+    raw = f"{task.created_at.isoformat()}|{task.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Decode a column cursor into a (created_at, id) pair"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created_at, task_id = raw.rsplit('|', 1)
+        return datetime.fromisoformat(created_at), int(task_id)
+    except (ValueError, UnicodeError) as exc:
+        raise InvalidCursor('Invalid cursor') from exc
+
+
+def _split_page(tasks, limit):
+    """Trim the look-ahead row and return (page, next_cursor)"""
+    if limit is not None and len(tasks) > limit:
+        page = tasks[:limit]
+        return page, encode_cursor(page[-1])
+    return tasks, None
+
+
+def build_board(tasks, limit):
+    """
+    Return {status: (tasks, next_cursor)} for every column.
+
+    A ROW_NUMBER() window partitioned by status keeps at most ``limit + 1``
+    rows per column, so the whole board is read in one query and the extra
+    row tells us whether a column has more to load. With ``limit=None``
+    every task is returned and no column has a cursor.
+    """
+    ranked = tasks.order_by(*COLUMN_ORDERING)
+    if limit is not None:
+        ranked = ranked.annotate(
+            column_position=Window(
+                expression=RowNumber(),
+                partition_by=[F('status')],
+                order_by=[F('created_at').desc(), F('id').desc()],
+            )
+        ).filter(column_position__lte=limit + 1)
+
+    columns = {status: [] for status in KANBAN_STATUSES}
+    for task in ranked:
+        columns.setdefault(task.status, []).append(task)
+    return {status: _split_page(column, limit) for status, column in columns.items()}
+
+
+def load_column(tasks, status, cursor, limit):
+    """Return (tasks, next_cursor) for a single column, continuing after ``cursor``"""
+    column = tasks.filter(status=status)
+    if cursor:
+        created_at, task_id = decode_cursor(cursor)
+        column = column.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=task_id))
+    page = list(column.order_by(*COLUMN_ORDERING)[:limit + 1])
+    return _split_page(page, limit)
@@ -0,0 +1,86 @@
+"""
+Fill the notification inboxes with what happened before they existed.
+
+The inbox is filled on write, so activities and project messages from
+before the cut-over never reached it. This replays those from the last
+``--days`` days, oldest first so the feeds come out in order, and adds
+entries for tasks that are due soon or overdue right now. The cut-over is
+the oldest activity or message entry already in any inbox; only events
+before it are replayed, and due entries are skipped for users who already
+have one for that task, so the command can be re-run. Recipients are the
+users who can see each event today, as nothing records who could then.
+Backfilled entries count as unread.
+"""
+import heapq
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+
+from projects.models import ProjectMessage
+from tasks.due import DUE_ALERT_STATUSES
+from tasks.inbox import activity_notifications, deliver, due_notifications, message_notifications
+from tasks.models import Notification, Task, TaskActivity
+
+
+class Command(BaseCommand):
+    help = 'Backfill notification inboxes from past activities, messages and current due dates'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30, help='How far back to replay activities and messages')
+        parser.add_argument('--chunk-size', type=int, default=500, help='Events per transaction')
+
+    def handle(self, *args, days, chunk_size, **options):
+        now = timezone.now()
+        cutover = Notification.objects.filter(kind__in=['activity', 'message']).aggregate(
+            first=Min('created_at')
+        )['first'] or now
+        window = {'created_at__gte': now - timedelta(days=days), 'created_at__lt': cutover}
+
+        activities = TaskActivity.objects.filter(**window).order_by('created_at', 'id').values_list('created_at', 'id')
+        messages = ProjectMessage.objects.filter(**window).order_by('created_at', 'id').values_list('created_at', 'id')
+        events = heapq.merge(
+            ((created_at, 'activity', event_id) for created_at, event_id in activities.iterator()),
+            ((created_at, 'message', event_id) for created_at, event_id in messages.iterator()),
+        )
+
+        written = 0
+        chunk = []
+        for event in events:
+            chunk.append(event)
+            if len(chunk) == chunk_size:
+                written += self.replay(chunk)
+                chunk = []
+        written += self.replay(chunk)
+        self.stdout.write(f'Replayed events up to {cutover} ({written} entries)')
+
+        for kind in ('due_soon', 'overdue'):
+            with transaction.atomic():
+                tasks = Task.objects.filter(due_state=kind, status__in=DUE_ALERT_STATUSES)
+                existing = set(Notification.objects.filter(
+                    kind=kind, object_id__in=tasks.values('id')
+                ).values_list('user_id', 'object_id'))
+                notifications = [
+                    notification for notification in due_notifications(tasks, kind)
+                    if (notification.user_id, notification.object_id) not in existing
+                ]
+                deliver(notifications)
+            written += len(notifications)
+
+        self.stdout.write(self.style.SUCCESS(f'Backfilled {written} notifications'))
+
+    def replay(self, chunk):
+        if not chunk:
+            return 0
+        activity_ids = [event_id for _created_at, kind, event_id in chunk if kind == 'activity']
+        message_ids = [event_id for _created_at, kind, event_id in chunk if kind == 'message']
+        notifications = activity_notifications(activity_ids)
+        for message in ProjectMessage.objects.select_related('author').filter(id__in=message_ids):
+            notifications += message_notifications(message)
+        # Ids follow insertion order, and the feed is read newest id first
+        notifications.sort(key=lambda notification: (notification.created_at, notification.kind, notification.object_id))
+        with transaction.atomic():
+            deliver(notifications)
+        return len(notifications)
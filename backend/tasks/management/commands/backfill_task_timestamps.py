@@ -0,0 +1,76 @@
+"""
+Fill ``Task.started_at`` and ``Task.completed_at`` for tasks that predate them.
+
+Values come from the ``status_changed`` activity log: the first move out of
+To Do starts a task, whatever its status now (a task reopened to To Do keeps
+it, as ``Task.set_status`` does), and the latest move into Done completes it.
+Tasks past To Do with no usable activity fall back to ``created_at`` /
+``updated_at``. Work is done in
+id order, one chunk per transaction, so an interrupted run can be resumed
+with ``--after-id`` (or simply re-run, as filled tasks are skipped).
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max, Min, Q
+
+from tasks.models import Task, TaskActivity
+
+
+class Command(BaseCommand):
+    help = 'Backfill task started_at/completed_at from the status change history'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500, help='Tasks per transaction')
+        parser.add_argument('--after-id', type=int, default=0, help='Resume after this task id')
+        parser.add_argument('--force', action='store_true', help='Recompute tasks that already have values')
+
+    def handle(self, *args, chunk_size, after_id, force, **options):
+        tasks = Task.objects.order_by('id').only('id', 'status', 'created_at', 'updated_at', 'started_at', 'completed_at')
+        if not force:
+            tasks = tasks.filter(
+                Q(started_at__isnull=True) |
+                Q(completed_at__isnull=True, status='done')
+            )
+
+        updated = 0
+        last_id = after_id
+        while True:
+            chunk = list(tasks.filter(id__gt=last_id)[:chunk_size])
+            if not chunk:
+                break
+            with transaction.atomic():
+                updated += self.backfill_chunk(chunk, force)
+            last_id = chunk[-1].id
+            self.stdout.write(f'Processed tasks up to id {last_id} ({updated} updated)')
+
+        self.stdout.write(self.style.SUCCESS(f'Backfilled {updated} tasks'))
+
+    def backfill_chunk(self, chunk, force):
+        history = {
+            row['task_id']: row
+            for row in TaskActivity.objects.filter(
+                task_id__in=[task.id for task in chunk], activity_type='status_changed'
+            ).values('task_id').annotate(
+                first_started=Min('created_at', filter=~Q(new_value='todo')),
+                last_done=Max('created_at', filter=Q(new_value='done')),
+            ).order_by()
+        }
+
+        changed = []
+        for task in chunk:
+            row = history.get(task.id, {})
+            started_at, completed_at = task.started_at, task.completed_at
+            if force or started_at is None:
+                started_at = row.get('first_started') or (task.created_at if task.status != 'todo' else None)
+            if task.status == 'done' and (force or completed_at is None):
+                completed_at = row.get('last_done') or task.updated_at
+            if task.status != 'done':
+                completed_at = None
+            if started_at and completed_at and started_at > completed_at:
+                started_at = completed_at
+            if (started_at, completed_at) != (task.started_at, task.completed_at):
+                task.started_at, task.completed_at = started_at, completed_at
+                changed.append(task)
+
+        Task.objects.bulk_update(changed, ['started_at', 'completed_at'])
+        return len(changed)
@@ -0,0 +1,16 @@
+"""
+Drop task change log rows older than ``TASK_SYNC_RETENTION_DAYS``. Meant to
+run from cron once a day; sync clients holding a token from before the
+oldest kept row are told to do a full sync.
+"""
+from django.core.management.base import BaseCommand
+
+from tasks.sync import prune_task_changes
+
+
+class Command(BaseCommand):
+    help = 'Delete task sync changes older than the retention window'
+
+    def handle(self, *args, **options):
+        deleted = prune_task_changes()
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} task changes'))
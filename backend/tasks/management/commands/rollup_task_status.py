@@ -0,0 +1,18 @@
+"""
+Bring the daily task status snapshots up to date. Meant to run from cron
+(every few minutes is fine: each run only reads what changed since the last).
+"""
+from django.core.management.base import BaseCommand
+
+from tasks.snapshots import update_status_snapshots
+
+
+class Command(BaseCommand):
+    help = 'Update the per-project daily task status snapshots from new tasks and status changes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true', help='Discard the snapshots and replay the whole history')
+
+    def handle(self, *args, rebuild, **options):
+        changed = update_status_snapshots(rebuild=rebuild)
+        self.stdout.write(self.style.SUCCESS(f'Updated {changed} daily snapshots'))
@@ -0,0 +1,34 @@
+"""
+Mark open tasks that became due soon or overdue. Meant to run from cron
+every minute or so, or with ``--loop`` as a long-running worker. Runs only
+touch the tasks that crossed a threshold since the previous one, so they are
+cheap and can overlap with the ASGI server's own scan.
+"""
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from tasks.due import scan_due_tasks
+
+
+class Command(BaseCommand):
+    help = 'Move tasks whose due date passed a threshold into the due soon or overdue state'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep scanning until interrupted')
+        parser.add_argument(
+            '--interval', type=int, default=settings.DUE_ALERT_SCAN_SECONDS or 60, help='Seconds between scans with --loop'
+        )
+
+    def handle(self, *args, loop, interval, **options):
+        while True:
+            close_old_connections()
+            counts = scan_due_tasks()
+            self.stdout.write(self.style.SUCCESS(
+                f"Marked {counts['due_soon']} tasks due soon and {counts['overdue']} overdue"
+            ))
+            if not loop:
+                break
+            time.sleep(interval)
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.7 on 2026-10-17 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0006_taskchange'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['project', 'status'], name='tasks_project_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['assignee', 'status'], name='tasks_assignee_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['created_at', 'id'], name='tasks_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('due_date__isnull', False)), fields=['status', 'due_date'], name='tasks_status_due_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taskactivity',
+            index=models.Index(fields=['task', 'created_at'], name='task_activity_task_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taskactivity',
+            index=models.Index(fields=['created_at', 'id'], name='task_activity_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taskassignment',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['user', 'task'], name='task_assign_active_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='timesession',
+            index=models.Index(fields=['user', 'start_time'], name='time_session_user_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='timesession',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['user', 'start_time'], name='time_session_active_user_idx'),
+        ),
+    ]
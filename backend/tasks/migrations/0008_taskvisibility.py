@@ -0,0 +1,50 @@
+# Generated by Django 4.2.7 on 2026-10-17 11:20
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_task_visibility(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    TaskAssignment = apps.get_model('tasks', 'TaskAssignment')
+    TaskVisibility = apps.get_model('tasks', 'TaskVisibility')
+
+    links = set(
+        Task.objects.filter(project__is_active=True, assignee__isnull=False)
+        .values_list('id', 'assignee_id', 'project_id')
+    )
+    links |= set(
+        TaskAssignment.objects.filter(is_active=True, task__project__is_active=True)
+        .values_list('task_id', 'user_id', 'task__project_id')
+    )
+    TaskVisibility.objects.bulk_create(
+        [TaskVisibility(task_id=task_id, user_id=user_id, project_id=project_id) for task_id, user_id, project_id in links],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('projects', '0003_hot_path_indexes'),
+        ('tasks', '0007_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskVisibility',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_visibility', to='projects.project')),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='visibility', to='tasks.task')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='visible_task_links', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'task_visibility',
+                'unique_together': {('user', 'task')},
+            },
+        ),
+        migrations.RunPython(populate_task_visibility, migrations.RunPython.noop),
+    ]
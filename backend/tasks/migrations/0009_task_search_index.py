@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-17 12:40
+
+from django.db import migrations
+
+from tasks.search import install_search_index, remove_search_index
+
+
+def install(apps, schema_editor):
+    install_search_index(schema_editor)
+
+
+def remove(apps, schema_editor):
+    remove_search_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0008_taskvisibility'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, remove),
+    ]
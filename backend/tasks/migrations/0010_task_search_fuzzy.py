@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-17 13:30
+
+from django.db import migrations
+
+from tasks.search import TASK_INDEX
+
+
+def reinstall(apps, schema_editor):
+    # Rebuild the SQLite FTS table with the prefix-friendly tokenizer; on both
+    # backends this adds the trigram index / vocabulary table used by global search
+    if schema_editor.connection.vendor == 'sqlite':
+        TASK_INDEX.remove(schema_editor)
+    TASK_INDEX.install(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0009_task_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(reinstall, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.7 on 2026-10-17 12:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0004_search_index'),
+        ('tasks', '0011_task_started_completed_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('last_task_id', models.BigIntegerField(default=0)),
+                ('last_activity_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'rollup_watermarks',
+            },
+        ),
+        migrations.CreateModel(
+            name='TaskStatusSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('todo', models.IntegerField(default=0)),
+                ('in_progress', models.IntegerField(default=0)),
+                ('review', models.IntegerField(default=0)),
+                ('done', models.IntegerField(default=0)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_snapshots', to='projects.project')),
+            ],
+            options={
+                'db_table': 'task_status_snapshots',
+                'ordering': ['project', 'date'],
+                'unique_together': {('project', 'date')},
+            },
+        ),
+    ]
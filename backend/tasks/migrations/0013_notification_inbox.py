@@ -0,0 +1,46 @@
+# Generated by Django 4.2.7 on 2026-10-17 17:05
+
+from django.conf import settings
+import django.core.serializers.json
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tasks', '0012_task_status_snapshots'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationInbox',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='notification_inbox', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('last_read_id', models.BigIntegerField(default=0)),
+                ('unread_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'notification_inboxes',
+            },
+        ),
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('activity', 'Activity'), ('message', 'Message'), ('due_soon', 'Due Soon')], max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('payload', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'notifications',
+                'ordering': ['-id'],
+                'indexes': [models.Index(fields=['user', '-id'], name='notifications_user_id_idx')],
+            },
+        ),
+    ]
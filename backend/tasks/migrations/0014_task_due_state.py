@@ -0,0 +1,43 @@
+# Generated by Django 4.2.7 on 2026-10-17 17:30
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+from tasks.search import TASK_INDEX
+
+
+def reinstall_search_index(apps, schema_editor):
+    # Adding a column with a default rebuilds the table on SQLite, which drops the FTS triggers
+    TASK_INDEX.install(schema_editor)
+
+
+def fill_due_states(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    now = timezone.now()
+    open_tasks = Task.objects.filter(due_date__isnull=False).exclude(status='done')
+    open_tasks.filter(due_date__lte=now).update(due_state='overdue')
+    open_tasks.filter(due_date__gt=now, due_date__lte=now + timedelta(hours=settings.DUE_SOON_HOURS)).update(due_state='due_soon')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0013_notification_inbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='due_state',
+            field=models.CharField(choices=[('none', 'None'), ('due_soon', 'Due Soon'), ('overdue', 'Overdue')], default='none', editable=False, max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('due_date__isnull', False), models.Q(('status', 'done'), _negated=True)), fields=['due_state', 'due_date'], name='tasks_due_state_idx'),
+        ),
+        migrations.RunPython(reinstall_search_index, migrations.RunPython.noop),
+        migrations.RunPython(fill_due_states, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-17 17:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0014_task_due_state'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='notification',
+            name='kind',
+            field=models.CharField(choices=[('activity', 'Activity'), ('message', 'Message'), ('due_soon', 'Due Soon'), ('overdue', 'Overdue')], max_length=20),
+        ),
+    ]
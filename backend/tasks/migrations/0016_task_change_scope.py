@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-17 18:00
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def fill_change_projects(apps, schema_editor):
+    # Rows for tasks that are gone keep no project; only Scrum Masters syncing every project see them
+    Task = apps.get_model('tasks', 'Task')
+    TaskChange = apps.get_model('tasks', 'TaskChange')
+    TaskChange.objects.update(
+        project_id=Subquery(Task.objects.filter(id=OuterRef('task_id')).values('project_id')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0015_notification_overdue_kind'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='taskchange',
+            name='project_id',
+            field=models.BigIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name='taskchange',
+            name='user_id',
+            field=models.BigIntegerField(null=True),
+        ),
+        migrations.RunPython(fill_change_projects, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-17 18:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0016_task_change_scope'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='taskchange',
+            index=models.Index(fields=['task_id', 'id'], name='task_changes_task_idx'),
+        ),
+    ]
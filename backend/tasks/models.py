@@ -1,5 +1,63 @@
-from django.db import models
+from django.db import models, router, transaction
+from django.db.models import Count, OuterRef, Prefetch, Q, Subquery, Value
+from django.db.models.functions import Coalesce
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+
+class TaskQuerySet(models.QuerySet):
+    """
+    Custom queryset for Task with reusable query plans
+    """
+    def visible_to(self, user):
+        """
+        Tasks the user can see: every task in an active project for Scrum
+        Masters; otherwise the tasks listed for them in TaskVisibility.
+        """
+        if user.is_scrum_master():
+            return self.filter(project__is_active=True)
+        return self.filter(visibility__user=user)
+    
+    def with_list_data(self, fields=None):
+        """
+        Bring in everything TaskSerializer renders in a fixed number of queries:
+        comment counts via annotation, plus the latest comment and active
+        assignees (with their users) via prefetches.
+
+        ``fields`` is the set of serializer fields being rendered; joins,
+        annotations and prefetches for fields outside it are skipped.
+        """
+        def wanted(*names):
+            return fields is None or any(name in fields for name in names)
+        
+        queryset = self
+        related = [
+            relation for relation, field in (
+                ('assignee', 'assignee_name'), ('created_by', 'created_by_name'), ('project', 'project_name')
+            ) if wanted(field)
+        ]
+        if related:
+            queryset = queryset.select_related(*related)
+        if wanted('comments_count'):
+            comment_counts = TaskComment.objects.filter(task=OuterRef('pk')).order_by().values('task').annotate(
+                total=Count('id')
+            ).values('total')
+            queryset = queryset.annotate(comments_total=Coalesce(Subquery(comment_counts), Value(0)))
+        if wanted('latest_comment'):
+            latest_comment_ids = TaskComment.objects.filter(task=OuterRef('task')).order_by('-created_at', '-id').values('id')[:1]
+            queryset = queryset.prefetch_related(Prefetch(
+                'comments',
+                queryset=TaskComment.objects.filter(id=Subquery(latest_comment_ids)).select_related('author'),
+                to_attr='latest_comments'
+            ))
+        if wanted('assignees', 'assignee_count'):
+            queryset = queryset.prefetch_related(Prefetch(
+                'assignments',
+                queryset=TaskAssignment.objects.filter(is_active=True).select_related('user'),
+                to_attr='active_assignments'
+            ))
+        return queryset
 
 
 class Task(models.Model):
@@ -20,6 +78,12 @@ class Task(models.Model):
         ('done', 'Done'),
     ]
     
+    DUE_STATE_CHOICES = [
+        ('none', 'None'),
+        ('due_soon', 'Due Soon'),
+        ('overdue', 'Overdue'),
+    ]
+    
     title = models.CharField(max_length=200)
     description = models.TextField(blank=True)
     project = models.ForeignKey('projects.Project', on_delete=models.CASCADE, related_name='tasks')
@@ -30,29 +94,114 @@ class Task(models.Model):
     due_date = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Maintained by set_status(); completed_at is cleared when a task is reopened
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    # Set on save and advanced by tasks.due.scan_due_tasks as due dates pass
+    due_state = models.CharField(max_length=10, choices=DUE_STATE_CHOICES, default='none', editable=False)
+    
+    objects = TaskQuerySet.as_manager()
     
     class Meta:
         db_table = 'tasks'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['project', 'status'], name='tasks_project_status_idx'),
+            models.Index(fields=['assignee', 'status'], name='tasks_assignee_status_idx'),
+            models.Index(fields=['created_at', 'id'], name='tasks_created_id_idx'),
+            # Overdue and due-soon scans: one range per open status, tasks without a due date left out
+            models.Index(
+                fields=['status', 'due_date'],
+                condition=Q(due_date__isnull=False),
+                name='tasks_status_due_date_idx'
+            ),
+            # Due-state scans: open dated tasks by state, then the due date range that crossed a threshold
+            models.Index(
+                fields=['due_state', 'due_date'],
+                condition=Q(due_date__isnull=False) & ~Q(status='done'),
+                name='tasks_due_state_idx'
+            ),
+            # Lead/cycle-time reports over a completion window
+            models.Index(
+                fields=['project', 'completed_at'],
+                condition=Q(completed_at__isnull=False),
+                name='tasks_project_completed_idx'
+            ),
+        ]
     
     def __str__(self):
         return f"{self.title} - {self.get_status_display()}"
     
+    def save(self, *args, **kwargs):
+        """
+        Save, keeping ``due_state`` in step, and move the project task
+        counters in the same transaction. The previous project, status and
+        due state are read with a row lock, so concurrent saves of one task
+        cannot count or announce a transition twice.
+        """
+        from .counters import adjust_project_counters, counter_changes
+        from .due import due_state_for, record_due_transitions
+        
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and not {'status', 'due_date', 'project', 'project_id'} & set(update_fields):
+            return super().save(*args, **kwargs)
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'due_state'}
+        using = kwargs.get('using') or router.db_for_write(Task, instance=self)
+        with transaction.atomic(using=using):
+            old = None
+            if not self._state.adding and self.pk is not None:
+                old = Task.objects.using(using).select_for_update().filter(pk=self.pk).values_list(
+                    'project_id', 'status', 'due_state'
+                ).first()
+            self.due_state = due_state_for(self.status, self.due_date)
+            super().save(*args, **kwargs)
+            adjust_project_counters(counter_changes(old[:2] if old else None, (self.project_id, self.status)), using=using)
+            if old and old[0] != self.project_id:
+                # Sync clients filtering on the old project need to hear the task left it
+                from .sync import record_task_changes
+                record_task_changes([self.id], project_id=old[0])
+            if self.due_state != (old[2] if old else 'none'):
+                record_due_transitions([(self.id, self.status, self.due_state)], using=using)
+    
+    def set_status(self, new_status, when=None):
+        """
+        Change the status, keeping ``started_at`` (first move out of To Do)
+        and ``completed_at`` (latest move into Done) in step. The caller saves.
+        """
+        when = when or timezone.now()
+        if new_status != 'todo' and self.started_at is None:
+            self.started_at = when
+        if new_status == 'done':
+            if self.status != 'done' or self.completed_at is None:
+                self.completed_at = when
+        else:
+            self.completed_at = None
+        self.status = new_status
+    
     @property
     def is_overdue(self):
-        if self.due_date and self.status != 'done':
-            from django.utils import timezone
-            return timezone.now() > self.due_date
-        return False
+        from .due import due_state_for
+        
+        # due_state lags behind the clock until the next scan; a passed due date counts meanwhile
+        return self.due_state == 'overdue' or due_state_for(self.status, self.due_date) == 'overdue'
+    
+    def get_active_assignments(self):
+        """Return active assignments, using the prefetched list when available"""
+        if hasattr(self, 'active_assignments'):
+            return self.active_assignments
+        return list(self.assignments.filter(is_active=True).select_related('user'))
     
     @property
     def assignees(self):
         """Get all active assignees for this task"""
-        return [assignment.user for assignment in self.assignments.filter(is_active=True)]
+        return [assignment.user for assignment in self.get_active_assignments()]
     
     @property
     def assignee_count(self):
         """Get count of active assignees"""
+        if hasattr(self, 'active_assignments'):
+            return len(self.active_assignments)
         return self.assignments.filter(is_active=True).count()
 
 
@@ -69,6 +218,9 @@ class TaskAssignment(models.Model):
         db_table = 'task_assignments'
         unique_together = ['task', 'user']
         ordering = ['-assigned_at']
+        indexes = [
+            models.Index(fields=['user', 'task'], condition=Q(is_active=True), name='task_assign_active_user_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.get_full_name()} assigned to {self.task.title}"
@@ -116,6 +268,10 @@ class TaskActivity(models.Model):
     class Meta:
         db_table = 'task_activities'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['task', 'created_at'], name='task_activity_task_created_idx'),
+            models.Index(fields=['created_at', 'id'], name='task_activity_created_id_idx'),
+        ]
     
     def __str__(self):
         return f"{self.get_activity_type_display()} by {self.user.get_full_name()} on {self.task.title}"
@@ -139,6 +295,10 @@ class TimeSession(models.Model):
     class Meta:
         db_table = 'time_sessions'
         ordering = ['-start_time']
+        indexes = [
+            models.Index(fields=['user', 'start_time'], name='time_session_user_start_idx'),
+            models.Index(fields=['user', 'start_time'], condition=Q(is_active=True), name='time_session_active_user_idx'),
+        ]
     
     def __str__(self):
         return f"Time session for {self.task_title or 'General Work'} by {self.user.get_full_name()}"
@@ -150,4 +310,134 @@ class TimeSession(models.Model):
         hours = total_seconds // 3600
         minutes = (total_seconds % 3600) // 60
         seconds = total_seconds % 60
-        return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
\ No newline at end of file
+        return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+
+class TaskVisibility(models.Model):
+    """
+    Materialized link between a task and each user who can see it: the direct
+    assignee and every active TaskAssignment user, for tasks in active projects.
+    Kept current by tasks.signals via tasks.visibility.refresh_task_visibility.
+    """
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='visibility')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='visible_task_links')
+    project = models.ForeignKey('projects.Project', on_delete=models.CASCADE, related_name='task_visibility')
+    
+    class Meta:
+        db_table = 'task_visibility'
+        unique_together = ['user', 'task']
+    
+    def __str__(self):
+        return f"Task {self.task_id} visible to user {self.user_id}"
+
+
+class TaskChange(models.Model):
+    """
+    Append-only log of task changes used for incremental sync.
+    The auto-incrementing id is the monotonic sync sequence. Rows with a
+    ``user_id`` record that this user lost sight of the task.
+    """
+    task_id = models.BigIntegerField()
+    project_id = models.BigIntegerField(null=True)
+    user_id = models.BigIntegerField(null=True)
+    is_deleted = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'task_changes'
+        ordering = ['id']
+        indexes = [
+            # Newest change of a task set (conditional GET validators)
+            models.Index(fields=['task_id', 'id'], name='task_changes_task_idx'),
+        ]
+    
+    def __str__(self):
+        action = 'deleted' if self.is_deleted else 'changed'
+        return f"Task {self.task_id} {action} (#{self.id})"
+
+
+class TaskStatusSnapshot(models.Model):
+    """
+    Number of a project's tasks in each status at the end of ``date``.
+    Rows are only written for days on which something changed; a missing day
+    has the counts of the latest row before it. Maintained incrementally from
+    the activity log by tasks.snapshots.update_status_snapshots.
+    """
+    project = models.ForeignKey('projects.Project', on_delete=models.CASCADE, related_name='status_snapshots')
+    date = models.DateField()
+    todo = models.IntegerField(default=0)
+    in_progress = models.IntegerField(default=0)
+    review = models.IntegerField(default=0)
+    done = models.IntegerField(default=0)
+    
+    class Meta:
+        db_table = 'task_status_snapshots'
+        ordering = ['project', 'date']
+        unique_together = ['project', 'date']
+    
+    def __str__(self):
+        return f"Project {self.project_id} on {self.date}"
+
+
+class RollupWatermark(models.Model):
+    """
+    How far an incremental rollup job has read: the last task and activity
+    ids it has folded in.
+    """
+    name = models.CharField(max_length=50, unique=True)
+    last_task_id = models.BigIntegerField(default=0)
+    last_activity_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'rollup_watermarks'
+    
+    def __str__(self):
+        return f"{self.name}: task {self.last_task_id}, activity {self.last_activity_id}"
+
+
+class Notification(models.Model):
+    """
+    One entry in a user's notification inbox, written when the activity,
+    message or due-date window it reports happens (tasks.inbox). ``payload``
+    holds everything the feed renders, so reading the inbox is a range scan
+    over (user, id) with no joins. Entries outlive the objects they mention.
+    """
+    KIND_CHOICES = [
+        ('activity', 'Activity'),
+        ('message', 'Message'),
+        ('due_soon', 'Due Soon'),
+        ('overdue', 'Overdue'),
+    ]
+    
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='notifications')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    payload = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        db_table = 'notifications'
+        ordering = ['-id']
+        indexes = [
+            models.Index(fields=['user', '-id'], name='notifications_user_id_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.kind} {self.object_id} for user {self.user_id}"
+
+
+class NotificationInbox(models.Model):
+    """
+    Read cursor and unread counter of a user's notification inbox. Fan-out
+    bumps ``unread_count`` with the entries it writes; marking as read moves
+    ``last_read_id`` and recounts, so the badge never needs a COUNT.
+    """
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name='notification_inbox')
+    last_read_id = models.BigIntegerField(default=0)
+    unread_count = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        db_table = 'notification_inboxes'
+    
+    def __str__(self):
+        return f"Inbox of user {self.user_id}: {self.unread_count} unread"
@@ -0,0 +1,146 @@
+"""
+Task events for the Server-Sent Events stream (``taskflow.views.event_stream``).
+
+Every event goes to ``tasks:all``, which Scrum Masters follow, when the
+task's project is active, and to ``user:<id>`` for each user who sees the
+task through ``TaskVisibility``. Audiences are resolved after the change
+commits, so they include the visibility links the change itself created.
+"""
+import asyncio
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from taskflow.realtime import get_broker
+
+ALL_TASKS_TOPIC = 'tasks:all'
+
+logger = logging.getLogger(__name__)
+_due_alerts = None
+
+
+def user_topic(user_id):
+    return f'user:{user_id}'
+
+
+def stream_topics(user):
+    """Topics a user's event stream follows"""
+    if user.is_scrum_master():
+        return [ALL_TASKS_TOPIC, user_topic(user.id)]
+    return [user_topic(user.id)]
+
+
+def task_audiences(rows):
+    """Map task id to the topics of everyone who sees it (``rows`` need ``id`` and ``project__is_active``)"""
+    from .models import TaskVisibility
+
+    audiences = {row['id']: [ALL_TASKS_TOPIC] if row['project__is_active'] else [] for row in rows}
+    links = TaskVisibility.objects.filter(task_id__in=list(audiences)).values_list('task_id', 'user_id')
+    for task_id, user_id in links:
+        audiences[task_id].append(user_topic(user_id))
+    return audiences
+
+
+def task_payload(row):
+    return {
+        'id': row['id'],
+        'title': row['title'],
+        'status': row['status'],
+        'priority': row['priority'],
+        'project_id': row['project_id'],
+        'assignee_id': row['assignee_id'],
+        'due_date': row['due_date'],
+        'updated_at': row['updated_at'],
+    }
+
+
+def task_rows(tasks):
+    return list(tasks.values(
+        'id', 'title', 'status', 'priority', 'project_id', 'project__is_active', 'assignee_id', 'due_date', 'updated_at'
+    ))
+
+
+def publish_tasks(tasks, event_type):
+    """Publish one ``event_type`` event per task in the ``tasks`` queryset, in two queries"""
+    rows = task_rows(tasks)
+    audiences = task_audiences(rows)
+    broker = get_broker()
+    for row in rows:
+        if audiences[row['id']]:
+            broker.publish(audiences[row['id']], {'type': event_type, 'task': task_payload(row)})
+
+
+def publish_task_events(task_ids, event_type, using=None):
+    """
+    After the current transaction commits, publish ``task.created``,
+    ``task.updated``, ``task.assignment``, ``task.due_soon`` or
+    ``task.overdue`` events for ``task_ids``
+    """
+    from .models import Task
+
+    task_ids = list(task_ids)
+    if task_ids:
+        transaction.on_commit(lambda: publish_tasks(Task.objects.filter(id__in=task_ids), event_type), using=using)
+
+
+def publish_activities(activity_ids, using=None):
+    """After the current transaction commits, publish ``activity.created`` events"""
+    from .models import TaskActivity
+
+    def publish():
+        rows = list(TaskActivity.objects.filter(id__in=activity_ids).values(
+            'id', 'task_id', 'task__title', 'task__project__is_active', 'activity_type', 'description',
+            'user__first_name', 'user__last_name', 'created_at'
+        ).order_by('id'))
+        audiences = task_audiences([
+            {'id': row['task_id'], 'project__is_active': row['task__project__is_active']} for row in rows
+        ])
+        broker = get_broker()
+        for row in rows:
+            if audiences[row['task_id']]:
+                broker.publish(audiences[row['task_id']], {'type': 'activity.created', 'activity': {
+                    'id': row['id'],
+                    'task_id': row['task_id'],
+                    'task_title': row['task__title'],
+                    'activity_type': row['activity_type'],
+                    'user_name': f"{row['user__first_name']} {row['user__last_name']}".strip(),
+                    'description': row['description'],
+                    'created_at': row['created_at'],
+                }})
+
+    activity_ids = list(activity_ids)
+    if activity_ids:
+        transaction.on_commit(publish, using=using)
+
+
+def _scan_due_tasks():
+    from .due import scan_due_tasks
+
+    close_old_connections()
+    scan_due_tasks()
+
+
+async def due_soon_alerts():
+    """Scan for tasks crossing their due thresholds every ``DUE_ALERT_SCAN_SECONDS`` while the ASGI server runs"""
+    while True:
+        await asyncio.sleep(settings.DUE_ALERT_SCAN_SECONDS)
+        try:
+            await sync_to_async(_scan_due_tasks)()
+        except Exception:
+            logger.exception('Due date scan failed')
+
+
+def start_due_soon_alerts():
+    """
+    Start the due date scan on the running event loop, once: at ASGI
+    startup, and again from the event stream in case the server skipped
+    the lifespan protocol
+    """
+    global _due_alerts
+    if not settings.DUE_ALERT_SCAN_SECONDS:
+        return
+    loop = asyncio.get_running_loop()
+    if _due_alerts is None or _due_alerts.done() or _due_alerts.get_loop() is not loop:
+        _due_alerts = loop.create_task(due_soon_alerts())
@@ -0,0 +1,44 @@
+"""
+Full-text search over task titles and descriptions, backing the task list
+``?search=`` parameter and the task part of the global search.
+"""
+from django.db.models import F
+from rest_framework import filters
+from rest_framework.settings import api_settings
+
+from taskflow.search import FullTextIndex
+
+TASK_INDEX = FullTextIndex('tasks', [('title', 'A'), ('description', 'B')], fuzzy_expression='title')
+
+
+def install_search_index(schema_editor):
+    TASK_INDEX.install(schema_editor)
+
+
+def remove_search_index(schema_editor):
+    TASK_INDEX.remove(schema_editor)
+
+
+def search_tasks(queryset, text):
+    """
+    Filter ``queryset`` to tasks matching every word of ``text`` as a word
+    prefix and annotate ``search_rank``, higher being better. Title matches
+    outrank description matches.
+    """
+    return TASK_INDEX.search(queryset, text)
+
+
+class TaskSearchFilter(filters.SearchFilter):
+    """
+    ``?search=`` backed by the full-text index. Results are ordered by rank
+    unless the client asks for an explicit ``?ordering=``, so list it after
+    ``OrderingFilter`` in ``filter_backends``.
+    """
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        queryset = search_tasks(queryset, ' '.join(terms))
+        if 'search_rank' not in queryset.query.annotations or request.query_params.get(api_settings.ORDERING_PARAM):
+            return queryset
+        return queryset.order_by(F('search_rank').desc(nulls_last=True), '-created_at', '-id')
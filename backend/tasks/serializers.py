@@ -1,7 +1,10 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from .models import Task, TaskComment, TaskActivity, TaskAssignment, TimeSession
+from .visibility import refresh_task_visibility
+from .realtime import publish_task_events
 from projects.serializers import ProjectSerializer
+from taskflow.serializers import SparseFieldsetMixin
 
 User = get_user_model()
 
@@ -43,9 +46,9 @@ class TaskActivitySerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'user', 'created_at')
 
 
-class TaskSerializer(serializers.ModelSerializer):
+class TaskSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
-    Serializer for Task model
+    Serializer for Task model (supports ?fields= / ?omit=)
     """
     assignee_name = serializers.CharField(source='assignee.get_full_name', read_only=True)
     created_by_name = serializers.CharField(source='created_by.get_full_name', read_only=True)
@@ -61,23 +64,29 @@ class TaskSerializer(serializers.ModelSerializer):
         fields = (
             'id', 'title', 'description', 'project', 'project_name', 'assignee', 'assignee_name',
             'created_by', 'created_by_name', 'priority', 'status', 'due_date', 'created_at',
-            'updated_at', 'is_overdue', 'comments_count', 'latest_comment', 'assignees', 'assignee_count'
+            'updated_at', 'started_at', 'completed_at', 'is_overdue', 'comments_count', 'latest_comment',
+            'assignees', 'assignee_count'
         )
-        read_only_fields = ('id', 'created_by', 'created_at', 'updated_at')
+        read_only_fields = ('id', 'created_by', 'created_at', 'updated_at', 'started_at', 'completed_at')
     
     def get_comments_count(self, obj):
+        # Use annotated comment count if available, otherwise count manually
+        if hasattr(obj, 'comments_total'):
+            return obj.comments_total
         return obj.comments.count()
     
     def get_latest_comment(self, obj):
-        latest_comment = obj.comments.order_by('-created_at').first()
+        if hasattr(obj, 'latest_comments'):
+            latest_comment = obj.latest_comments[0] if obj.latest_comments else None
+        else:
+            latest_comment = obj.comments.select_related('author').order_by('-created_at', '-id').first()
         if latest_comment:
             return TaskCommentSerializer(latest_comment).data
         return None
     
     def get_assignees(self, obj):
         """Get all active assignees for this task"""
-        assignments = obj.assignments.filter(is_active=True)
-        return TaskAssignmentSerializer(assignments, many=True).data
+        return TaskAssignmentSerializer(obj.get_active_assignments(), many=True).data
 
 
 class TaskCreateUpdateSerializer(serializers.ModelSerializer):
@@ -119,7 +128,11 @@ class TaskCreateUpdateSerializer(serializers.ModelSerializer):
             raise drf_serializers.ValidationError(errors)
         
         validated_data['created_by'] = request_user
-        task = Task.objects.create(**validated_data)
+        new_status = validated_data.pop('status')
+        task = Task(**validated_data)
+        # Tasks created straight into a later column are started (and completed) now
+        task.set_status(new_status)
+        task.save()
         
         # Create task assignments for multiple assignees
         first_assignee = None
@@ -160,8 +173,11 @@ class TaskCreateUpdateSerializer(serializers.ModelSerializer):
         old_due_date = instance.due_date
         
         # Update the task
+        new_status = validated_data.pop('status', old_status)
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
+        if new_status != old_status:
+            instance.set_status(new_status)
         instance.save()
         
         # Handle assignee updates
@@ -172,8 +188,11 @@ class TaskCreateUpdateSerializer(serializers.ModelSerializer):
             
             # Remove assignees that are no longer assigned
             to_remove = current_assignees - new_assignees
-            for user_id in to_remove:
-                TaskAssignment.objects.filter(task=instance, user_id=user_id).update(is_active=False)
+            if to_remove:
+                TaskAssignment.objects.filter(task=instance, user_id__in=to_remove).update(is_active=False)
+                # Queryset updates skip post_save, so refresh the visibility links and notify here
+                refresh_task_visibility([instance.id])
+                publish_task_events([instance.id], 'task.assignment')
             
             # Add new assignees
             to_add = new_assignees - current_assignees
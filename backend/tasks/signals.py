@@ -0,0 +1,88 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from accounts.models import User
+from projects.membership import refresh_effective_membership
+from projects.models import EffectiveMembership, Project
+from taskflow.signals import deleted_through
+from .counters import adjust_project_counters
+from .inbox import notify_activities
+from .models import Task, TaskActivity, TaskAssignment, TaskComment, TaskVisibility
+from .realtime import publish_activities, publish_task_events
+from .sync import record_lost_access, record_task_changes
+from .visibility import refresh_task_visibility
+
+
+@receiver(post_save, sender=Task)
+def task_saved(sender, instance, created, **kwargs):
+    refresh_task_visibility([instance.id])
+    record_task_changes([instance.id], project_id=instance.project_id)
+    publish_task_events([instance.id], 'task.created' if created else 'task.updated', using=kwargs.get('using'))
+
+
+@receiver(pre_delete, sender=Task)
+def task_deleting(sender, instance, **kwargs):
+    # The visibility links go with the task; their users are the ones whose sync clients drop it
+    record_lost_access(
+        TaskVisibility.objects.filter(task_id=instance.id).values_list('task_id', 'user_id', 'project_id'), deleted=True
+    )
+
+
+@receiver(post_delete, sender=Task)
+def task_deleted(sender, instance, **kwargs):
+    # Runs inside the delete's transaction, for cascades from a project too
+    adjust_project_counters([(instance.project_id, instance.status, -1)], using=kwargs.get('using'))
+    record_task_changes([instance.id], deleted=True, project_id=instance.project_id)
+    if deleted_through(kwargs.get('origin'), Project, User):
+        return
+    # The task's visibility links are already gone; recheck whoever was in the project through a task
+    refresh_effective_membership(
+        EffectiveMembership.objects.filter(project_id=instance.project_id, is_assignee=True).values_list('project_id', 'user_id')
+    )
+
+
+@receiver(post_save, sender=TaskAssignment)
+def task_assignment_changed(sender, instance, **kwargs):
+    refresh_task_visibility([instance.task_id])
+    record_task_changes([instance.task_id])
+    publish_task_events([instance.task_id], 'task.assignment', using=kwargs.get('using'))
+
+
+@receiver(post_delete, sender=TaskAssignment)
+def task_assignment_deleted(sender, instance, **kwargs):
+    # Deleting the task, its project or the user removes the visibility links anyway
+    if deleted_through(kwargs.get('origin'), Task, Project, User):
+        return
+    refresh_task_visibility([instance.task_id])
+    record_task_changes([instance.task_id])
+    publish_task_events([instance.task_id], 'task.assignment', using=kwargs.get('using'))
+
+
+@receiver(post_save, sender=TaskComment)
+def task_comment_saved(sender, instance, **kwargs):
+    # Comments change the serialized counts
+    record_task_changes([instance.task_id])
+
+
+@receiver(post_save, sender=TaskActivity)
+def task_activity_saved(sender, instance, created, **kwargs):
+    if created:
+        notify_activities([instance.id])
+        publish_activities([instance.id], using=kwargs.get('using'))
+
+
+@receiver(post_save, sender=Project)
+def project_saved(sender, instance, created, update_fields=None, **kwargs):
+    # is_active decides visibility; the name and state are part of every task's sync state.
+    # Other edits (the description, say) leave the tasks alone.
+    if created:
+        return
+    changed = instance.changed_task_fields()
+    if update_fields is not None:
+        changed &= set(update_fields)
+    if not changed:
+        return
+    task_ids = list(instance.tasks.values_list('id', flat=True))
+    if 'is_active' in changed:
+        refresh_task_visibility(task_ids)
+    record_task_changes(task_ids, project_id=instance.id)
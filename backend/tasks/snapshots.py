@@ -0,0 +1,181 @@
+"""
+Daily status counts per project (the TaskStatusSnapshot rollup) behind the
+burndown and cumulative-flow charts.
+
+``update_status_snapshots`` only reads what happened since its watermark:
+tasks created since the last run, counted in their initial status on the
+day they were created, and ``status_changed`` activities, moved between
+statuses on the day they happened. A change on day D shifts the row for D
+and every later row of that project. ``rebuild=True`` replays the whole
+history.
+
+Each run then reconciles every project's latest row with the project's task
+counters (``Project.tasks_todo`` and friends, kept in step with every task
+write) and books the difference on today's row. That covers what the
+incremental reads cannot see: tasks deleted or moved to another project,
+and changes whose transaction committed after a run had already read past
+their ids. On PostgreSQL the run reads in one REPEATABLE READ snapshot, so
+the bounds, the changes and the counters agree, and a concurrent run is
+skipped rather than waited for.
+"""
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.db import connections, router, transaction
+from django.db.models import CharField, Count, F, Max, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from projects.models import Project
+from .counters import STATUS_COUNTERS
+from .models import RollupWatermark, Task, TaskActivity, TaskStatusSnapshot
+
+SNAPSHOT_STATUSES = ('todo', 'in_progress', 'review', 'done')
+SNAPSHOT_WATERMARK = 'task_status_snapshots'
+
+
+def update_status_snapshots(rebuild=False):
+    """
+    Fold new tasks and status changes into the snapshot rows and reconcile
+    them with the current counts. Returns the number of (project, day) rows
+    changed (0 when another run holds the watermark).
+    """
+    RollupWatermark.objects.get_or_create(name=SNAPSHOT_WATERMARK)
+    connection = connections[router.db_for_write(RollupWatermark)]
+    # SET TRANSACTION must come first, so only when this run owns the transaction
+    repeatable_read = connection.vendor == 'postgresql' and not connection.in_atomic_block
+    with transaction.atomic():
+        if repeatable_read:
+            with connection.cursor() as cursor:
+                cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ')
+        watermark = RollupWatermark.objects.select_for_update(skip_locked=True).filter(name=SNAPSHOT_WATERMARK).first()
+        if watermark is None:
+            return 0
+        if rebuild:
+            TaskStatusSnapshot.objects.all().delete()
+            watermark.last_task_id = watermark.last_activity_id = 0
+
+        # Read the activity bound first, so every activity up to it belongs to a task up to the task bound
+        last_activity_id = TaskActivity.objects.aggregate(last=Max('id'))['last'] or 0
+        last_task_id = Task.objects.aggregate(last=Max('id'))['last'] or 0
+
+        changes = defaultdict(Counter)
+        first_change = TaskActivity.objects.filter(
+            task=OuterRef('pk'), activity_type='status_changed'
+        ).order_by('id').values('old_value')[:1]
+        created = Task.objects.filter(id__gt=watermark.last_task_id, id__lte=last_task_id).annotate(
+            day=TruncDate('created_at'),
+            initial_status=Coalesce(Subquery(first_change), F('status'), output_field=CharField()),
+        ).values('project_id', 'day', 'initial_status').annotate(count=Count('id')).order_by()
+        for row in created:
+            changes[row['project_id'], row['day']][row['initial_status']] += row['count']
+
+        moves = TaskActivity.objects.filter(
+            id__gt=watermark.last_activity_id, id__lte=last_activity_id, activity_type='status_changed'
+        ).exclude(old_value=F('new_value')).annotate(day=TruncDate('created_at')).values(
+            'task__project_id', 'day', 'old_value', 'new_value'
+        ).annotate(count=Count('id')).order_by()
+        for row in moves:
+            counts = changes[row['task__project_id'], row['day']]
+            counts[row['old_value']] -= row['count']
+            counts[row['new_value']] += row['count']
+
+        changed = _apply_changes(changes)
+        changed += _reconcile(timezone.localdate())
+
+        watermark.last_task_id = last_task_id
+        watermark.last_activity_id = last_activity_id
+        watermark.save()
+    return changed
+
+
+def _reconcile(today):
+    """Book the difference between each project's latest row and its task counters on ``today``"""
+    latest_date = TaskStatusSnapshot.objects.filter(project_id=OuterRef('project_id')).order_by('-date').values('date')[:1]
+    recorded = {
+        row['project_id']: row
+        for row in TaskStatusSnapshot.objects.filter(date=Subquery(latest_date)).values('project_id', *SNAPSHOT_STATUSES)
+    }
+    changes = {}
+    for project in Project.objects.values('id', *STATUS_COUNTERS.values()):
+        row = recorded.get(project['id'], {})
+        changes[project['id'], today] = Counter({
+            name: project[STATUS_COUNTERS[name]] - row.get(name, 0) for name in SNAPSHOT_STATUSES
+        })
+    return _apply_changes(changes)
+
+
+def _apply_changes(changes):
+    """
+    Fold ``{(project_id, day): Counter}`` deltas into the snapshot rows. A
+    change on a day shifts that day's row (started from the previous row
+    when missing) and every later row of the project. The rows involved are
+    read in one query and written back in one upsert. Returns the number of
+    (project, day) pairs that changed.
+    """
+    deltas = {}
+    for key, counts in changes.items():
+        moved = {name: counts[name] for name in SNAPSHOT_STATUSES if counts[name]}
+        if moved:
+            deltas[key] = moved
+    if not deltas:
+        return 0
+
+    # Every row from the earliest change on, plus the row each project carries into it
+    first_day = min(day for _project_id, day in deltas)
+    carried = TaskStatusSnapshot.objects.filter(
+        project_id=OuterRef('project_id'), date__lt=first_day
+    ).order_by('-date').values('date')[:1]
+    rows = defaultdict(dict)
+    for row in TaskStatusSnapshot.objects.filter(project_id__in={project_id for project_id, _day in deltas}).filter(
+        Q(date__gte=first_day) | Q(date=Subquery(carried))
+    ).values('project_id', 'date', *SNAPSHOT_STATUSES):
+        rows[row['project_id']][row['date']] = {name: row[name] for name in SNAPSHOT_STATUSES}
+
+    touched = set()
+    for (project_id, day), moved in sorted(deltas.items()):
+        days = rows[project_id]
+        if day not in days:
+            previous = max((date for date in days if date < day), default=None)
+            days[day] = dict(days[previous]) if previous else dict.fromkeys(SNAPSHOT_STATUSES, 0)
+        for date, counts in days.items():
+            if date >= day:
+                for name, delta in moved.items():
+                    counts[name] += delta
+                touched.add((project_id, date))
+
+    TaskStatusSnapshot.objects.bulk_create(
+        [
+            TaskStatusSnapshot(project_id=project_id, date=date, **rows[project_id][date])
+            for project_id, date in sorted(touched)
+        ],
+        update_conflicts=True, unique_fields=['project', 'date'], update_fields=list(SNAPSHOT_STATUSES),
+    )
+    return len(deltas)
+
+
+def status_history(project, start, end):
+    """
+    Status counts of ``project`` for every day from ``start`` to ``end``
+    inclusive, read in one query: the rows inside the range plus the latest
+    row before it, carried forward over days without a row.
+    """
+    before_start = TaskStatusSnapshot.objects.filter(
+        project=project, date__lt=start
+    ).order_by('-date').values('date')[:1]
+    rows = TaskStatusSnapshot.objects.filter(project=project).filter(
+        Q(date__range=(start, end)) | Q(date=Subquery(before_start))
+    ).order_by('date').values('date', *SNAPSHOT_STATUSES)
+
+    rows = iter(rows)
+    row = next(rows, None)
+    current = dict.fromkeys(SNAPSHOT_STATUSES, 0)
+    days = []
+    day = start
+    while day <= end:
+        while row is not None and row['date'] <= day:
+            current = {name: row[name] for name in SNAPSHOT_STATUSES}
+            row = next(rows, None)
+        days.append({'date': day, **current, 'total': sum(current.values())})
+        day += timedelta(days=1)
+    return days
@@ -0,0 +1,161 @@
+"""
+Incremental task sync: records task changes in an append-only log and
+answers "what changed since token N" for a user's visible task set.
+
+Each row names the task's project. Rows without a user are public: any
+caller who can see the task refetches it, and Scrum Masters, who can see
+every active project, are told to drop it once it is gone. Rows with a user
+record that this user lost sight of the task (a visibility link went away,
+or the task was deleted), so other users never receive tombstones for tasks
+they could not see. ``prune_task_changes`` drops rows older than
+``TASK_SYNC_RETENTION_DAYS``; tokens from before the oldest kept row get a
+"resync required" answer.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+from taskflow.conditional import latest_timestamp
+
+from .due import overdue_filter
+from .models import TaskChange
+
+
+class InvalidSyncToken(ValueError):
+    """Raised when a client sends a sync token that is not a sequence number"""
+
+
+class SyncTokenExpired(ValueError):
+    """Raised when the changes after a sync token have been pruned from the log"""
+
+
+def record_task_changes(task_ids, deleted=False, project_id=None):
+    """
+    Append one public change row per task id. ``project_id`` is the project
+    of every task, or a dict of each task's project; without it the projects
+    are read from the tasks.
+    """
+    task_ids = list(task_ids)
+    if not task_ids:
+        return
+    if project_id is None:
+        from .models import Task
+        projects = dict(Task.objects.filter(id__in=task_ids).values_list('id', 'project_id'))
+    elif isinstance(project_id, dict):
+        projects = project_id
+    else:
+        projects = dict.fromkeys(task_ids, project_id)
+    TaskChange.objects.bulk_create([
+        TaskChange(task_id=task_id, project_id=projects.get(task_id), is_deleted=deleted)
+        for task_id in task_ids
+    ])
+
+
+def record_lost_access(links, deleted=False):
+    """
+    Append one row per ``(task_id, user_id, project_id)`` visibility link
+    that went away, so only those users get the task's tombstone
+    """
+    TaskChange.objects.bulk_create([
+        TaskChange(task_id=task_id, user_id=user_id, project_id=project_id, is_deleted=deleted)
+        for task_id, user_id, project_id in links
+    ])
+
+
+def parse_sync_token(token):
+    """Return the sequence encoded in a sync token (None means a full sync)"""
+    if token in (None, ''):
+        return None
+    try:
+        sequence = int(token)
+    except (TypeError, ValueError) as exc:
+        raise InvalidSyncToken('Invalid sync token') from exc
+    if sequence < 0:
+        raise InvalidSyncToken('Invalid sync token')
+    return sequence
+
+
+def current_sync_token():
+    """Return the newest sequence in the change log"""
+    latest = TaskChange.objects.order_by('-id').values_list('id', flat=True).first()
+    return latest or 0
+
+
+def get_changes_since(visible_tasks, since, user, project_id=None):
+    """
+    Return (changed_tasks, tombstone_ids, next_token, has_more).
+
+    ``visible_tasks`` is the caller's permission-scoped Task queryset,
+    narrowed to ``project_id`` when given. Changed tasks that are still
+    visible are returned; a task that is not is a tombstone only if the
+    caller lost sight of it (see the module docstring). Raises
+    ``SyncTokenExpired`` when ``since`` is older than the retained log.
+
+    The token only advances past changes older than SYNC_SETTLE_SECONDS, so
+    rows from transactions that committed out of sequence order are picked
+    up by the next poll; clients apply changes idempotently.
+    """
+    batch_size = getattr(settings, 'TASK_SYNC_BATCH_SIZE', 500)
+    settle = timedelta(seconds=getattr(settings, 'TASK_SYNC_SETTLE_SECONDS', 5))
+
+    oldest = TaskChange.objects.order_by('id').values_list('id', flat=True).first()
+    if oldest is not None and since < oldest - 1:
+        raise SyncTokenExpired('Sync token expired')
+
+    log = TaskChange.objects.filter(Q(user_id__isnull=True) | Q(user_id=user.id), id__gt=since)
+    if project_id is not None:
+        log = log.filter(project_id=project_id)
+    changes = list(log.order_by('id').values_list('id', 'task_id', 'user_id', 'created_at')[:batch_size])
+    has_more = len(changes) == batch_size
+    if not changes:
+        return [], [], since, False
+
+    if has_more:
+        next_token = changes[-1][0]
+    else:
+        settled_before = timezone.now() - settle
+        settled = [change_id for change_id, _task_id, _user_id, created_at in changes if created_at <= settled_before]
+        next_token = max(settled) if settled else since
+
+    changed_ids = {task_id for _change_id, task_id, _user_id, _created_at in changes}
+    changed_tasks = list(visible_tasks.filter(id__in=changed_ids))
+    # Scrum Masters saw every task in an active project; everyone else only what their own rows say
+    lost_ids = {
+        task_id for _change_id, task_id, user_id, _created_at in changes
+        if user_id is not None or user.is_scrum_master()
+    }
+    tombstone_ids = sorted(lost_ids - {task.id for task in changed_tasks})
+    return changed_tasks, tombstone_ids, next_token, has_more
+
+
+def prune_task_changes(now=None):
+    """
+    Delete change rows older than TASK_SYNC_RETENTION_DAYS and return how
+    many went. The newest row is always kept, so tokens at the head of the
+    log stay valid.
+    """
+    now = now or timezone.now()
+    cutoff = now - timedelta(days=settings.TASK_SYNC_RETENTION_DAYS)
+    newest = current_sync_token()
+    deleted, _ = TaskChange.objects.filter(created_at__lt=cutoff, id__lt=newest).delete()
+    return deleted
+
+
+def task_validators(tasks):
+    """
+    Conditional GET validators for a visible task set: its row count, newest
+    updated_at and live overdue count (tasks turn overdue as the clock moves,
+    without a write), plus the newest change-log entry for those tasks, which
+    also moves on assignment, comment and due-state changes that leave
+    updated_at alone.
+    """
+    summary = tasks.order_by().aggregate(
+        total=Count('id'), last_updated=Max('updated_at'), overdue=Count('id', filter=overdue_filter())
+    )
+    latest_change = TaskChange.objects.filter(task_id__in=tasks.order_by().values('id')).order_by('-id').values_list(
+        'id', 'created_at'
+    ).first() or (0, None)
+    parts = [summary['total'], summary['last_updated'], summary['overdue'], latest_change[0]]
+    return parts, latest_timestamp(summary['last_updated'], latest_change[1])
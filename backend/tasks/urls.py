@@ -5,10 +5,14 @@ urlpatterns = [
     path('', views.TaskListCreateView.as_view(), name='task_list_create'),
     path('<int:pk>/', views.TaskDetailView.as_view(), name='task_detail'),
     path('<int:task_id>/comments/', views.TaskCommentListCreateView.as_view(), name='task_comments'),
+    path('activities/', views.TaskActivityListView.as_view(), name='task_activities'),
     path('analytics/', views.task_analytics, name='task_analytics'),
     path('kanban/', views.kanban_tasks, name='kanban_tasks'),
+    path('sync/', views.task_sync, name='task_sync'),
     path('<int:task_id>/status/', views.update_task_status, name='update_task_status'),
+    path('status/bulk/', views.bulk_update_task_status, name='bulk_update_task_status'),
     path('notifications/', views.notifications, name='notifications'),
+    path('notifications/read/', views.mark_notifications_read, name='mark_notifications_read'),
     # Time tracking URLs
     path('time-tracking/sessions/', views.TimeSessionListCreateView.as_view(), name='time_session_list_create'),
     path('time-tracking/sessions/<int:pk>/', views.TimeSessionDetailView.as_view(), name='time_session_detail'),
@@ -1,10 +1,25 @@
 from rest_framework import generics, permissions, status, filters
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
-from django.db.models import Q, Count
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef
 from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import Task, TaskComment, TaskActivity, TimeSession
+from taskflow.conditional import ConditionalListMixin, conditional_get
+from taskflow.pagination import KeysetPagination, StartTimeKeysetPagination
+from .analytics import cycle_time_stats, member_breakdown, priority_breakdown, status_totals
+from .counters import adjust_project_counters
+from .due import due_state_for, record_due_transitions
+from .inbox import inbox_page, mark_read, notify_activities
+from .kanban import KANBAN_STATUSES, InvalidCursor, build_board, get_column_limit, load_column
+from .models import Task, TaskComment, TaskActivity, TaskVisibility, TimeSession
+from .realtime import publish_activities, publish_task_events
+from .search import TaskSearchFilter
+from .sync import (
+    InvalidSyncToken, SyncTokenExpired, current_sync_token, get_changes_since, parse_sync_token, record_task_changes,
+    task_validators
+)
 from .serializers import (
     TaskSerializer, 
     TaskCreateUpdateSerializer, 
@@ -14,13 +29,17 @@ from .serializers import (
     TimeSessionSerializer
 )
 
+# Largest batch accepted by the bulk status endpoint
+BULK_STATUS_MAX_TASKS = 200
+
 
-class TaskListCreateView(generics.ListCreateAPIView):
+class TaskListCreateView(ConditionalListMixin, generics.ListCreateAPIView):
     """
     List all tasks or create a new task
     """
     permission_classes = [permissions.IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    pagination_class = KeysetPagination
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, TaskSearchFilter]
     filterset_fields = ['status', 'priority', 'assignee', 'project']
     search_fields = ['title', 'description']
     ordering_fields = ['created_at', 'updated_at', 'due_date', 'priority']
@@ -34,17 +53,14 @@ class TaskListCreateView(generics.ListCreateAPIView):
     def get_queryset(self):
         user = self.request.user
         
-        if user.is_scrum_master():
-            # Scrum Master can see all tasks from active projects only
-            return Task.objects.filter(project__is_active=True).select_related('assignee', 'created_by', 'project').prefetch_related('comments')
-        else:
-            # Employee can see tasks directly assigned or via TaskAssignment from active projects only
-            from .models import TaskAssignment
-            assigned_task_ids = TaskAssignment.objects.filter(user=user, is_active=True).values_list('task_id', flat=True)
-            return Task.objects.filter(
-                Q(assignee=user) | Q(id__in=assigned_task_ids),
-                project__is_active=True
-            ).select_related('assignee', 'created_by', 'project').prefetch_related('comments')
+        # Scrum Masters see all tasks from active projects; employees see tasks
+        # directly assigned or via TaskAssignment from active projects only
+        # Only load what the requested (?fields= / ?omit=) serializer fields need
+        fields = TaskSerializer(context=self.get_serializer_context()).fields
+        return Task.objects.visible_to(user).with_list_data(fields=fields)
+    
+    def get_validators(self, queryset):
+        return task_validators(queryset)
     
     def perform_create(self, serializer):
         if not self.request.user.is_scrum_master():
@@ -69,9 +85,7 @@ class TaskDetailView(generics.RetrieveUpdateDestroyAPIView):
         if user.is_scrum_master():
             return Task.objects.select_related('assignee', 'created_by', 'project').prefetch_related('comments', 'activities')
         else:
-            from .models import TaskAssignment
-            assigned_task_ids = TaskAssignment.objects.filter(user=user, is_active=True).values_list('task_id', flat=True)
-            return Task.objects.filter(Q(assignee=user) | Q(id__in=assigned_task_ids)).select_related('assignee', 'created_by', 'project').prefetch_related('comments', 'activities')
+            return Task.objects.visible_to(user).select_related('assignee', 'created_by', 'project').prefetch_related('comments', 'activities')
     
     def perform_update(self, serializer):
         user = self.request.user
@@ -111,7 +125,7 @@ class TaskCommentListCreateView(generics.ListCreateAPIView):
         if user.is_scrum_master():
             task = Task.objects.get(id=task_id)
         else:
-            task = Task.objects.get(id=task_id, assignee=user)
+            task = Task.objects.visible_to(user).get(id=task_id)
         
         return TaskComment.objects.filter(task=task).order_by('created_at')
     
@@ -123,7 +137,7 @@ class TaskCommentListCreateView(generics.ListCreateAPIView):
         if user.is_scrum_master():
             task = Task.objects.get(id=task_id)
         else:
-            task = Task.objects.get(id=task_id, assignee=user)
+            task = Task.objects.visible_to(user).get(id=task_id)
         
         comment = serializer.save(task=task, author=user)
         
@@ -136,104 +150,80 @@ class TaskCommentListCreateView(generics.ListCreateAPIView):
         )
 
 
+class TaskActivityListView(generics.ListAPIView):
+    """
+    Activity feed for the tasks the user can see, newest first
+    """
+    serializer_class = TaskActivitySerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['task', 'activity_type']
+    
+    def get_queryset(self):
+        user = self.request.user
+        return TaskActivity.objects.filter(task__in=Task.objects.visible_to(user)).select_related('user')
+
+
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def task_analytics(request):
     """
-    Get task analytics dashboard data
+    Get task analytics dashboard data (answers 304 while the visible task set is unchanged)
+    """
+    parts, last_modified = task_validators(Task.objects.visible_to(request.user))
+    return conditional_get(request, parts, last_modified, lambda: build_task_analytics(request.user))
+
+
+def build_task_analytics(user):
+    """
+    Compute the task analytics payload for a user
     """
-    user = request.user
-    
     if user.is_scrum_master():
         # Scrum Master analytics - all tasks from active projects only
-        total_tasks = Task.objects.filter(project__is_active=True).count()
-        completed_tasks = Task.objects.filter(project__is_active=True, status='done').count()
-        in_progress_tasks = Task.objects.filter(project__is_active=True, status='in_progress').count()
-        review_tasks = Task.objects.filter(project__is_active=True, status='review').count()
-        todo_tasks = Task.objects.filter(project__is_active=True, status='todo').count()
-        overdue_tasks = Task.objects.filter(
-            project__is_active=True,
-            due_date__lt=timezone.now(),
-            status__in=['todo', 'in_progress', 'review']
-        ).count()
-        
-        # Tasks by assignee - get all unique assignees and their task counts
-        from .models import TaskAssignment
-        from accounts.models import User
-        
-        # Get all users who have tasks assigned (either directly or via TaskAssignment)
-        direct_assignee_ids = Task.objects.filter(project__is_active=True, assignee__isnull=False).values_list('assignee_id', flat=True).distinct()
-        task_assignee_ids = TaskAssignment.objects.filter(task__project__is_active=True, is_active=True).values_list('user_id', flat=True).distinct()
-        all_assignee_ids = set(direct_assignee_ids) | set(task_assignee_ids)
-        
-        tasks_by_assignee = []
-        for user_id in all_assignee_ids:
-            try:
-                user = User.objects.get(id=user_id)
-                # Get tasks assigned directly to this user
-                direct_tasks = Task.objects.filter(project__is_active=True, assignee=user)
-                # Get tasks assigned via TaskAssignment
-                assigned_task_ids = TaskAssignment.objects.filter(task__project__is_active=True, user=user, is_active=True).values_list('task_id', flat=True)
-                assigned_tasks = Task.objects.filter(id__in=assigned_task_ids)
-                # Combine both
-                user_tasks = (direct_tasks | assigned_tasks).distinct()
-                
-                tasks_by_assignee.append({
-                    'assignee__first_name': user.first_name,
-                    'assignee__last_name': user.last_name,
-                    'assignee_name': user.get_full_name(),
-                    'total': user_tasks.count(),
-                    'completed': user_tasks.filter(status='done').count(),
-                    'in_progress': user_tasks.filter(status='in_progress').count(),
-                    'review': user_tasks.filter(status='review').count(),
-                    'todo': user_tasks.filter(status='todo').count()
-                })
-            except User.DoesNotExist:
-                continue
+        totals = status_totals(Task.objects.filter(project__is_active=True))
+        total_tasks = totals['total']
+        completed_tasks = totals['completed']
+        in_progress_tasks = totals['in_progress']
+        review_tasks = totals['review']
+        todo_tasks = totals['todo']
+        overdue_tasks = totals['overdue']
+        
+        # Tasks by assignee - one GROUP BY over direct and TaskAssignment links
+        tasks_by_assignee = [
+            {
+                'assignee__first_name': member['first_name'],
+                'assignee__last_name': member['last_name'],
+                'assignee_name': member['name'],
+                'total': member['total'],
+                'completed': member['completed'],
+                'in_progress': member['in_progress'],
+                'review': member['review'],
+                'todo': member['todo']
+            }
+            for member in member_breakdown()
+        ]
         
         # Tasks by priority
-        tasks_by_priority = Task.objects.filter(project__is_active=True).values('priority').annotate(
-            count=Count('id')
-        ).order_by('priority')
+        tasks_by_priority = priority_breakdown(Task.objects.filter(project__is_active=True))
         
         # Recent activities
         recent_activities = TaskActivity.objects.select_related('task', 'user').order_by('-created_at')[:10]
         
-        # Calculate average task duration for completed tasks (Scrum Master)
-        completed_tasks_with_dates = Task.objects.filter(
-            project__is_active=True,
-            status='done',
-            created_at__isnull=False,
-            updated_at__isnull=False
-        )
-        avg_duration = 0
-        avg_duration_minutes = 0
-        if completed_tasks_with_dates.exists():
-            total_duration_seconds = 0
-            for task in completed_tasks_with_dates:
-                duration_seconds = (task.updated_at - task.created_at).total_seconds()
-                total_duration_seconds += duration_seconds
-            avg_duration_seconds = total_duration_seconds / completed_tasks_with_dates.count()
-            avg_duration = avg_duration_seconds / (24 * 60 * 60)  # Convert to days
-            avg_duration_minutes = avg_duration_seconds / 60  # Convert to minutes
+        # Lead time (created -> done) and cycle time (started -> done), computed in SQL
+        lead_time = cycle_time_stats(Task.objects.filter(project__is_active=True), start_field='created_at')
+        cycle_time = cycle_time_stats(Task.objects.filter(project__is_active=True))
         
     else:
         # Employee analytics - tasks directly assigned or via TaskAssignment from active projects only
-        from .models import TaskAssignment
-        assigned_task_ids = TaskAssignment.objects.filter(user=user, is_active=True).values_list('task_id', flat=True)
-        user_tasks = Task.objects.filter(
-            Q(assignee=user) | Q(id__in=assigned_task_ids),
-            project__is_active=True
-        )
-        total_tasks = user_tasks.count()
-        completed_tasks = user_tasks.filter(status='done').count()
-        in_progress_tasks = user_tasks.filter(status='in_progress').count()
-        review_tasks = user_tasks.filter(status='review').count()
-        todo_tasks = user_tasks.filter(status='todo').count()
-        overdue_tasks = user_tasks.filter(
-            due_date__lt=timezone.now(),
-            status__in=['todo', 'in_progress', 'review']
-        ).count()
+        user_tasks = Task.objects.visible_to(user)
+        totals = status_totals(user_tasks)
+        total_tasks = totals['total']
+        completed_tasks = totals['completed']
+        in_progress_tasks = totals['in_progress']
+        review_tasks = totals['review']
+        todo_tasks = totals['todo']
+        overdue_tasks = totals['overdue']
         
         # For employees, also show their own task performance
         tasks_by_assignee = [{
@@ -246,42 +236,29 @@ def task_analytics(request):
             'todo': todo_tasks
         }]
         
-        tasks_by_priority = user_tasks.values('priority').annotate(
-            count=Count('id')
-        ).order_by('priority')
+        tasks_by_priority = priority_breakdown(user_tasks)
         
-        recent_activities = TaskActivity.objects.filter(task__assignee=user).select_related('task', 'user').order_by('-created_at')[:10]
+        recent_activities = TaskActivity.objects.filter(task__visibility__user=user).select_related('task', 'user').order_by('-created_at')[:10]
     
-        # Calculate average task duration for completed tasks (Employee)
-        completed_tasks_with_dates = user_tasks.filter(
-            status='done',
-            created_at__isnull=False,
-            updated_at__isnull=False
-        )
-        avg_duration = 0
-        avg_duration_minutes = 0
-        if completed_tasks_with_dates.exists():
-            total_duration_seconds = 0
-            for task in completed_tasks_with_dates:
-                duration_seconds = (task.updated_at - task.created_at).total_seconds()
-                total_duration_seconds += duration_seconds
-            avg_duration_seconds = total_duration_seconds / completed_tasks_with_dates.count()
-            avg_duration = avg_duration_seconds / (24 * 60 * 60)  # Convert to days
-            avg_duration_minutes = avg_duration_seconds / 60  # Convert to minutes
+        # Lead time (created -> done) and cycle time (started -> done), computed in SQL
+        lead_time = cycle_time_stats(user_tasks, start_field='created_at')
+        cycle_time = cycle_time_stats(user_tasks)
     
     analytics = {
         'total_tasks': total_tasks,
         'completed_tasks': completed_tasks,
         'in_progress_tasks': in_progress_tasks,
-        'review_tasks': review_tasks if 'review_tasks' in locals() else 0,
+        'review_tasks': review_tasks,
         'todo_tasks': todo_tasks,
         'overdue_tasks': overdue_tasks,
         'completion_rate': round((completed_tasks / total_tasks * 100) if total_tasks > 0 else 0, 2),
         'tasks_by_assignee': list(tasks_by_assignee),
         'tasks_by_priority': list(tasks_by_priority),
         'recent_activities': TaskActivitySerializer(recent_activities, many=True).data,
-        'avg_task_duration': round(avg_duration, 1),
-        'avg_task_duration_minutes': round(avg_duration_minutes, 1)
+        'avg_task_duration': round(lead_time['mean_seconds'] / (24 * 60 * 60), 1),
+        'avg_task_duration_minutes': round(lead_time['mean_seconds'] / 60, 1),
+        'lead_time': lead_time,
+        'cycle_time': cycle_time
     }
     
     return Response(analytics)
@@ -291,37 +268,104 @@ def task_analytics(request):
 @permission_classes([permissions.IsAuthenticated])
 def kanban_tasks(request):
     """
-    Get tasks organized by status for Kanban board
+    Get tasks organized by status for Kanban board.
+
+    Every column is read in one query. Clients that page opt in with
+    ``limit`` (each column is then capped and gets a cursor) and pass
+    ``status`` and the column's ``cursor`` to load more of a single column;
+    without them the whole board is returned, as before.
     """
     user = request.user
     project_id = request.GET.get('project')
+    column_status = request.GET.get('status')
+    cursor = request.GET.get('cursor')
+    raw_limit = request.GET.get('limit')
+    limit = get_column_limit(raw_limit) if raw_limit or column_status or cursor else None
     
-    if user.is_scrum_master():
-        tasks = Task.objects.filter(project__is_active=True).select_related('assignee', 'project').prefetch_related('comments')
-    else:
-        # Include tasks assigned via TaskAssignment in addition to direct assignee from active projects only
-        from .models import TaskAssignment
-        assigned_task_ids = TaskAssignment.objects.filter(user=user, is_active=True).values_list('task_id', flat=True)
-        tasks = Task.objects.filter(
-            Q(assignee=user) | Q(id__in=assigned_task_ids),
-            project__is_active=True
-        ).select_related('assignee', 'project').prefetch_related('comments')
+    fields = TaskSerializer(context={'request': request}).fields
+    tasks = Task.objects.visible_to(user)
     
     # Filter by project if specified
     if project_id:
         tasks = tasks.filter(project_id=project_id)
     
-    # Group tasks by status
+    parts, last_modified = task_validators(tasks)
+    return conditional_get(
+        request, parts, last_modified,
+        lambda: render_kanban_board(request, tasks.with_list_data(fields=fields), column_status, cursor, limit)
+    )
+
+
+def render_kanban_board(request, tasks, column_status, cursor, limit):
+    """
+    Build the Kanban response: the full board, or one column when paging
+    """
+    if column_status or cursor:
+        # Lazy-load more of one column without re-reading the others
+        if column_status not in KANBAN_STATUSES:
+            return Response({'error': 'Invalid status'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            columns = {column_status: load_column(tasks, column_status, cursor, limit)}
+        except InvalidCursor:
+            return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+    else:
+        columns = build_board(tasks, limit)
+    
+    # Serialize the whole board in one pass, then group tasks by status
+    board_tasks = [task for column, _cursor in columns.values() for task in column]
+    serialized = iter(TaskSerializer(board_tasks, many=True, context={'request': request}).data)
     kanban_data = {
-        'todo': TaskSerializer(tasks.filter(status='todo'), many=True).data,
-        'in_progress': TaskSerializer(tasks.filter(status='in_progress'), many=True).data,
-        'review': TaskSerializer(tasks.filter(status='review'), many=True).data,
-        'done': TaskSerializer(tasks.filter(status='done'), many=True).data,
+        column: [next(serialized) for _task in column_tasks]
+        for column, (column_tasks, _cursor) in columns.items()
     }
+    kanban_data['cursors'] = {column: next_cursor for column, (_tasks, next_cursor) in columns.items()}
+    kanban_data['limit'] = limit
     
     return Response(kanban_data)
 
 
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def task_sync(request):
+    """
+    Incremental sync for the task list and Kanban board.
+
+    Without ``since`` this returns every visible task and a sync token; with
+    ``since=<token>`` it returns only tasks changed after that token, plus
+    tombstone ids for tasks that were deleted or are no longer visible.
+    """
+    user = request.user
+    project_id = request.GET.get('project')
+    
+    try:
+        since = parse_sync_token(request.GET.get('since'))
+    except InvalidSyncToken:
+        return Response({'error': 'Invalid sync token'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    tasks = Task.objects.visible_to(user)
+    if project_id:
+        tasks = tasks.filter(project_id=project_id)
+    tasks = tasks.with_list_data(fields=TaskSerializer(context={'request': request}).fields)
+    
+    if since is None:
+        # Read the token first so changes made while serializing are sent again next poll
+        sync_token = current_sync_token()
+        changed_tasks, deleted, has_more = list(tasks), [], False
+    else:
+        try:
+            changed_tasks, deleted, sync_token, has_more = get_changes_since(tasks, since, user, project_id or None)
+        except SyncTokenExpired:
+            return Response({'error': 'Sync token expired', 'resync_required': True}, status=status.HTTP_410_GONE)
+    
+    return Response({
+        'tasks': TaskSerializer(changed_tasks, many=True, context={'request': request}).data,
+        'deleted': deleted,
+        'sync_token': str(sync_token),
+        'full_sync': since is None,
+        'has_more': has_more,
+    })
+
+
 @api_view(['PATCH'])
 @permission_classes([permissions.IsAuthenticated])
 def update_task_status(request, task_id):
@@ -336,22 +380,15 @@ def update_task_status(request, task_id):
     user = request.user
     
     # Check permissions: allow if employee is direct assignee OR in TaskAssignment
-    if user.is_employee():
-        is_direct = (task.assignee_id == user.id)
-        if not is_direct:
-            from .models import TaskAssignment
-            is_indirect = TaskAssignment.objects.filter(task=task, user=user, is_active=True).exists()
-        else:
-            is_indirect = True
-        if not is_indirect:
-            return Response({'error': 'You can only update your assigned tasks'}, status=status.HTTP_403_FORBIDDEN)
+    if user.is_employee() and not Task.objects.visible_to(user).filter(id=task.id).exists():
+        return Response({'error': 'You can only update your assigned tasks'}, status=status.HTTP_403_FORBIDDEN)
     
     new_status = request.data.get('status')
     if new_status not in ['todo', 'in_progress', 'review', 'done']:
         return Response({'error': 'Invalid status'}, status=status.HTTP_400_BAD_REQUEST)
     
     old_status = task.status
-    task.status = new_status
+    task.set_status(new_status)
     task.save()
     
     # Create activity log
@@ -367,115 +404,132 @@ def update_task_status(request, task_id):
     return Response(TaskSerializer(task).data)
 
 
+@api_view(['PATCH'])
+@permission_classes([permissions.IsAuthenticated])
+def bulk_update_task_status(request):
+    """
+    Update the status of several tasks at once (multi-select drag, sprint close).
+
+    Expects ``{"updates": [{"task_id": 1, "status": "done"}, ...]}``. Either all
+    changes are applied in one transaction or none are.
+    """
+    updates = request.data.get('updates') if isinstance(request.data, dict) else None
+    if not isinstance(updates, list) or not updates:
+        return Response({'error': 'updates must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(updates) > BULK_STATUS_MAX_TASKS:
+        return Response({'error': f'At most {BULK_STATUS_MAX_TASKS} tasks can be updated at once'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    new_statuses = {}
+    for update in updates:
+        if not isinstance(update, dict):
+            return Response({'error': 'Each update must be an object'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            task_id = int(update.get('task_id'))
+        except (TypeError, ValueError):
+            return Response({'error': 'Each update needs a task_id'}, status=status.HTTP_400_BAD_REQUEST)
+        if update.get('status') not in ['todo', 'in_progress', 'review', 'done']:
+            return Response({'error': 'Invalid status', 'task_id': task_id}, status=status.HTTP_400_BAD_REQUEST)
+        if task_id in new_statuses:
+            return Response({'error': 'Duplicate task_id', 'task_id': task_id}, status=status.HTTP_400_BAD_REQUEST)
+        new_statuses[task_id] = update['status']
+    
+    user = request.user
+    
+    with transaction.atomic():
+        # Check permissions for the whole set in one query; the row locks keep the
+        # statuses read here current until the counters are moved
+        tasks = Task.objects.select_for_update().filter(id__in=new_statuses).annotate(
+            is_visible=Exists(TaskVisibility.objects.filter(task=OuterRef('pk'), user=user))
+        ).only('id', 'project_id', 'status', 'due_date', 'due_state', 'started_at', 'completed_at')
+        tasks = list(tasks)
+        old_statuses = {task.id: task.status for task in tasks}
+        
+        missing = sorted(set(new_statuses) - {task.id for task in tasks})
+        if missing:
+            return Response({'error': 'Task not found', 'task_ids': missing}, status=status.HTTP_404_NOT_FOUND)
+        if user.is_employee():
+            forbidden = sorted(task.id for task in tasks if not task.is_visible)
+            if forbidden:
+                return Response({'error': 'You can only update your assigned tasks', 'task_ids': forbidden}, status=status.HTTP_403_FORBIDDEN)
+        
+        now = timezone.now()
+        changed = []
+        due_transitions = []
+        activities = []
+        for task in tasks:
+            old_status = task.status
+            new_status = new_statuses[task.id]
+            if old_status == new_status:
+                continue
+            task.set_status(new_status, when=now)
+            task.updated_at = now
+            due_state = due_state_for(new_status, task.due_date, now)
+            if due_state != task.due_state:
+                task.due_state = due_state
+                due_transitions.append((task.id, new_status, due_state))
+            changed.append(task)
+            activities.append(TaskActivity(
+                task=task,
+                user=user,
+                activity_type='status_changed',
+                description=f'Status changed from {old_status} to {new_status}',
+                old_value=old_status,
+                new_value=new_status
+            ))
+        
+        Task.objects.bulk_update(changed, ['status', 'due_state', 'started_at', 'completed_at', 'updated_at'])
+        TaskActivity.objects.bulk_create(activities)
+        # bulk_update and bulk_create bypass Task.save and post_save, so move the project
+        # counters, log the changes for delta sync, fill the inboxes and publish the stream events here
+        adjust_project_counters(
+            [(task.project_id, old_statuses[task.id], -1) for task in changed] +
+            [(task.project_id, task.status, 1) for task in changed]
+        )
+        record_task_changes([task.id for task in changed], project_id={task.id: task.project_id for task in changed})
+        activity_ids = [activity.id for activity in activities if activity.id is not None]
+        notify_activities(activity_ids)
+        publish_task_events([task.id for task in changed], 'task.updated')
+        publish_activities(activity_ids)
+        record_due_transitions(due_transitions)
+    
+    changed_ids = {task.id for task in changed}
+    return Response({
+        'updated': sorted(changed_ids),
+        'unchanged': sorted(set(new_statuses) - changed_ids),
+    })
+
+
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def notifications(request):
     """
-    Unified notifications feed for the current user:
-    - Recent TaskActivity on tasks the user owns (SM: all tasks) or is assigned to
-    - Recent ProjectMessage in projects the user belongs to or has tasks in
+    The current user's notification inbox, newest first: task activity,
+    project messages and due-soon alerts, written when they happened.
+    ``?before=<notification_id>`` pages back; ``unread_count`` is the badge.
     """
-    user = request.user
-    from projects.models import ProjectMessage, ProjectMember, Project
-    from tasks.models import TaskAssignment
+    try:
+        before = int(request.query_params['before']) if 'before' in request.query_params else None
+        limit = int(request.query_params.get('limit', settings.NOTIFICATION_PAGE_SIZE))
+    except ValueError:
+        return Response({'error': 'before and limit must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+    limit = max(1, min(limit, settings.NOTIFICATION_MAX_PAGE_SIZE))
+    return Response(inbox_page(request.user, before=before, limit=limit))
 
-    if user.is_scrum_master():
-        # Only include activities from active projects
-        recent_activities = TaskActivity.objects.filter(
-            task__project__is_active=True
-        ).select_related('task', 'user').order_by('-created_at')[:20]
-        # All messages in projects created by this SM or where SM is member (only active projects)
-        sm_project_ids = list(Project.objects.filter(created_by=user, is_active=True).values_list('id', flat=True))
-        sm_member_project_ids = list(ProjectMember.objects.filter(user=user, is_active=True).values_list('project_id', flat=True))
-        project_ids = set(sm_project_ids + sm_member_project_ids)
-        recent_messages = ProjectMessage.objects.filter(
-            project_id__in=project_ids,
-            project__is_active=True
-        ).select_related('author', 'project').order_by('-created_at')[:20]
-    else:
-        assigned_task_ids = TaskAssignment.objects.filter(user=user, is_active=True).values_list('task_id', flat=True)
-        # Only include activities from active projects
-        recent_activities = TaskActivity.objects.filter(
-            Q(task__assignee=user) | Q(task_id__in=assigned_task_ids),
-            task__project__is_active=True
-        ).select_related('task', 'user').order_by('-created_at')[:20]
-        member_project_ids = list(ProjectMember.objects.filter(user=user, is_active=True).values_list('project_id', flat=True))
-        assignee_project_ids = list(TaskAssignment.objects.filter(user=user, is_active=True).values_list('task__project_id', flat=True))
-        project_ids = set(member_project_ids + assignee_project_ids)
-        recent_messages = ProjectMessage.objects.filter(
-            project_id__in=project_ids,
-            project__is_active=True
-        ).select_related('author', 'project').order_by('-created_at')[:20]
-
-    activity_items = [
-        {
-            'type': 'activity',
-            'id': a.id,
-            'task_id': a.task_id,
-            'task_title': getattr(a.task, 'title', ''),
-            'user_name': getattr(a.user, 'first_name', '') + ' ' + getattr(a.user, 'last_name', ''),
-            'description': a.description,
-            'created_at': a.created_at,
-        } for a in recent_activities
-    ]
-
-    message_items = [
-        {
-            'type': 'message',
-            'id': m.id,
-            'project_id': m.project_id,
-            'project_name': getattr(m.project, 'name', ''),
-            'author_name': m.author.get_full_name(),
-            'content': m.content,
-            'created_at': m.created_at,
-        } for m in recent_messages
-    ]
-
-    # Due soon items (next 48h) for relevant tasks (only from active projects)
-    from datetime import timedelta
-    soon = timezone.now() + timedelta(hours=48)
-    if user.is_scrum_master():
-        due_qs = Task.objects.filter(
-            due_date__isnull=False, 
-            due_date__lte=soon, 
-            status__in=['todo', 'in_progress'],
-            project__is_active=True
-        ).select_related('project')
-    else:
-        assigned_task_ids = TaskAssignment.objects.filter(user=user, is_active=True).values_list('task_id', flat=True)
-        due_qs = Task.objects.filter(
-            Q(assignee=user) | Q(id__in=assigned_task_ids),
-            due_date__isnull=False,
-            due_date__lte=soon,
-            status__in=['todo', 'in_progress'],
-            project__is_active=True
-        ).select_related('project')
-
-    def human_eta(dt):
-        diff = dt - timezone.now()
-        hours = int(diff.total_seconds() // 3600)
-        if hours <= 0:
-            return 'now'
-        if hours < 24:
-            return f'in {hours}h'
-        days = hours // 24
-        return f'in {days}d'
-
-    due_items = [
-        {
-            'type': 'due_soon',
-            'id': t.id,
-            'task_id': t.id,
-            'task_title': t.title,
-            'project_name': getattr(t.project, 'name', ''),
-            'content': f'Task "{t.title}" is due {human_eta(t.due_date)}',
-            'created_at': timezone.now(),
-        }
-        for t in due_qs.order_by('due_date')[:20]
-    ]
-
-    items = sorted(activity_items + message_items + due_items, key=lambda x: x['created_at'], reverse=True)[:20]
-    return Response({'items': items})
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def mark_notifications_read(request):
+    """
+    Move the read cursor to ``up_to`` (a notification id; default: everything)
+    """
+    up_to = request.data.get('up_to')
+    if up_to is not None:
+        try:
+            up_to = int(up_to)
+        except (TypeError, ValueError):
+            return Response({'error': 'up_to must be a notification id'}, status=status.HTTP_400_BAD_REQUEST)
+    inbox = mark_read(request.user, up_to=up_to)
+    return Response({'last_read_id': inbox.last_read_id, 'unread_count': inbox.unread_count})
 
 
 # Time Tracking Views
@@ -484,6 +538,7 @@ class TimeSessionListCreateView(generics.ListCreateAPIView):
     List all time sessions or create a new time session
     """
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = StartTimeKeysetPagination
     serializer_class = TimeSessionSerializer
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['task', 'is_active']
@@ -0,0 +1,49 @@
+"""
+Maintenance of the TaskVisibility table (and, through it, the project
+EffectiveMembership table).
+"""
+from .models import Task, TaskAssignment, TaskVisibility
+from .sync import record_lost_access
+
+
+def refresh_task_visibility(task_ids):
+    """
+    Bring the TaskVisibility rows of the given tasks in line with their
+    assignee, active assignments and project state, in a constant number of
+    queries regardless of how many tasks are passed.
+    """
+    task_ids = list(task_ids)
+    if not task_ids:
+        return
+
+    desired = set(
+        Task.objects.filter(id__in=task_ids, project__is_active=True, assignee__isnull=False)
+        .values_list('id', 'assignee_id', 'project_id')
+    )
+    desired |= set(
+        TaskAssignment.objects.filter(task_id__in=task_ids, is_active=True, task__project__is_active=True)
+        .values_list('task_id', 'user_id', 'task__project_id')
+    )
+
+    existing = {
+        (task_id, user_id, project_id): link_id
+        for link_id, task_id, user_id, project_id in TaskVisibility.objects.filter(task_id__in=task_ids)
+        .values_list('id', 'task_id', 'user_id', 'project_id')
+    }
+
+    stale = {key: link_id for key, link_id in existing.items() if key not in desired}
+    if stale:
+        TaskVisibility.objects.filter(id__in=stale.values()).delete()
+        # Tell just these users' sync clients to drop the tasks
+        record_lost_access(stale)
+    added = desired - set(existing)
+    TaskVisibility.objects.bulk_create([
+        TaskVisibility(task_id=task_id, user_id=user_id, project_id=project_id)
+        for task_id, user_id, project_id in added
+    ])
+
+    # Project membership follows the links that appeared or disappeared
+    from projects.membership import refresh_effective_membership
+    refresh_effective_membership(
+        (project_id, user_id) for _task_id, user_id, project_id in added | (set(existing) - desired)
+    )
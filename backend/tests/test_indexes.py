@@ -0,0 +1,67 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from accounts.models import User
+from projects.models import Project, ProjectMessage
+from tasks.models import Task, TaskAssignment, TimeSession
+
+
+class HotPathIndexTest(TestCase):
+    """
+    Check that the planner picks the composite/partial indexes for the
+    predicates the views filter on.
+    """
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123',
+            role='scrum_master'
+        )
+        self.project = Project.objects.create(name='Test Project', created_by=self.user)
+
+    def assertUsesIndex(self, queryset, index_name):
+        if connection.vendor == 'postgresql':
+            # Tiny test tables would otherwise always be sequentially scanned
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        plan = queryset.explain()
+        self.assertIn(index_name, plan)
+
+    def test_task_project_status(self):
+        self.assertUsesIndex(Task.objects.filter(project=self.project, status='todo'), 'tasks_project_status_idx')
+
+    def test_task_assignee_status(self):
+        self.assertUsesIndex(Task.objects.filter(assignee=self.user, status='done'), 'tasks_assignee_status_idx')
+
+    def test_open_task_due_date(self):
+        queryset = Task.objects.filter(
+            due_date__lt=timezone.now(),
+            status__in=['todo', 'in_progress', 'review']
+        ).order_by('due_date')
+        self.assertUsesIndex(queryset, 'tasks_status_due_date_idx')
+
+    def test_due_state_scan(self):
+        queryset = Task.objects.filter(due_date__isnull=False).exclude(status='done').filter(
+            due_state__in=['none', 'due_soon'], due_date__lte=timezone.now()
+        ).order_by()
+        self.assertUsesIndex(queryset, 'tasks_due_state_idx')
+
+    def test_active_assignments_for_user(self):
+        queryset = TaskAssignment.objects.filter(user=self.user, is_active=True).values('task_id')
+        self.assertUsesIndex(queryset, 'task_assign_active_user_idx')
+
+    def test_active_time_session_for_user(self):
+        queryset = TimeSession.objects.filter(user=self.user, is_active=True).order_by('-start_time')
+        self.assertUsesIndex(queryset, 'time_session_active_user_idx')
+
+    def test_time_sessions_in_range(self):
+        queryset = TimeSession.objects.filter(user=self.user, start_time__gte=timezone.now() - timedelta(days=30))
+        self.assertUsesIndex(queryset, 'time_session_user_start_idx')
+
+    def test_project_messages_in_order(self):
+        queryset = ProjectMessage.objects.filter(project=self.project).order_by('created_at')
+        self.assertUsesIndex(queryset, 'project_msg_created_idx')
@@ -2,9 +2,11 @@ from django.test import TestCase
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
 from accounts.models import User
-from tasks.models import Task, TaskComment, TaskActivity
-from projects.models import Project
+from tasks.models import Task, TaskComment, TaskActivity, TaskAssignment, TaskVisibility
+from projects.models import EffectiveMembership, Project, ProjectMember
 
 User = get_user_model()
 
@@ -78,6 +80,86 @@ class ProjectModelTest(TestCase):
         self.assertEqual(str(self.project), 'Test Project')
 
 
+class ProjectTaskCounterTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123',
+            role='scrum_master'
+        )
+        self.project = Project.objects.create(name='Test Project', created_by=self.user)
+        self.other_project = Project.objects.create(name='Other Project', created_by=self.user)
+
+    def stats(self, project):
+        project.refresh_from_db()
+        return project.task_stats
+
+    def test_counters_follow_create_status_change_move_and_delete(self):
+        task = Task.objects.create(title='Task', project=self.project, created_by=self.user, status='todo')
+        Task.objects.create(title='Done', project=self.project, created_by=self.user, status='done')
+        self.assertEqual(self.stats(self.project), {'total': 2, 'todo': 1, 'in_progress': 0, 'review': 0, 'done': 1})
+        self.assertEqual(self.project.progress_percentage, 50.0)
+
+        task.set_status('review')
+        task.save()
+        self.assertEqual(self.stats(self.project)['review'], 1)
+        self.assertEqual(self.stats(self.project)['todo'], 0)
+
+        # A stale copy saved with another status still moves the count from the stored status
+        stale = Task.objects.get(id=task.id)
+        stale.status = 'in_progress'
+        stale.project = self.other_project
+        stale.save()
+        self.assertEqual(self.stats(self.project), {'total': 1, 'todo': 0, 'in_progress': 0, 'review': 0, 'done': 1})
+        self.assertEqual(self.stats(self.other_project), {'total': 1, 'todo': 0, 'in_progress': 1, 'review': 0, 'done': 0})
+
+        stale.delete()
+        self.assertEqual(self.stats(self.other_project)['total'], 0)
+        Task.objects.filter(project=self.project).delete()
+        self.assertEqual(self.stats(self.project), {'total': 0, 'todo': 0, 'in_progress': 0, 'review': 0, 'done': 0})
+
+    def test_saving_a_stale_project_keeps_the_counters(self):
+        stale = Project.objects.get(id=self.project.id)
+        task = Task.objects.create(title='Task', project=self.project, created_by=self.user, status='todo')
+        stale.description = 'Edited while a task was added'
+        stale.save()
+        task.set_status('done')
+        task.save()
+        stale.is_active = False
+        stale.save()
+        self.assertEqual(self.stats(self.project), {'total': 1, 'todo': 0, 'in_progress': 0, 'review': 0, 'done': 1})
+        self.assertEqual(self.project.description, 'Edited while a task was added')
+
+    def test_saving_a_deferred_project_writes_only_loaded_fields(self):
+        partial = Project.objects.only('id', 'name').get(id=self.project.id)
+        Project.objects.filter(id=self.project.id).update(description='Edited elsewhere')
+        partial.name = 'Renamed'
+        partial.save()
+        self.assertIn('description', partial.get_deferred_fields())
+        self.project.refresh_from_db()
+        self.assertEqual((self.project.name, self.project.description), ('Renamed', 'Edited elsewhere'))
+
+    def test_empty_update_fields_keeps_unsaved_task_fields_pending(self):
+        self.project.name = 'Renamed'
+        self.project.save(update_fields=[])
+        self.assertEqual(self.project.changed_task_fields(), {'name'})
+
+    def test_repair_command_fixes_drifted_counters(self):
+        Task.objects.create(title='Task', project=self.project, created_by=self.user, status='todo')
+        Task.objects.filter(project=self.project).update(status='done')
+        Project.objects.filter(id=self.other_project.id).update(tasks_total=5)
+
+        out = StringIO()
+        call_command('repair_project_counters', '--dry-run', stdout=out)
+        self.assertIn('2 wrong', out.getvalue())
+        self.assertEqual(self.stats(self.project)['todo'], 1)
+
+        call_command('repair_project_counters', '--chunk-size', '1', stdout=StringIO())
+        self.assertEqual(self.stats(self.project), {'total': 1, 'todo': 0, 'in_progress': 0, 'review': 0, 'done': 1})
+        self.assertEqual(self.stats(self.other_project)['total'], 0)
+
+
 class TaskModelTest(TestCase):
     def setUp(self):
         self.user = User.objects.create_user(
@@ -140,6 +222,22 @@ class TaskModelTest(TestCase):
         )
         self.assertFalse(completed_overdue_task.is_overdue)
 
+    def test_set_status_tracks_started_and_completed(self):
+        started = timezone.now() - timedelta(hours=3)
+        self.task.set_status('in_progress', when=started)
+        self.task.set_status('done', when=started + timedelta(hours=1))
+        self.task.save()
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.started_at, started)
+        self.assertEqual(self.task.completed_at, started + timedelta(hours=1))
+
+        # Reopening clears completion but keeps the original start
+        self.task.set_status('review')
+        self.assertIsNone(self.task.completed_at)
+        self.assertEqual(self.task.started_at, started)
+        self.task.set_status('done')
+        self.assertGreater(self.task.completed_at, started + timedelta(hours=1))
+
 
 class TaskCommentModelTest(TestCase):
     def setUp(self):
@@ -207,3 +305,359 @@ class TaskActivityModelTest(TestCase):
     def test_activity_str(self):
         expected = f"{self.activity.get_activity_type_display()} by {self.user.get_full_name()} on {self.task.title}"
         self.assertEqual(str(self.activity), expected)
+
+
+class TaskVisibilityTest(TestCase):
+    def setUp(self):
+        self.scrum_master = User.objects.create_user(
+            username='scrummaster',
+            email='scrum@example.com',
+            password='testpass123',
+            role='scrum_master'
+        )
+        self.employee = User.objects.create_user(
+            username='employee',
+            email='employee@example.com',
+            password='testpass123',
+            role='employee'
+        )
+        self.other = User.objects.create_user(
+            username='other',
+            email='other@example.com',
+            password='testpass123',
+            role='employee'
+        )
+        self.project = Project.objects.create(
+            name='Test Project',
+            created_by=self.scrum_master
+        )
+        self.task = Task.objects.create(
+            title='Test Task',
+            project=self.project,
+            assignee=self.employee,
+            created_by=self.scrum_master
+        )
+
+    def visible_ids(self, user):
+        return set(Task.objects.visible_to(user).values_list('id', flat=True))
+
+    def test_direct_assignee_can_see_task(self):
+        self.assertEqual(self.visible_ids(self.employee), {self.task.id})
+        self.assertEqual(self.visible_ids(self.other), set())
+        self.assertEqual(self.visible_ids(self.scrum_master), {self.task.id})
+
+    def test_assignment_links_follow_is_active(self):
+        assignment = TaskAssignment.objects.create(task=self.task, user=self.other)
+        self.assertEqual(self.visible_ids(self.other), {self.task.id})
+        assignment.is_active = False
+        assignment.save()
+        self.assertEqual(self.visible_ids(self.other), set())
+
+    def test_reassigning_moves_visibility(self):
+        self.task.assignee = self.other
+        self.task.save()
+        self.assertEqual(self.visible_ids(self.employee), set())
+        self.assertEqual(self.visible_ids(self.other), {self.task.id})
+
+    def test_inactive_project_hides_tasks(self):
+        self.project.is_active = False
+        self.project.save()
+        self.assertFalse(TaskVisibility.objects.exists())
+        self.assertEqual(self.visible_ids(self.scrum_master), set())
+        self.project.is_active = True
+        self.project.save()
+        self.assertEqual(self.visible_ids(self.employee), {self.task.id})
+
+
+    def test_only_task_facing_project_edits_touch_the_tasks(self):
+        from tasks.models import TaskChange
+        project = Project.objects.get(id=self.project.id)
+        changes = TaskChange.objects.count()
+        with self.assertNumQueries(1):
+            project.description = 'New description'
+            project.save()
+        self.assertEqual(TaskChange.objects.count(), changes)
+
+        project.name = 'Renamed'
+        project.save()
+        self.assertEqual(TaskChange.objects.count(), changes + 1)
+        self.assertEqual(self.visible_ids(self.employee), {self.task.id})
+
+class BackfillTaskTimestampsTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123',
+            role='scrum_master'
+        )
+        self.project = Project.objects.create(name='Test Project', created_by=self.user)
+        self.now = timezone.now()
+
+    def create_task(self, title, task_status, history=()):
+        task = Task.objects.create(title=title, project=self.project, created_by=self.user, status=task_status)
+        Task.objects.filter(id=task.id).update(created_at=self.now - timedelta(days=10), updated_at=self.now)
+        for days_ago, old_value, new_value in history:
+            activity = TaskActivity.objects.create(
+                task=task, user=self.user, activity_type='status_changed',
+                description='Status changed', old_value=old_value, new_value=new_value
+            )
+            TaskActivity.objects.filter(id=activity.id).update(created_at=self.now - timedelta(days=days_ago))
+        return task
+
+    def backfill(self, *args):
+        out = StringIO()
+        call_command('backfill_task_timestamps', *args, stdout=out)
+        return out.getvalue()
+
+    def test_values_come_from_status_history(self):
+        reopened = self.create_task('Reopened', 'done', [
+            (8, 'todo', 'in_progress'), (6, 'in_progress', 'done'), (5, 'done', 'review'), (2, 'review', 'done'),
+        ])
+        no_history = self.create_task('No history', 'done')
+        in_progress = self.create_task('In progress', 'in_progress', [(4, 'todo', 'in_progress')])
+        todo = self.create_task('Todo', 'todo')
+
+        self.backfill('--chunk-size', '2')
+
+        reopened.refresh_from_db()
+        self.assertEqual(reopened.started_at, self.now - timedelta(days=8))
+        self.assertEqual(reopened.completed_at, self.now - timedelta(days=2))
+        no_history.refresh_from_db()
+        self.assertEqual((no_history.started_at, no_history.completed_at), (self.now - timedelta(days=10), self.now))
+        in_progress.refresh_from_db()
+        self.assertEqual(in_progress.started_at, self.now - timedelta(days=4))
+        self.assertIsNone(in_progress.completed_at)
+        todo.refresh_from_db()
+        self.assertIsNone(todo.started_at)
+
+    def test_reopened_task_keeps_its_start(self):
+        reopened = self.create_task('Reopened', 'todo', [(5, 'todo', 'in_progress'), (3, 'in_progress', 'todo')])
+        self.backfill()
+        reopened.refresh_from_db()
+        self.assertEqual(reopened.started_at, self.now - timedelta(days=5))
+        self.assertIsNone(reopened.completed_at)
+
+    def test_resumes_and_skips_filled_tasks(self):
+        first = self.create_task('First', 'done', [(3, 'todo', 'done')])
+        second = self.create_task('Second', 'done', [(1, 'todo', 'done')])
+
+        self.backfill('--after-id', str(first.id))
+        first.refresh_from_db()
+        self.assertIsNone(first.completed_at)
+        second.refresh_from_db()
+        self.assertEqual(second.completed_at, self.now - timedelta(days=1))
+
+        output = self.backfill()
+        self.assertIn('Backfilled 1 tasks', output)
+        self.assertIn('Backfilled 0 tasks', self.backfill())
+
+
+
+class DueStateScanTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123',
+            role='scrum_master'
+        )
+        self.employee = User.objects.create_user(
+            username='employee', email='employee@example.com', password='testpass123', role='employee'
+        )
+        self.project = Project.objects.create(name='Test Project', created_by=self.user)
+        self.now = timezone.now()
+
+    def create_task(self, title, hours, task_status='todo'):
+        return Task.objects.create(
+            title=title, project=self.project, created_by=self.user, assignee=self.employee,
+            status=task_status, due_date=self.now + timedelta(hours=hours)
+        )
+
+    def states(self):
+        return dict(Task.objects.values_list('title', 'due_state'))
+
+    def test_save_sets_the_state(self):
+        task = self.create_task('Late', -1)
+        self.assertEqual(self.states(), {'Late': 'overdue'})
+        self.assertTrue(task.is_overdue)
+        task.set_status('done')
+        task.save(update_fields=['status', 'completed_at'])
+        self.assertEqual(self.states(), {'Late': 'none'})
+        self.assertFalse(task.is_overdue)
+        task.due_date = self.now + timedelta(hours=100)
+        task.status = 'todo'
+        task.save()
+        self.assertEqual(self.states(), {'Late': 'none'})
+
+    def test_scan_records_each_transition_once(self):
+        from tasks.due import scan_due_tasks
+        from tasks.models import Notification
+
+        self.create_task('Soon', 30)
+        self.create_task('Later', 60)
+        self.create_task('Finished', -5, 'done')
+        self.assertEqual(self.states(), {'Soon': 'due_soon', 'Later': 'none', 'Finished': 'none'})
+
+        self.assertEqual(scan_due_tasks(self.now + timedelta(hours=13)), {'due_soon': 1})
+        self.assertEqual(scan_due_tasks(self.now + timedelta(hours=31)), {'overdue': 1})
+        self.assertEqual(scan_due_tasks(self.now + timedelta(hours=31)), {})
+        self.assertEqual(self.states(), {'Soon': 'overdue', 'Later': 'due_soon', 'Finished': 'none'})
+        # One inbox entry per task that came due, whether on save or by a scan
+        self.assertEqual(
+            sorted(Notification.objects.filter(user=self.employee, kind='due_soon').values_list('payload__task_title', flat=True)),
+            ['Later', 'Soon']
+        )
+
+        self.assertEqual(scan_due_tasks(self.now + timedelta(hours=61)), {'overdue': 1})
+        self.assertEqual(Task.objects.filter(due_state='overdue').count(), 2)
+        self.assertEqual(
+            sorted(Notification.objects.filter(user=self.employee, kind='overdue').values_list('payload__task_title', flat=True)),
+            ['Later', 'Soon']
+        )
+
+    def test_reads_fall_back_to_the_due_date_between_scans(self):
+        from tasks.analytics import status_totals
+        task = self.create_task('Soon', 30)
+        # The due date passes before any scan has run
+        Task.objects.filter(id=task.id).update(due_date=self.now - timedelta(hours=1))
+        task.refresh_from_db()
+        self.assertEqual(task.due_state, 'due_soon')
+        self.assertTrue(task.is_overdue)
+        self.assertEqual(status_totals(Task.objects.all())['overdue'], 1)
+
+    def test_command_reports_the_transitions(self):
+        self.create_task('Soon', 30)
+        Task.objects.update(due_date=self.now - timedelta(hours=1))
+        out = StringIO()
+        call_command('scan_due_tasks', stdout=out)
+        self.assertIn('Marked 0 tasks due soon and 1 overdue', out.getvalue())
+        self.assertEqual(self.states(), {'Soon': 'overdue'})
+
+class BackfillNotificationsTest(TestCase):
+    def setUp(self):
+        from projects.models import ProjectMessage
+        self.scrum_master = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123',
+            role='scrum_master'
+        )
+        self.employee = User.objects.create_user(
+            username='employee', email='employee@example.com', password='testpass123', role='employee'
+        )
+        self.project = Project.objects.create(name='Test Project', created_by=self.scrum_master)
+        ProjectMember.objects.create(project=self.project, user=self.employee)
+        self.task = Task.objects.create(
+            title='Soon', project=self.project, assignee=self.employee, created_by=self.scrum_master,
+            due_date=timezone.now() + timedelta(hours=10)
+        )
+        TaskActivity.objects.create(
+            task=self.task, user=self.scrum_master, activity_type='created', description='Task created'
+        )
+        self.message = ProjectMessage.objects.create(project=self.project, author=self.scrum_master, content='Kickoff')
+
+    def backfill(self):
+        out = StringIO()
+        call_command('backfill_notifications', stdout=out)
+        return out.getvalue()
+
+    def test_inbox_is_filled_from_history_once(self):
+        from tasks.models import Notification, NotificationInbox
+        from tasks.inbox import inbox_page
+        expected = list(Notification.objects.filter(user=self.employee).order_by('id').values_list('kind', 'object_id'))
+        # As if the events predated the inbox
+        Notification.objects.all().delete()
+        NotificationInbox.objects.all().delete()
+
+        # The Scrum Master sees the due-soon task too, but is not told of their own activity and message
+        self.assertIn('Backfilled 4 notifications', self.backfill())
+        # History first, in order, then the entries for what is due now
+        self.assertEqual(
+            list(Notification.objects.filter(user=self.employee).order_by('id').values_list('kind', 'object_id')),
+            [entry for entry in expected if entry[0] != 'due_soon'] + [('due_soon', self.task.id)]
+        )
+        self.assertEqual(inbox_page(self.employee)['unread_count'], 3)
+        self.assertIn('Backfilled 0 notifications', self.backfill())
+
+    def test_events_after_the_cutover_are_left_alone(self):
+        from tasks.models import Notification
+        Notification.objects.filter(kind='due_soon').delete()
+        self.assertIn('Backfilled 2 notifications', self.backfill())
+        self.assertEqual(Notification.objects.filter(user=self.employee, kind='activity').count(), 1)
+
+
+class EffectiveMembershipTest(TestCase):
+    def setUp(self):
+        self.scrum_master = User.objects.create_user(
+            username='scrummaster',
+            email='scrum@example.com',
+            password='testpass123',
+            role='scrum_master'
+        )
+        self.employee = User.objects.create_user(
+            username='employee',
+            email='employee@example.com',
+            password='testpass123',
+            role='employee'
+        )
+        self.other = User.objects.create_user(
+            username='other',
+            email='other@example.com',
+            password='testpass123',
+            role='employee'
+        )
+        self.project = Project.objects.create(name='Test Project', created_by=self.scrum_master)
+
+    def memberships(self):
+        return {
+            row.user_id: (row.is_member, row.is_assignee)
+            for row in EffectiveMembership.objects.filter(project=self.project)
+        }
+
+    def test_members_and_assignees_are_tracked_separately(self):
+        member = ProjectMember.objects.create(project=self.project, user=self.employee)
+        task = Task.objects.create(title='Task', project=self.project, assignee=self.employee, created_by=self.scrum_master)
+        assignment = TaskAssignment.objects.create(task=task, user=self.other)
+        self.assertEqual(self.memberships(), {self.employee.id: (True, True), self.other.id: (False, True)})
+        self.assertEqual(self.project.all_members, {self.employee.id, self.other.id})
+        self.assertEqual(self.project.effective_member_count, 2)
+
+        member.is_active = False
+        member.save()
+        assignment.is_active = False
+        assignment.save()
+        self.assertEqual(self.memberships(), {self.employee.id: (False, True)})
+
+        task.assignee = self.other
+        task.save()
+        self.assertEqual(self.memberships(), {self.other.id: (False, True)})
+
+        task.delete()
+        self.assertEqual(self.memberships(), {})
+
+    def test_inactive_projects_still_count_their_assignees(self):
+        ProjectMember.objects.create(project=self.project, user=self.employee)
+        task = Task.objects.create(title='Task', project=self.project, assignee=self.employee, created_by=self.scrum_master)
+        TaskAssignment.objects.create(task=task, user=self.other)
+        self.project.is_active = False
+        self.project.save()
+        self.assertEqual(self.memberships(), {self.employee.id: (True, False)})
+        self.assertEqual(self.project.all_members, {self.employee.id, self.other.id})
+        self.assertEqual(self.project.effective_member_count, 2)
+
+    def test_member_removal_keeps_assignees(self):
+        member = ProjectMember.objects.create(project=self.project, user=self.employee)
+        Task.objects.create(title='Task', project=self.project, assignee=self.employee, created_by=self.scrum_master)
+        member.delete()
+        self.assertEqual(self.memberships(), {self.employee.id: (False, True)})
+
+    def test_cascading_deletes_leave_no_rows(self):
+        ProjectMember.objects.create(project=self.project, user=self.employee)
+        task = Task.objects.create(title='Task', project=self.project, assignee=self.employee, created_by=self.scrum_master)
+        TaskAssignment.objects.create(task=task, user=self.other)
+        self.other.delete()
+        self.assertEqual(self.memberships(), {self.employee.id: (True, True)})
+        self.project.delete()
+        self.assertFalse(EffectiveMembership.objects.exists())
+        self.assertFalse(TaskVisibility.objects.exists())
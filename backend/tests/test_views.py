@@ -1,12 +1,19 @@
-from django.test import TestCase
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
 from django.contrib.auth import get_user_model
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework.test import APITestCase
 from rest_framework import status
 from rest_framework_simplejwt.tokens import RefreshToken
 from accounts.models import User
-from tasks.models import Task, TaskComment, TaskActivity
-from projects.models import Project
+from tasks.analytics import cycle_time_stats
+from tasks.models import Task, TaskChange, TaskComment, TaskActivity, TaskAssignment
+from projects.models import Project, ProjectMember, ProjectMessage
 
 User = get_user_model()
 
@@ -176,6 +183,820 @@ class TaskAPITest(APITestCase):
         self.assertIn('done', response.data)
 
 
+class TaskListQueryCountTest(APITestCase):
+    def setUp(self):
+        self.scrum_master = User.objects.create_user(
+            username='scrummaster',
+            email='scrum@example.com',
+            password='testpass123',
+            role='scrum_master'
+        )
+        self.employee = User.objects.create_user(
+            username='employee',
+            email='employee@example.com',
+            password='testpass123',
+            role='employee'
+        )
+        self.project = Project.objects.create(
+            name='Test Project',
+            created_by=self.scrum_master
+        )
+
+    def get_auth_headers(self, user):
+        refresh = RefreshToken.for_user(user)
+        access_token = str(refresh.access_token)
+        return {'HTTP_AUTHORIZATION': f'Bearer {access_token}'}
+
+    def create_tasks(self, count):
+        for i in range(count):
+            task = Task.objects.create(
+                title=f'Task {i}',
+                project=self.project,
+                assignee=self.employee,
+                created_by=self.scrum_master
+            )
+            TaskAssignment.objects.create(task=task, user=self.employee)
+            TaskComment.objects.create(task=task, author=self.employee, content='First')
+            TaskComment.objects.create(task=task, author=self.scrum_master, content='Second')
+
+    def count_queries(self, url_name):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse(url_name), **self.get_auth_headers(self.employee))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(context.captured_queries), response
+
+    def test_task_list_query_count_is_constant(self):
+        self.create_tasks(1)
+        baseline, _ = self.count_queries('task_list_create')
+        self.create_tasks(5)
+        queries, response = self.count_queries('task_list_create')
+        self.assertEqual(queries, baseline)
+        task = response.data['results'][0]
+        self.assertEqual(task['comments_count'], 2)
+        self.assertEqual(task['latest_comment']['content'], 'Second')
+        self.assertEqual(task['assignee_count'], 1)
+        self.assertEqual(task['assignees'][0]['user_email'], self.employee.email)
+
+    def test_sparse_fields_skip_unrequested_queries(self):
+        self.create_tasks(3)
+        url = reverse('task_list_create')
+        headers = self.get_auth_headers(self.employee)
+        with CaptureQueriesContext(connection) as full:
+            self.client.get(url, **headers)
+        with CaptureQueriesContext(connection) as sparse:
+            response = self.client.get(url, {'fields': 'id,title,status'}, **headers)
+        self.assertEqual(set(response.data['results'][0]), {'id', 'title', 'status'})
+        self.assertLess(len(sparse.captured_queries), len(full.captured_queries))
+        self.assertFalse(any('task_comments' in query['sql'] for query in sparse.captured_queries))
+
+    def test_omit_removes_fields(self):
+        self.create_tasks(1)
+        response = self.client.get(reverse('task_list_create'), {'omit': 'latest_comment,assignees'}, **self.get_auth_headers(self.employee))
+        task = response.data['results'][0]
+        self.assertNotIn('latest_comment', task)
+        self.assertNotIn('assignees', task)
+        self.assertEqual(task['comments_count'], 2)
+
+    def test_kanban_query_count_is_constant(self):
+        self.create_tasks(1)
+        baseline, _ = self.count_queries('kanban_tasks')
+        self.create_tasks(5)
+        queries, response = self.count_queries('kanban_tasks')
+        self.assertEqual(queries, baseline)
+        self.assertEqual(len(response.data['todo']), 6)
+
+
+class TaskAnalyticsAPITest(APITestCase):
+    def setUp(self):
+        self.scrum_master = User.objects.create_user(
+            username='scrummaster',
+            email='scrum@example.com',
+            password='testpass123',
+            role='scrum_master'
+        )
+        self.project = Project.objects.create(
+            name='Test Project',
+            created_by=self.scrum_master
+        )
+
+    def get_auth_headers(self, user):
+        refresh = RefreshToken.for_user(user)
+        access_token = str(refresh.access_token)
+        return {'HTTP_AUTHORIZATION': f'Bearer {access_token}'}
+
+    def create_assignee(self, index, statuses):
+        employee = User.objects.create_user(
+            username=f'employee{index}',
+            email=f'employee{index}@example.com',
+            password='testpass123',
+            first_name=f'Employee{index}',
+            role='employee'
+        )
+        for task_status in statuses:
+            Task.objects.create(
+                title=f'{task_status} for {index}',
+                project=self.project,
+                assignee=employee,
+                created_by=self.scrum_master,
+                status=task_status,
+                due_date=timezone.now() - timedelta(days=1)
+            )
+        return employee
+
+    def get_analytics(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('task_analytics'), **self.get_auth_headers(self.scrum_master))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data, len(context.captured_queries)
+
+    def test_tasks_by_assignee_counts_direct_and_assignment_links(self):
+        first = self.create_assignee(1, ['todo', 'done', 'done'])
+        second = self.create_assignee(2, ['review'])
+        TaskAssignment.objects.create(task=Task.objects.get(title='review for 2'), user=first)
+        data, _queries = self.get_analytics()
+
+        self.assertEqual((data['total_tasks'], data['completed_tasks'], data['review_tasks']), (4, 2, 1))
+        self.assertEqual(data['overdue_tasks'], 2)
+        by_name = {row['assignee_name']: row for row in data['tasks_by_assignee']}
+        self.assertEqual(
+            {key: by_name[first.get_full_name()][key] for key in ('total', 'completed', 'review', 'todo')},
+            {'total': 4, 'completed': 2, 'review': 1, 'todo': 1}
+        )
+        self.assertEqual(by_name[second.get_full_name()]['total'], 1)
+
+    def create_done_tasks(self, hours, priority='medium'):
+        employee = User.objects.get_or_create(
+            username='finisher', email='finisher@example.com', defaults={'role': 'employee'}
+        )[0]
+        now = timezone.now()
+        for duration in hours:
+            task = Task.objects.create(
+                title=f'Done in {duration}h',
+                project=self.project,
+                assignee=employee,
+                created_by=self.scrum_master,
+                status='done',
+                priority=priority
+            )
+            Task.objects.filter(id=task.id).update(
+                created_at=now - timedelta(hours=duration * 2),
+                started_at=now - timedelta(hours=duration),
+                completed_at=now,
+                updated_at=now + timedelta(days=30)
+            )
+
+    def test_cycle_time_stats_are_computed_in_sql(self):
+        self.create_done_tasks([1.5, 2, 3, 4, 10], priority='high')
+        self.create_done_tasks([30, 100, 200, 500, 1000])
+        with CaptureQueriesContext(connection) as context:
+            cycle = cycle_time_stats(Task.objects.filter(project__is_active=True))
+        self.assertEqual(len(context.captured_queries), 1)
+
+        hours = sorted([1.5, 2, 3, 4, 10, 30, 100, 200, 500, 1000])
+
+        def percentile(p):
+            position = (len(hours) - 1) * p / 100
+            low = int(position)
+            high = min(low + 1, len(hours) - 1)
+            return (hours[low] + (hours[high] - hours[low]) * (position - low)) * 3600
+
+        self.assertEqual(cycle['count'], 10)
+        self.assertAlmostEqual(cycle['mean_seconds'], sum(hours) / 10 * 3600, delta=1)
+        self.assertAlmostEqual(cycle['median_seconds'], percentile(50), delta=1)
+        self.assertAlmostEqual(cycle['p85_seconds'], percentile(85), delta=1)
+        self.assertAlmostEqual(cycle['p95_seconds'], percentile(95), delta=1)
+
+        histogram = cycle['histogram']
+        self.assertEqual(histogram['buckets'][0], '<1h')
+        self.assertEqual(sum(histogram['by_priority']['high']), 5)
+        self.assertEqual(histogram['by_priority']['high'][histogram['buckets'].index('<1d')], 5)
+        self.assertEqual(histogram['by_project'][0]['counts'][histogram['buckets'].index('30d+')], 1)
+
+    def test_cycle_time_in_analytics_payload(self):
+        self.create_done_tasks([2, 4])
+        data, _queries = self.get_analytics()
+        self.assertEqual(data['cycle_time']['count'], 2)
+        self.assertAlmostEqual(data['cycle_time']['mean_seconds'], 3 * 3600, delta=1)
+        # Lead time runs from creation, and edits after completion no longer count
+        self.assertAlmostEqual(data['avg_task_duration_minutes'], 360, delta=0.1)
+        self.assertEqual(cycle_time_stats(Task.objects.none())['count'], 0)
+
+    def test_query_count_does_not_grow_with_assignees(self):
+        self.create_assignee(1, ['todo'])
+        _data, baseline = self.get_analytics()
+        for index in range(2, 8):
+            self.create_assignee(index, ['todo', 'in_progress'])
+        data, queries = self.get_analytics()
+        self.assertEqual(len(data['tasks_by_assignee']), 7)
+        self.assertEqual(queries, baseline)
+
+
+class KanbanBoardAPITest(APITestCase):
+    def setUp(self):
+        self.scrum_master = User.objects.create_user(
+            username='scrummaster',
+            email='scrum@example.com',
+            password='testpass123',
+            role='scrum_master'
+        )
+        self.project = Project.objects.create(
+            name='Test Project',
+            created_by=self.scrum_master
+        )
+        for i in range(5):
+            Task.objects.create(title=f'Todo {i}', project=self.project, created_by=self.scrum_master, status='todo')
+        for i in range(2):
+            Task.objects.create(title=f'Done {i}', project=self.project, created_by=self.scrum_master, status='done')
+
+    def get_auth_headers(self, user):
+        refresh = RefreshToken.for_user(user)
+        access_token = str(refresh.access_token)
+        return {'HTTP_AUTHORIZATION': f'Bearer {access_token}'}
+
+    def test_board_applies_per_column_limit(self):
+        url = reverse('kanban_tasks')
+        response = self.client.get(url, {'limit': 2}, **self.get_auth_headers(self.scrum_master))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['todo']), 2)
+        self.assertEqual(len(response.data['done']), 2)
+        self.assertEqual(response.data['in_progress'], [])
+        self.assertIsNotNone(response.data['cursors']['todo'])
+        self.assertIsNone(response.data['cursors']['done'])
+
+    @override_settings(KANBAN_COLUMN_LIMIT=2)
+    def test_board_is_complete_without_limit(self):
+        response = self.client.get(reverse('kanban_tasks'), **self.get_auth_headers(self.scrum_master))
+        self.assertEqual(len(response.data['todo']), Task.objects.filter(status='todo').count())
+        self.assertEqual(set(response.data['cursors'].values()), {None})
+        self.assertIsNone(response.data['limit'])
+
+    def test_column_cursor_loads_remaining_tasks(self):
+        url = reverse('kanban_tasks')
+        headers = self.get_auth_headers(self.scrum_master)
+        response = self.client.get(url, {'limit': 2}, **headers)
+        seen = [task['id'] for task in response.data['todo']]
+        cursor = response.data['cursors']['todo']
+        while cursor:
+            response = self.client.get(url, {'limit': 2, 'status': 'todo', 'cursor': cursor}, **headers)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('done', response.data)
+            seen.extend(task['id'] for task in response.data['todo'])
+            cursor = response.data['cursors']['todo']
+        expected = list(Task.objects.filter(status='todo').order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_invalid_cursor_is_rejected(self):
+        url = reverse('kanban_tasks')
+        response = self.client.get(url, {'status': 'todo', 'cursor': 'bogus'}, **self.get_auth_headers(self.scrum_master))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@override_settings(TASK_SYNC_SETTLE_SECONDS=0)
+class TaskSyncAPITest(APITestCase):
+    def setUp(self):
+        self.scrum_master = User.objects.create_user(
+            username='scrummaster',
+            email='scrum@example.com',
+            password='testpass123',
+            role='scrum_master'
+        )
+        self.employee = User.objects.create_user(
+            username='employee',
+            email='employee@example.com',
+            password='testpass123',
+            role='employee'
+        )
+        self.project = Project.objects.create(
+            name='Test Project',
+            created_by=self.scrum_master
+        )
+        self.task = Task.objects.create(
+            title='Test Task',
+            project=self.project,
+            assignee=self.employee,
+            created_by=self.scrum_master
+        )
+        self.other_task = Task.objects.create(
+            title='Other Task',
+            project=self.project,
+            assignee=self.employee,
+            created_by=self.scrum_master
+        )
+
+    def get_auth_headers(self, user):
+        refresh = RefreshToken.for_user(user)
+        access_token = str(refresh.access_token)
+        return {'HTTP_AUTHORIZATION': f'Bearer {access_token}'}
+
+    def sync(self, since=None, user=None, **params):
+        if since is not None:
+            params['since'] = since
+        response = self.client.get(reverse('task_sync'), params, **self.get_auth_headers(user or self.employee))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_full_sync_then_empty_delta(self):
+        data = self.sync()
+        self.assertTrue(data['full_sync'])
+        self.assertEqual(len(data['tasks']), 2)
+        delta = self.sync(data['sync_token'])
+        self.assertEqual(delta['tasks'], [])
+        self.assertEqual(delta['deleted'], [])
+        self.assertEqual(delta['sync_token'], data['sync_token'])
+
+    def test_delta_returns_changed_tasks_and_tombstones(self):
+        token = self.sync()['sync_token']
+        self.task.title = 'Renamed'
+        self.task.save()
+        self.other_task.assignee = None
+        self.other_task.save()
+        deleted_id = Task.objects.create(
+            title='Short lived', project=self.project, assignee=self.employee, created_by=self.scrum_master
+        ).id
+        Task.objects.filter(id=deleted_id).delete()
+
+        delta = self.sync(token)
+        self.assertEqual([task['title'] for task in delta['tasks']], ['Renamed'])
+        self.assertEqual(delta['deleted'], sorted([self.other_task.id, deleted_id]))
+        self.assertEqual(self.sync(delta['sync_token'])['tasks'], [])
+
+    def test_invalid_token_is_rejected(self):
+        response = self.client.get(reverse('task_sync'), {'since': 'abc'}, **self.get_auth_headers(self.employee))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_no_tombstones_for_tasks_never_seen(self):
+        token = self.sync()['sync_token']
+        hidden = Task.objects.create(title='Hidden', project=self.project, created_by=self.scrum_master)
+        hidden.title = 'Still hidden'
+        hidden.save()
+        hidden.delete()
+
+        delta = self.sync(token)
+        self.assertEqual(delta['tasks'], [])
+        self.assertEqual(delta['deleted'], [])
+
+    def test_project_filter_applies_to_tombstones(self):
+        other_project = Project.objects.create(name='Other Project', created_by=self.scrum_master)
+        elsewhere = Task.objects.create(
+            title='Elsewhere', project=other_project, assignee=self.employee, created_by=self.scrum_master
+        )
+        token = self.sync(project=self.project.id)['sync_token']
+        elsewhere.title = 'Renamed elsewhere'
+        elsewhere.save()
+        deleted_id = self.other_task.id
+        self.other_task.delete()
+        Task.objects.filter(id=elsewhere.id).delete()
+
+        delta = self.sync(token, project=self.project.id)
+        self.assertEqual(delta['tasks'], [])
+        self.assertEqual(delta['deleted'], [deleted_id])
+
+    def test_task_moved_out_of_filtered_project_is_tombstoned(self):
+        other_project = Project.objects.create(name='Other Project', created_by=self.scrum_master)
+        token = self.sync(user=self.scrum_master, project=self.project.id)['sync_token']
+        self.task.project = other_project
+        self.task.save()
+
+        delta = self.sync(token, user=self.scrum_master, project=self.project.id)
+        self.assertEqual(delta['deleted'], [self.task.id])
+        moved = self.sync(token, user=self.scrum_master, project=other_project.id)
+        self.assertEqual([task['id'] for task in moved['tasks']], [self.task.id])
+
+    def test_scrum_master_gets_tombstones_for_deactivated_projects(self):
+        token = self.sync(user=self.scrum_master)['sync_token']
+        self.project.is_active = False
+        self.project.save()
+
+        delta = self.sync(token, user=self.scrum_master)
+        self.assertEqual(delta['deleted'], sorted([self.task.id, self.other_task.id]))
+        self.assertEqual(self.sync(token)['deleted'], sorted([self.task.id, self.other_task.id]))
+
+    def test_pruned_token_must_resync(self):
+        token = self.sync()['sync_token']
+        self.task.title = 'Renamed'
+        self.task.save()
+        TaskChange.objects.update(created_at=timezone.now() - timedelta(days=31))
+        self.other_task.title = 'Renamed too'
+        self.other_task.save()
+        call_command('prune_task_changes', stdout=StringIO())
+
+        self.assertEqual(TaskChange.objects.count(), 1)
+        response = self.client.get(reverse('task_sync'), {'since': token}, **self.get_auth_headers(self.employee))
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
+        self.assertTrue(response.data['resync_required'])
+        full = self.sync()
+        self.assertEqual(self.sync(full['sync_token'])['tasks'], [])
+
+
+class BulkTaskStatusAPITest(APITestCase):
+    def setUp(self):
+        self.scrum_master = User.objects.create_user(
+            username='scrummaster',
+            email='scrum@example.com',
+            password='testpass123',
+            role='scrum_master'
+        )
+        self.employee = User.objects.create_user(
+            username='employee',
+            email='employee@example.com',
+            password='testpass123',
+            role='employee'
+        )
+        self.project = Project.objects.create(
+            name='Test Project',
+            created_by=self.scrum_master
+        )
+        self.direct_task = Task.objects.create(
+            title='Direct', project=self.project, assignee=self.employee, created_by=self.scrum_master
+        )
+        self.assigned_task = Task.objects.create(
+            title='Assigned', project=self.project, created_by=self.scrum_master
+        )
+        TaskAssignment.objects.create(task=self.assigned_task, user=self.employee)
+        self.other_task = Task.objects.create(
+            title='Other', project=self.project, created_by=self.scrum_master
+        )
+
+    def get_auth_headers(self, user):
+        refresh = RefreshToken.for_user(user)
+        access_token = str(refresh.access_token)
+        return {'HTTP_AUTHORIZATION': f'Bearer {access_token}'}
+
+    def patch(self, user, updates):
+        url = reverse('bulk_update_task_status')
+        return self.client.patch(url, {'updates': updates}, format='json', **self.get_auth_headers(user))
+
+    def test_employee_moves_assigned_tasks(self):
+        response = self.patch(self.employee, [
+            {'task_id': self.direct_task.id, 'status': 'done'},
+            {'task_id': self.assigned_task.id, 'status': 'todo'},
+        ])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['updated'], [self.direct_task.id])
+        self.assertEqual(response.data['unchanged'], [self.assigned_task.id])
+        self.direct_task.refresh_from_db()
+        self.assertEqual(self.direct_task.status, 'done')
+        self.assertIsNotNone(self.direct_task.started_at)
+        self.assertEqual(self.direct_task.completed_at, self.direct_task.updated_at)
+        activity = TaskActivity.objects.get(task=self.direct_task)
+        self.assertEqual((activity.old_value, activity.new_value), ('todo', 'done'))
+
+    def test_unassigned_task_rejects_whole_batch(self):
+        response = self.patch(self.employee, [
+            {'task_id': self.direct_task.id, 'status': 'done'},
+            {'task_id': self.other_task.id, 'status': 'done'},
+        ])
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(response.data['task_ids'], [self.other_task.id])
+        self.direct_task.refresh_from_db()
+        self.assertEqual(self.direct_task.status, 'todo')
+        self.assertFalse(TaskActivity.objects.exists())
+
+    def test_scrum_master_bulk_update_query_count(self):
+        updates = [{'task_id': task.id, 'status': 'review'} for task in (self.direct_task, self.assigned_task, self.other_task)]
+        with CaptureQueriesContext(connection) as context:
+            response = self.patch(self.scrum_master, updates)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Task.objects.filter(status='review').count(), 3)
+        self.assertEqual(TaskActivity.objects.filter(activity_type='status_changed').count(), 3)
+        # 8 for the update itself plus a fixed 6 to fan the activities out to the notification inboxes
+        self.assertLessEqual(len(context.captured_queries), 14)
+        self.project.refresh_from_db()
+        self.assertEqual((self.project.tasks_total, self.project.tasks_todo, self.project.tasks_review), (3, 0, 3))
+
+    def test_invalid_status_is_rejected(self):
+        response = self.patch(self.scrum_master, [{'task_id': self.direct_task.id, 'status': 'archived'}])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_malformed_body_is_rejected(self):
+        url = reverse('bulk_update_task_status')
+        headers = self.get_auth_headers(self.scrum_master)
+        for body in ([{'task_id': self.direct_task.id, 'status': 'done'}], {'updates': ['done']}, {'updates': [[1, 'done']]}):
+            response = self.client.patch(url, body, format='json', **headers)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class KeysetPaginationAPITest(APITestCase):
+    def setUp(self):
+        self.scrum_master = User.objects.create_user(
+            username='scrummaster',
+            email='scrum@example.com',
+            password='testpass123',
+            role='scrum_master'
+        )
+        self.project = Project.objects.create(
+            name='Test Project',
+            created_by=self.scrum_master
+        )
+        for i in range(5):
+            Task.objects.create(title=f'Task {i}', project=self.project, created_by=self.scrum_master)
+
+    def get_auth_headers(self, user):
+        refresh = RefreshToken.for_user(user)
+        access_token = str(refresh.access_token)
+        return {'HTTP_AUTHORIZATION': f'Bearer {access_token}'}
+
+    def test_cursor_pages_cover_list_without_count(self):
+        headers = self.get_auth_headers(self.scrum_master)
+        url = reverse('task_list_create') + '?pagination=cursor&page_size=2&include_total=1'
+        seen = []
+        while url:
+            response = self.client.get(url, **headers)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            seen.extend(task['id'] for task in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(response.data['total_estimate'], 5)
+        expected = list(Task.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_page_number_mode_is_default(self):
+        response = self.client.get(reverse('task_list_create'), **self.get_auth_headers(self.scrum_master))
+        self.assertEqual(response.data['count'], 5)
+
+    def test_invalid_cursor_returns_not_found(self):
+        url = reverse('task_list_create')
+        response = self.client.get(url, {'cursor': 'not-a-cursor'}, **self.get_auth_headers(self.scrum_master))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_page_size_only_applies_to_cursor_mode(self):
+        headers = self.get_auth_headers(self.scrum_master)
+        response = self.client.get(reverse('task_list_create'), {'page_size': 2}, **headers)
+        self.assertEqual(len(response.data['results']), 5)
+        response = self.client.get(reverse('task_list_create'), {'pagination': 'cursor', 'page_size': 2}, **headers)
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_cursor_mode_rejects_ordering_and_search(self):
+        headers = self.get_auth_headers(self.scrum_master)
+        for params in ({'ordering': 'due_date'}, {'search': 'Task'}):
+            response = self.client.get(reverse('task_list_create'), {'pagination': 'cursor', **params}, **headers)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(reverse('task_list_create'), {'ordering': 'due_date'}, **headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class ConditionalGetAPITest(APITestCase):
+    def setUp(self):
+        self.scrum_master = User.objects.create_user(
+            username='scrummaster',
+            email='scrum@example.com',
+            password='testpass123',
+            role='scrum_master'
+        )
+        self.employee = User.objects.create_user(
+            username='employee',
+            email='employee@example.com',
+            password='testpass123',
+            role='employee'
+        )
+        self.project = Project.objects.create(
+            name='Test Project',
+            created_by=self.scrum_master
+        )
+        self.task = Task.objects.create(
+            title='Test Task',
+            project=self.project,
+            assignee=self.employee,
+            created_by=self.scrum_master
+        )
+
+    def get_auth_headers(self, user):
+        refresh = RefreshToken.for_user(user)
+        access_token = str(refresh.access_token)
+        return {'HTTP_AUTHORIZATION': f'Bearer {access_token}'}
+
+    def assertRevalidates(self, url_name, user, **kwargs):
+        url = reverse(url_name, **kwargs)
+        headers = self.get_auth_headers(user)
+        response = self.client.get(url, **headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('Authorization', response['Vary'])
+        etag = response['ETag']
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag, **headers)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+        return etag, len(context.captured_queries)
+
+    def test_task_list_not_modified_until_task_changes(self):
+        etag, _queries = self.assertRevalidates('task_list_create', self.employee)
+        TaskComment.objects.create(task=self.task, author=self.employee, content='New comment')
+        response = self.client.get(reverse('task_list_create'), HTTP_IF_NONE_MATCH=etag, **self.get_auth_headers(self.employee))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_validators_are_scoped_per_user(self):
+        etag, _queries = self.assertRevalidates('task_list_create', self.employee)
+        response = self.client.get(reverse('task_list_create'), HTTP_IF_NONE_MATCH=etag, **self.get_auth_headers(self.scrum_master))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_changes_to_unseen_tasks_keep_validators(self):
+        etag, _queries = self.assertRevalidates('task_list_create', self.employee)
+        Task.objects.create(title='Not for you', project=self.project, created_by=self.scrum_master)
+        response = self.client.get(reverse('task_list_create'), HTTP_IF_NONE_MATCH=etag, **self.get_auth_headers(self.employee))
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_analytics_revalidate_once_a_task_falls_overdue(self):
+        self.task.due_date = timezone.now() + timedelta(hours=1)
+        self.task.save()
+        etag, _queries = self.assertRevalidates('task_analytics', self.employee)
+        # The clock passing the due date, with no scan or save since
+        Task.objects.filter(id=self.task.id).update(due_date=timezone.now() - timedelta(minutes=1))
+        response = self.client.get(reverse('task_analytics'), HTTP_IF_NONE_MATCH=etag, **self.get_auth_headers(self.employee))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['overdue_tasks'], 1)
+
+    def test_kanban_and_analytics_not_modified(self):
+        self.assertRevalidates('kanban_tasks', self.employee)
+        self.assertRevalidates('task_analytics', self.scrum_master)
+        self.assertRevalidates('project_analytics', self.scrum_master, kwargs={'project_id': self.project.id})
+
+    def test_project_list_not_modified_skips_serialization(self):
+        with CaptureQueriesContext(connection) as full:
+            self.client.get(reverse('project_list_create'), **self.get_auth_headers(self.scrum_master))
+        full_queries = len(full.captured_queries)
+        _etag, queries = self.assertRevalidates('project_list_create', self.scrum_master)
+        self.assertLess(queries, full_queries)
+
+
+class TaskSearchAPITest(APITestCase):
+    def setUp(self):
+        self.scrum_master = User.objects.create_user(
+            username='scrummaster',
+            email='scrum@example.com',
+            password='testpass123',
+            role='scrum_master'
+        )
+        self.employee = User.objects.create_user(
+            username='employee',
+            email='employee@example.com',
+            password='testpass123',
+            role='employee'
+        )
+        self.project = Project.objects.create(
+            name='Test Project',
+            created_by=self.scrum_master
+        )
+        self.title_match = Task.objects.create(
+            title='Deploy billing service',
+            description='Roll out the new release',
+            project=self.project,
+            assignee=self.employee,
+            created_by=self.scrum_master
+        )
+        self.description_match = Task.objects.create(
+            title='Write release notes',
+            description='Summarise the billing changes',
+            project=self.project,
+            assignee=self.employee,
+            created_by=self.scrum_master
+        )
+        self.hidden = Task.objects.create(
+            title='Audit billing exports',
+            project=self.project,
+            created_by=self.scrum_master
+        )
+
+    def get_auth_headers(self, user):
+        refresh = RefreshToken.for_user(user)
+        access_token = str(refresh.access_token)
+        return {'HTTP_AUTHORIZATION': f'Bearer {access_token}'}
+
+    def search(self, user, **params):
+        response = self.client.get(reverse('task_list_create'), params, **self.get_auth_headers(user))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [task['id'] for task in response.data['results']]
+
+    def test_search_ranks_title_matches_first(self):
+        ids = self.search(self.scrum_master, search='billing')
+        self.assertCountEqual(ids[:2], [self.title_match.id, self.hidden.id])
+        self.assertEqual(ids[2], self.description_match.id)
+
+    def test_search_respects_visibility_and_filters(self):
+        self.assertEqual(self.search(self.employee, search='billing'), [self.title_match.id, self.description_match.id])
+        self.assertEqual(self.search(self.employee, search='billing', status='done'), [])
+
+    def test_search_matches_word_prefixes(self):
+        self.assertEqual(self.search(self.scrum_master, search='deploy bill'), [self.title_match.id])
+        self.assertEqual(self.search(self.scrum_master, search='export'), [self.hidden.id])
+
+    def test_search_index_follows_updates_and_deletes(self):
+        self.title_match.title = 'Deploy payments service'
+        self.title_match.save()
+        self.hidden.delete()
+        self.assertEqual(self.search(self.scrum_master, search='billing'), [self.description_match.id])
+        self.assertEqual(self.search(self.scrum_master, search='payments'), [self.title_match.id])
+
+    def test_explicit_ordering_overrides_rank(self):
+        ids = self.search(self.scrum_master, search='billing', ordering='created_at')
+        self.assertEqual(ids, [self.title_match.id, self.description_match.id, self.hidden.id])
+
+    def test_punctuation_only_search_is_ignored(self):
+        self.assertEqual(len(self.search(self.scrum_master, search='"*()')), 3)
+
+
+class GlobalSearchAPITest(APITestCase):
+    def setUp(self):
+        self.scrum_master = User.objects.create_user(
+            username='scrummaster',
+            email='scrum@example.com',
+            password='testpass123',
+            first_name='Sarah',
+            last_name='Connor',
+            role='scrum_master'
+        )
+        self.employee = User.objects.create_user(
+            username='employee',
+            email='employee@example.com',
+            password='testpass123',
+            first_name='Dana',
+            last_name='Deployer',
+            role='employee'
+        )
+        self.project = Project.objects.create(
+            name='Deployment Pipeline',
+            description='Automate the release process',
+            created_by=self.scrum_master
+        )
+        self.other_project = Project.objects.create(
+            name='Deployment Audit',
+            created_by=self.scrum_master
+        )
+        self.task = Task.objects.create(
+            title='Deploy staging cluster',
+            project=self.project,
+            assignee=self.employee,
+            created_by=self.scrum_master
+        )
+        self.hidden_task = Task.objects.create(
+            title='Deploy audit tooling',
+            project=self.other_project,
+            created_by=self.scrum_master
+        )
+        ProjectMessage.objects.create(project=self.project, author=self.scrum_master, content='Deploy window moved to Friday')
+        ProjectMessage.objects.create(project=self.other_project, author=self.scrum_master, content='Deploy audit notes')
+
+    def get_auth_headers(self, user):
+        refresh = RefreshToken.for_user(user)
+        access_token = str(refresh.access_token)
+        return {'HTTP_AUTHORIZATION': f'Bearer {access_token}'}
+
+    def search(self, user, **params):
+        response = self.client.get(reverse('global_search'), params, **self.get_auth_headers(user))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_search_covers_every_type(self):
+        data = self.search(self.scrum_master, q='deplo', limit=20)
+        found = {(result['type'], result['id']) for result in data['results']}
+        self.assertTrue({('task', self.task.id), ('task', self.hidden_task.id),
+                         ('project', self.project.id), ('user', self.employee.id)} <= found)
+        self.assertEqual(len([result for result in data['results'] if result['type'] == 'message']), 2)
+        self.assertFalse(data['partial'])
+        scores = [result['score'] for result in data['results']]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+    def test_search_is_permission_aware(self):
+        data = self.search(self.employee, q='deploy', limit=20)
+        found = {(result['type'], result['id']) for result in data['results']}
+        self.assertIn(('task', self.task.id), found)
+        self.assertIn(('project', self.project.id), found)
+        self.assertNotIn(('task', self.hidden_task.id), found)
+        self.assertNotIn(('project', self.other_project.id), found)
+        self.assertFalse([result for result in data['results'] if result['type'] == 'user'])
+        # The assignee belongs to the project, so its chat is searchable but not the other project's
+        messages = [result['project_id'] for result in data['results'] if result['type'] == 'message']
+        self.assertEqual(messages, [self.project.id])
+
+    def test_search_tolerates_typos(self):
+        data = self.search(self.scrum_master, q='stagign', types='task')
+        self.assertEqual([result['id'] for result in data['results']], [self.task.id])
+        self.assertGreater(data['results'][0]['score'], 0)
+
+    def test_scores_are_normalised_per_type(self):
+        data = self.search(self.scrum_master, q='deplo', limit=20)
+        for type_name in ('task', 'project', 'message', 'user'):
+            scores = [result['score'] for result in data['results'] if result['type'] == type_name]
+            self.assertEqual(max(scores), 1.0)
+            self.assertTrue(all(0.5 <= score <= 1.0 for score in scores))
+        typo = self.search(self.scrum_master, q='stagign')['results']
+        exact = self.search(self.scrum_master, q='staging')['results']
+        self.assertLess(typo[0]['score'], exact[0]['score'])
+
+    def test_limit_and_type_filter(self):
+        data = self.search(self.scrum_master, q='deploy', types='task,project', limit=3)
+        self.assertEqual(len(data['results']), 3)
+        self.assertTrue(all(result['type'] in ('task', 'project') for result in data['results']))
+
+    def test_short_query_returns_nothing(self):
+        self.assertEqual(self.search(self.scrum_master, q='d')['results'], [])
+
+    @override_settings(SEARCH_TIME_BUDGET_MS=0)
+    def test_exhausted_budget_returns_partial_results(self):
+        data = self.search(self.scrum_master, q='deploy')
+        self.assertTrue(data['partial'])
+
+
 class ProjectAPITest(APITestCase):
     def setUp(self):
         self.scrum_master = User.objects.create_user(
@@ -226,6 +1047,12 @@ class ProjectAPITest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data), 1)
 
+    def test_get_projects_with_sparse_fields(self):
+        url = reverse('project_list_create')
+        response = self.client.get(url, {'fields': 'id,name'}, **self.get_auth_headers(self.scrum_master))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'], [{'id': self.project.id, 'name': self.project.name}])
+
     def test_get_project_analytics(self):
         url = reverse('project_analytics', kwargs={'project_id': self.project.id})
         response = self.client.get(url, **self.get_auth_headers(self.scrum_master))
@@ -234,6 +1061,791 @@ class ProjectAPITest(APITestCase):
         self.assertIn('total_tasks', response.data)
 
 
+class ProjectAnalyticsQueryTest(APITestCase):
+    def setUp(self):
+        self.scrum_master = User.objects.create_user(
+            username='scrummaster',
+            email='scrum@example.com',
+            password='testpass123',
+            role='scrum_master'
+        )
+        self.project = Project.objects.create(
+            name='Test Project',
+            created_by=self.scrum_master
+        )
+        self.member_count = 0
+
+    def get_auth_headers(self, user):
+        refresh = RefreshToken.for_user(user)
+        access_token = str(refresh.access_token)
+        return {'HTTP_AUTHORIZATION': f'Bearer {access_token}'}
+
+    def add_member(self, task_count, role=None):
+        self.member_count += 1
+        employee = User.objects.create_user(
+            username=f'employee{self.member_count}',
+            email=f'employee{self.member_count}@example.com',
+            password='testpass123',
+            role='employee'
+        )
+        if role:
+            ProjectMember.objects.create(project=self.project, user=employee, role=role)
+        for i in range(task_count):
+            Task.objects.create(
+                title=f'Task {i} for {employee.username}',
+                project=self.project,
+                assignee=employee,
+                created_by=self.scrum_master,
+                status='done' if i % 2 else 'todo'
+            )
+        return employee
+
+    def get(self, url_name):
+        url = reverse(url_name, kwargs={'project_id': self.project.id})
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, **self.get_auth_headers(self.scrum_master))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data, len(context.captured_queries)
+
+    def test_member_performance_breakdown_roles_and_recent_tasks(self):
+        lead = self.add_member(7, role='scrum_master')
+        helper = self.add_member(1)
+        TaskAssignment.objects.create(task=Task.objects.filter(assignee=lead).first(), user=helper)
+        data, _queries = self.get('project_member_performance')
+
+        by_id = {member['user_id']: member for member in data['members']}
+        self.assertEqual(by_id[lead.id]['role'], 'Scrum Master')
+        self.assertEqual(by_id[helper.id]['role'], 'Employee')
+        self.assertEqual((by_id[lead.id]['total_tasks'], by_id[lead.id]['completed_tasks']), (7, 3))
+        self.assertEqual(by_id[helper.id]['total_tasks'], 2)
+
+        recent = by_id[lead.id]['recent_tasks']
+        self.assertEqual(len(recent), 5)
+        expected = list(Task.objects.filter(assignee=lead).order_by('-updated_at', '-id').values_list('id', flat=True)[:5])
+        self.assertEqual([task['id'] for task in recent], expected)
+
+    def test_query_counts_do_not_grow_with_members(self):
+        self.add_member(2, role='employee')
+        _data, analytics_baseline = self.get('project_analytics')
+        _data, performance_baseline = self.get('project_member_performance')
+        for _ in range(5):
+            self.add_member(3, role='employee')
+        data, analytics_queries = self.get('project_analytics')
+        self.assertEqual(data['team_members'], 6)
+        self.assertEqual(analytics_queries, analytics_baseline)
+        data, performance_queries = self.get('project_member_performance')
+        self.assertEqual(len(data['members']), 6)
+        self.assertEqual(performance_queries, performance_baseline)
+
+
+class ProjectListQueryTest(APITestCase):
+    # Auth, four validator queries (ETag), the page count, the page and the members prefetch
+    QUERY_BUDGET = 8
+
+    def setUp(self):
+        self.scrum_master = User.objects.create_user(
+            username='scrummaster',
+            email='scrum@example.com',
+            password='testpass123',
+            role='scrum_master'
+        )
+        self.employee = User.objects.create_user(
+            username='employee',
+            email='employee@example.com',
+            password='testpass123',
+            role='employee'
+        )
+        self.project_count = 0
+
+    def get_auth_headers(self, user):
+        refresh = RefreshToken.for_user(user)
+        access_token = str(refresh.access_token)
+        return {'HTTP_AUTHORIZATION': f'Bearer {access_token}'}
+
+    def add_projects(self, count):
+        for _ in range(count):
+            self.project_count += 1
+            project = Project.objects.create(name=f'Project {self.project_count}', created_by=self.scrum_master)
+            ProjectMember.objects.create(project=project, user=self.employee)
+            helper = User.objects.create_user(
+                username=f'helper{self.project_count}', email=f'helper{self.project_count}@example.com', role='employee'
+            )
+            ProjectMember.objects.create(project=project, user=helper)
+            for task_status in ('todo', 'done', 'done'):
+                Task.objects.create(
+                    title=f'Task in {project.name}', project=project, assignee=helper,
+                    created_by=self.scrum_master, status=task_status
+                )
+
+    def list_projects(self, url_name, user):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse(url_name), **self.get_auth_headers(user))
+        queries = len(context.captured_queries)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data['results'], queries
+
+    def test_project_list_stays_within_query_budget(self):
+        self.add_projects(2)
+        _results, baseline = self.list_projects('project_list_create', self.scrum_master)
+        self.add_projects(8)
+        results, queries = self.list_projects('project_list_create', self.scrum_master)
+
+        self.assertEqual(len(results), 10)
+        self.assertEqual(queries, baseline)
+        self.assertLessEqual(queries, self.QUERY_BUDGET)
+        project = results[0]
+        self.assertEqual((project['task_count'], project['member_count'], project['progress_percentage']), (3, 2, 66.7))
+        self.assertEqual(project['task_stats']['done'], 2)
+        self.assertEqual(len(project['members']), 2)
+
+    def test_my_projects_stays_within_query_budget(self):
+        self.add_projects(2)
+        _results, baseline = self.list_projects('my_projects_list', self.employee)
+        self.add_projects(8)
+        results, queries = self.list_projects('my_projects_list', self.employee)
+        self.assertEqual(len(results), 10)
+        self.assertEqual(queries, baseline)
+        self.assertLessEqual(queries, self.QUERY_BUDGET)
+
+
+class MyProjectsQueryTest(APITestCase):
+    TASKS_PER_PROJECT = 100
+
+    def setUp(self):
+        from tasks.visibility import refresh_task_visibility
+        self.scrum_master = User.objects.create_user(
+            username='scrummaster',
+            email='scrum@example.com',
+            password='testpass123',
+            role='scrum_master'
+        )
+        self.employee = User.objects.create_user(
+            username='employee',
+            email='employee@example.com',
+            password='testpass123',
+            role='employee'
+        )
+        self.member_project = self.create_project('Member project')
+        self.assigned_project = self.create_project('Assigned project')
+        self.other_project = self.create_project('Other project')
+        self.direct_project = self.create_project('Direct assignee project')
+        ProjectMember.objects.create(project=self.member_project, user=self.employee)
+        Task.objects.create(
+            title='Assigned directly', project=self.direct_project, assignee=self.employee, created_by=self.scrum_master
+        )
+        assigned_tasks = list(self.assigned_project.tasks.values_list('id', flat=True))
+        TaskAssignment.objects.bulk_create([TaskAssignment(task_id=task_id, user=self.employee) for task_id in assigned_tasks])
+        refresh_task_visibility(assigned_tasks)
+
+    def create_project(self, name):
+        project = Project.objects.create(name=name, created_by=self.scrum_master)
+        Task.objects.bulk_create([
+            Task(title=f'{name} task {i}', project=project, created_by=self.scrum_master, status='done' if i % 4 else 'todo')
+            for i in range(self.TASKS_PER_PROJECT)
+        ], batch_size=2000)
+        # bulk_create skips Task.save, so set the counters the way the repair command would
+        Project.objects.filter(id=project.id).update(
+            tasks_total=self.TASKS_PER_PROJECT, tasks_todo=self.TASKS_PER_PROJECT // 4,
+            tasks_done=self.TASKS_PER_PROJECT - self.TASKS_PER_PROJECT // 4
+        )
+        return project
+
+    def get_auth_headers(self, user):
+        refresh = RefreshToken.for_user(user)
+        access_token = str(refresh.access_token)
+        return {'HTTP_AUTHORIZATION': f'Bearer {access_token}'}
+
+    def test_projects_of_members_and_assignees_in_a_fixed_number_of_queries(self):
+        with self.assertNumQueries(ProjectListQueryTest.QUERY_BUDGET):
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(reverse('my_projects_list'), **self.get_auth_headers(self.employee))
+        queries = context.captured_queries
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # Active memberships, active TaskAssignments and tasks assigned directly (Task.assignee)
+        expected = set(ProjectMember.objects.filter(user=self.employee, is_active=True).values_list('project_id', flat=True))
+        expected |= set(TaskAssignment.objects.filter(user=self.employee, is_active=True).values_list('task__project_id', flat=True))
+        expected |= set(Task.objects.filter(assignee=self.employee).values_list('project_id', flat=True))
+        results = response.data['results']
+        self.assertEqual(
+            [project['id'] for project in results],
+            [self.direct_project.id, self.assigned_project.id, self.member_project.id]
+        )
+        self.assertEqual({project['id'] for project in results}, expected)
+        self.assertEqual(
+            [project['task_count'] for project in results],
+            [Task.objects.filter(project_id=project['id']).count() for project in results]
+        )
+
+        page_query = next(query['sql'] for query in queries if query['sql'].startswith('SELECT "projects"."id"'))
+        self.assertIn('EXISTS', page_query)
+        self.assertNotIn('JOIN "tasks"', page_query)
+        self.assertNotIn('DISTINCT', page_query)
+
+
+class ProjectStatusHistoryAPITest(APITestCase):
+    def setUp(self):
+        self.scrum_master = User.objects.create_user(
+            username='scrummaster',
+            email='scrum@example.com',
+            password='testpass123',
+            role='scrum_master'
+        )
+        self.project = Project.objects.create(
+            name='Test Project',
+            created_by=self.scrum_master
+        )
+        self.today = timezone.now().replace(hour=12, minute=0, second=0, microsecond=0)
+
+    def get_auth_headers(self, user):
+        refresh = RefreshToken.for_user(user)
+        access_token = str(refresh.access_token)
+        return {'HTTP_AUTHORIZATION': f'Bearer {access_token}'}
+
+    def create_task(self, days_ago, task_status='todo'):
+        task = Task.objects.create(
+            title=f'Task from {days_ago} days ago', project=self.project, created_by=self.scrum_master, status=task_status
+        )
+        Task.objects.filter(id=task.id).update(created_at=self.today - timedelta(days=days_ago))
+        return task
+
+    def move(self, task, new_status, days_ago):
+        activity = TaskActivity.objects.create(
+            task=task, user=self.scrum_master, activity_type='status_changed',
+            description='Status changed', old_value=task.status, new_value=new_status
+        )
+        TaskActivity.objects.filter(id=activity.id).update(created_at=self.today - timedelta(days=days_ago))
+        task.status = new_status
+        task.save(update_fields=['status'])
+
+    def history(self, **params):
+        url = reverse('project_status_history', kwargs={'project_id': self.project.id})
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, params, **self.get_auth_headers(self.scrum_master))
+        queries = len(context.captured_queries)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {str(day['date']): day for day in response.data['days']}, queries
+
+    def day(self, days_ago):
+        return str((self.today - timedelta(days=days_ago)).date())
+
+    def test_incremental_rollup_matches_rebuild(self):
+        from tasks.snapshots import update_status_snapshots
+        first = self.create_task(5)
+        second = self.create_task(4)
+        self.move(first, 'in_progress', 3)
+        update_status_snapshots()
+
+        self.move(first, 'done', 1)
+        self.move(second, 'review', 1)
+        self.create_task(0, 'todo')
+        update_status_snapshots()
+
+        days, queries = self.history(start=self.day(6), end=self.day(0))
+        self.assertEqual(queries, 3)
+        self.assertEqual(days[self.day(6)]['total'], 0)
+        self.assertEqual((days[self.day(4)]['todo'], days[self.day(4)]['total']), (2, 2))
+        self.assertEqual((days[self.day(2)]['todo'], days[self.day(2)]['in_progress']), (1, 1))
+        self.assertEqual(
+            {name: days[self.day(0)][name] for name in ('todo', 'in_progress', 'review', 'done')},
+            {'todo': 1, 'in_progress': 0, 'review': 1, 'done': 1}
+        )
+
+        update_status_snapshots(rebuild=True)
+        rebuilt, _queries = self.history(start=self.day(6), end=self.day(0))
+        self.assertEqual(rebuilt, days)
+
+    def test_counts_carry_into_range_from_earlier_rows(self):
+        from tasks.snapshots import update_status_snapshots
+        self.create_task(20, 'done')
+        update_status_snapshots()
+        days, _queries = self.history(start=self.day(3), end=self.day(0))
+        self.assertEqual(len(days), 4)
+        self.assertTrue(all(day['done'] == 1 for day in days.values()))
+
+    def test_job_reads_only_new_rows(self):
+        from tasks.models import RollupWatermark
+        from tasks.snapshots import SNAPSHOT_WATERMARK, update_status_snapshots
+        task = self.create_task(2)
+        self.move(task, 'review', 1)
+        update_status_snapshots()
+        watermark = RollupWatermark.objects.get(name=SNAPSHOT_WATERMARK)
+        self.assertEqual(watermark.last_activity_id, TaskActivity.objects.latest('id').id)
+        self.assertEqual(update_status_snapshots(), 0)
+
+    def test_deletes_and_project_moves_are_reconciled(self):
+        from tasks.snapshots import update_status_snapshots
+        other = Project.objects.create(name='Other Project', created_by=self.scrum_master)
+        kept = self.create_task(3)
+        deleted = self.create_task(3, 'done')
+        moved = self.create_task(3, 'review')
+        update_status_snapshots()
+
+        deleted.delete()
+        moved.project = other
+        moved.save()
+        update_status_snapshots()
+        days, _queries = self.history(start=self.day(3), end=self.day(0))
+        self.assertEqual((days[self.day(1)]['total'], days[self.day(0)]['total']), (3, 1))
+        self.assertEqual(days[self.day(0)]['todo'], 1)
+        self.assertEqual(Task.objects.filter(project=self.project).get(), kept)
+        self.assertEqual(update_status_snapshots(), 0)
+
+    def test_changes_committed_behind_the_watermark_are_reconciled(self):
+        from tasks.models import RollupWatermark
+        from tasks.snapshots import SNAPSHOT_WATERMARK, update_status_snapshots
+        task = self.create_task(2)
+        update_status_snapshots()
+        # A change whose id a previous run already read past, as when its transaction committed late
+        self.move(task, 'done', 0)
+        RollupWatermark.objects.filter(name=SNAPSHOT_WATERMARK).update(last_activity_id=TaskActivity.objects.latest('id').id)
+        update_status_snapshots()
+        days, _queries = self.history(start=self.day(1), end=self.day(0))
+        self.assertEqual((days[self.day(1)]['todo'], days[self.day(0)]['todo'], days[self.day(0)]['done']), (1, 0, 1))
+        self.assertEqual(update_status_snapshots(), 0)
+
+    def test_job_queries_do_not_grow_with_changes(self):
+        from tasks.snapshots import update_status_snapshots
+
+        def run():
+            with CaptureQueriesContext(connection) as context:
+                update_status_snapshots()
+            # The reconcile reads the project counters, never the tasks table
+            self.assertFalse([query for query in context.captured_queries if 'GROUP BY "tasks"."project_id", "tasks"."status"' in query['sql']])
+            return len(context.captured_queries)
+
+        update_status_snapshots()
+        self.move(self.create_task(3), 'review', 2)
+        few = run()
+        for days_ago in range(6):
+            project = Project.objects.create(name=f'Project {days_ago}', created_by=self.scrum_master)
+            task = Task.objects.create(title='Task', project=project, created_by=self.scrum_master)
+            Task.objects.filter(id=task.id).update(created_at=self.today - timedelta(days=days_ago))
+            self.move(task, 'done', days_ago)
+        self.assertEqual(run(), few)
+
+    def test_invalid_range_is_rejected(self):
+        url = reverse('project_status_history', kwargs={'project_id': self.project.id})
+        headers = self.get_auth_headers(self.scrum_master)
+        for params in ({'start': 'yesterday'}, {'start': '2026-02-01', 'end': '2026-01-01'}, {'start': '2020-01-01', 'end': '2026-01-01'}):
+            response = self.client.get(url, params, **headers)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ProjectMessageWindowAPITest(APITestCase):
+    def setUp(self):
+        self.scrum_master = User.objects.create_user(
+            username='scrummaster',
+            email='scrum@example.com',
+            password='testpass123',
+            role='scrum_master'
+        )
+        self.project = Project.objects.create(
+            name='Test Project',
+            created_by=self.scrum_master
+        )
+        self.authors = []
+        for index in range(3):
+            author = User.objects.create_user(
+                username=f'member{index}', email=f'member{index}@example.com', password='testpass123', role='employee'
+            )
+            ProjectMember.objects.create(project=self.project, user=author, role='employee' if index else 'scrum_master')
+            self.authors.append(author)
+        self.messages = [
+            ProjectMessage.objects.create(project=self.project, author=self.authors[index % 3], content=f'Message {index}')
+            for index in range(12)
+        ]
+        self.url = reverse('project_messages', kwargs={'project_id': self.project.id})
+
+    def get_auth_headers(self, user):
+        refresh = RefreshToken.for_user(user)
+        access_token = str(refresh.access_token)
+        return {'HTTP_AUTHORIZATION': f'Bearer {access_token}'}
+
+    def fetch(self, **params):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url, params, **self.get_auth_headers(self.scrum_master))
+        queries = len(context.captured_queries)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data, queries
+
+    def ids(self, data):
+        return [message['id'] for message in data['results']]
+
+    def test_after_id_returns_only_new_messages(self):
+        last = self.messages[-1].id
+        data, _queries = self.fetch(after_id=last)
+        self.assertEqual((data['results'], data['has_more']), ([], False))
+
+        data, _queries = self.fetch(after_id=self.messages[8].id)
+        self.assertEqual(self.ids(data), [message.id for message in self.messages[9:]])
+
+        data, _queries = self.fetch(after_id=self.messages[0].id, page_size=5)
+        self.assertEqual(self.ids(data), [message.id for message in self.messages[1:6]])
+        self.assertTrue(data['has_more'])
+
+    def test_before_id_and_latest_page_are_oldest_first(self):
+        data, _queries = self.fetch(pagination='window', page_size=5)
+        self.assertEqual(self.ids(data), [message.id for message in self.messages[7:]])
+        self.assertTrue(data['has_more'])
+
+        data, _queries = self.fetch(before_id=self.messages[7].id, page_size=5)
+        self.assertEqual(self.ids(data), [message.id for message in self.messages[2:7]])
+
+        data, _queries = self.fetch(before_id=self.messages[2].id, page_size=5)
+        self.assertEqual(self.ids(data), [message.id for message in self.messages[:2]])
+        self.assertFalse(data['has_more'])
+
+    @override_settings(CHAT_MAX_PAGE_SIZE=4)
+    def test_page_size_is_bounded(self):
+        data, _queries = self.fetch(after_id=0, page_size=1000)
+        self.assertEqual(len(data['results']), 4)
+        response = self.client.get(self.url, {'after_id': 'latest'}, **self.get_auth_headers(self.scrum_master))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_author_roles_are_batched(self):
+        data, small_queries = self.fetch(pagination='window', page_size=3)
+        self.assertEqual([message['author_role'] for message in data['results']], ['Scrum Master', 'Employee', 'Employee'])
+        data, queries = self.fetch(pagination='window', page_size=12)
+        self.assertEqual(len(data['results']), 12)
+        self.assertEqual(queries, small_queries)
+
+
+class ProjectChatWebSocketTest(TestCase):
+    def setUp(self):
+        self.scrum_master = User.objects.create_user(
+            username='scrummaster',
+            email='scrum@example.com',
+            password='testpass123',
+            role='scrum_master'
+        )
+        self.member = User.objects.create_user(
+            username='member', email='member@example.com', password='testpass123', role='employee'
+        )
+        self.outsider = User.objects.create_user(
+            username='outsider', email='outsider@example.com', password='testpass123', role='employee'
+        )
+        self.project = Project.objects.create(name='Test Project', created_by=self.scrum_master)
+        ProjectMember.objects.create(project=self.project, user=self.member)
+
+    def ticket(self, user):
+        from taskflow.realtime import issue_ticket
+        return issue_ticket(user)
+
+    async def connect(self, ticket, name='ticket'):
+        import asyncio
+        from taskflow.asgi import application
+
+        inbox, outbox = asyncio.Queue(), asyncio.Queue()
+        scope = {
+            'type': 'websocket',
+            'path': f'/ws/projects/{self.project.id}/chat/',
+            'query_string': f'{name}={ticket}'.encode(),
+        }
+        task = asyncio.ensure_future(application(scope, inbox.get, outbox.put))
+        await inbox.put({'type': 'websocket.connect'})
+        reply = await asyncio.wait_for(outbox.get(), 5)
+        return reply, inbox, outbox, task
+
+    def post_message(self, content):
+        with self.captureOnCommitCallbacks(execute=True):
+            return ProjectMessage.objects.create(project=self.project, author=self.scrum_master, content=content)
+
+    def edit_message(self, message):
+        with self.captureOnCommitCallbacks(execute=True):
+            message.content = 'Edited'
+            message.is_edited = True
+            message.save()
+
+    async def test_member_receives_created_and_edited_messages(self):
+        import asyncio
+        import json
+        from asgiref.sync import sync_to_async
+        from projects.realtime import chat_topic
+        from taskflow.realtime import get_broker
+
+        reply, inbox, outbox, task = await self.connect(await sync_to_async(self.ticket)(self.member))
+        self.assertEqual(reply['type'], 'websocket.accept')
+
+        message = await sync_to_async(self.post_message)('Standup moved')
+        created = json.loads((await asyncio.wait_for(outbox.get(), 5))['text'])
+        self.assertEqual(created['type'], 'message.created')
+        self.assertEqual((created['message']['id'], created['message']['content']), (message.id, 'Standup moved'))
+
+        await sync_to_async(self.edit_message)(message)
+        updated = json.loads((await asyncio.wait_for(outbox.get(), 5))['text'])
+        self.assertEqual((updated['type'], updated['message']['content']), ('message.updated', 'Edited'))
+
+        await inbox.put({'type': 'websocket.disconnect', 'code': 1000})
+        await asyncio.wait_for(task, 5)
+        self.assertNotIn(chat_topic(self.project.id), get_broker().subscribers)
+
+    async def test_access_is_checked_at_connect(self):
+        import asyncio
+        from asgiref.sync import sync_to_async
+
+        reply, _inbox, _outbox, _task = await self.connect(await sync_to_async(self.ticket)(self.outsider))
+        self.assertEqual((reply['type'], reply['code']), ('websocket.close', 4403))
+        reply, _inbox, _outbox, _task = await self.connect('not-a-ticket')
+        self.assertEqual((reply['type'], reply['code']), ('websocket.close', 4401))
+        # Neither a spent ticket nor an access token in the URL gets in
+        ticket = await sync_to_async(self.ticket)(self.member)
+        reply, inbox, _outbox, task = await self.connect(ticket)
+        self.assertEqual(reply['type'], 'websocket.accept')
+        await inbox.put({'type': 'websocket.disconnect', 'code': 1000})
+        await asyncio.wait_for(task, 5)
+        reply, _inbox, _outbox, _task = await self.connect(ticket)
+        self.assertEqual((reply['type'], reply['code']), ('websocket.close', 4401))
+        token = str(RefreshToken.for_user(self.member).access_token)
+        reply, _inbox, _outbox, _task = await self.connect(token, name='token')
+        self.assertEqual((reply['type'], reply['code']), ('websocket.close', 4401))
+
+    @override_settings(REALTIME_QUEUE_SIZE=2)
+    async def test_slow_subscriber_is_told_to_resync(self):
+        import asyncio
+        from taskflow.realtime import InMemoryBroker
+
+        broker = InMemoryBroker()
+        subscription = broker.subscribe(['topic'])
+        for index in range(5):
+            broker.publish(['topic'], {'type': 'event', 'index': index})
+        await asyncio.sleep(0)
+        events = [(await subscription.get())[1] for _index in range(3)]
+        self.assertEqual([event.get('index') for event in events], [0, 1, None])
+        self.assertEqual(events[2]['type'], 'resync')
+        subscription.close()
+        self.assertEqual(broker.subscribers, {})
+
+
+@override_settings(DUE_ALERT_SCAN_SECONDS=0)
+class EventStreamTest(TestCase):
+    def setUp(self):
+        self.scrum_master = User.objects.create_user(
+            username='scrummaster',
+            email='scrum@example.com',
+            password='testpass123',
+            role='scrum_master'
+        )
+        self.employee = User.objects.create_user(
+            username='employee', email='employee@example.com', password='testpass123', role='employee'
+        )
+        self.project = Project.objects.create(name='Test Project', created_by=self.scrum_master)
+
+    def ticket(self, user):
+        response = self.client.post(
+            reverse('stream_ticket'), HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.json()['ticket']
+
+    def create_tasks(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            mine = Task.objects.create(
+                title='Mine', project=self.project, created_by=self.scrum_master, assignee=self.employee
+            )
+            Task.objects.create(title='Not mine', project=self.project, created_by=self.scrum_master)
+        return mine
+
+    async def read_events(self, user, count, last_event_id):
+        import asyncio
+        import json
+        from asgiref.sync import sync_to_async
+
+        ticket = await sync_to_async(self.ticket)(user)
+        response = await self.async_client.get(
+            f'/api/stream/?ticket={ticket}', headers={'Last-Event-ID': str(last_event_id)}
+        )
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        chunks = response.streaming_content
+        events = []
+        try:
+            while len(events) < count:
+                chunk = (await asyncio.wait_for(chunks.__anext__(), 5)).decode()
+                if chunk.startswith(('retry:', ':')):
+                    continue
+                fields = dict(line.split(': ', 1) for line in chunk.strip().split('\n'))
+                events.append((fields.get('id'), fields['event'], json.loads(fields['data'])))
+        finally:
+            await chunks.aclose()
+        return events
+
+    async def test_missed_events_are_replayed_to_the_users_who_see_them(self):
+        from asgiref.sync import sync_to_async
+        from taskflow.realtime import get_broker
+
+        before = get_broker().last_id
+        mine = await sync_to_async(self.create_tasks)()
+
+        events = await self.read_events(self.employee, 1, before)
+        self.assertEqual([(event_type, data['task']['id']) for _id, event_type, data in events], [('task.created', mine.id)])
+
+        events = await self.read_events(self.scrum_master, 2, before)
+        self.assertEqual([data['task']['title'] for _id, _type, data in events], ['Mine', 'Not mine'])
+        self.assertEqual(int(events[1][0]), get_broker().last_id)
+
+    async def test_unknown_last_event_id_asks_for_resync(self):
+        from taskflow.realtime import get_broker
+
+        events = await self.read_events(self.employee, 1, get_broker().last_id + 100)
+        self.assertEqual(events, [(None, 'resync', {'type': 'resync'})])
+
+    async def test_due_soon_alerts_follow_visibility(self):
+        import asyncio
+        from asgiref.sync import sync_to_async
+        from tasks.due import scan_due_tasks
+        from tasks.realtime import user_topic
+        from taskflow.realtime import get_broker
+
+        def scan():
+            with self.captureOnCommitCallbacks(execute=True):
+                scan_due_tasks()
+
+        mine = await sync_to_async(self.create_tasks)()
+        # Moved into the window behind save's back, as the clock would
+        await sync_to_async(Task.objects.update)(due_date=timezone.now() + timedelta(hours=47))
+        subscription = get_broker().subscribe([user_topic(self.employee.id)])
+        await sync_to_async(scan)()
+        events = [(await asyncio.wait_for(subscription.get(), 5))[1] for _ in range(2)]
+        subscription.close()
+        self.assertEqual(events[0]['notification']['task_id'], mine.id)
+        self.assertEqual((events[1]['type'], events[1]['task']['id']), ('task.due_soon', mine.id))
+
+    @override_settings(DUE_ALERT_SCAN_SECONDS=3600)
+    async def test_server_startup_starts_the_due_date_scan(self):
+        import asyncio
+        from tasks import realtime
+        from taskflow.asgi import application
+
+        inbox, outbox = asyncio.Queue(), asyncio.Queue()
+        server = asyncio.ensure_future(application({'type': 'lifespan'}, inbox.get, outbox.put))
+        await inbox.put({'type': 'lifespan.startup'})
+        self.assertEqual(await asyncio.wait_for(outbox.get(), 5), {'type': 'lifespan.startup.complete'})
+        self.assertFalse(realtime._due_alerts.done())
+        await inbox.put({'type': 'lifespan.shutdown'})
+        self.assertEqual(await asyncio.wait_for(outbox.get(), 5), {'type': 'lifespan.shutdown.complete'})
+        await server
+        realtime._due_alerts.cancel()
+
+    async def test_stream_requires_a_valid_ticket(self):
+        response = await self.async_client.get('/api/stream/?ticket=invalid')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        # Access tokens are only accepted in the Authorization header
+        token = str(RefreshToken.for_user(self.employee).access_token)
+        response = await self.async_client.get(f'/api/stream/?token={token}')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_tickets_are_single_use_and_expire(self):
+        from taskflow.realtime import redeem_ticket
+
+        ticket = self.ticket(self.employee)
+        self.assertEqual(redeem_ticket(ticket), self.employee)
+        self.assertIsNone(redeem_ticket(ticket))
+        with override_settings(REALTIME_TICKET_SECONDS=-1):
+            self.assertIsNone(redeem_ticket(self.ticket(self.employee)))
+        self.assertEqual(self.client.post(reverse('stream_ticket')).status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class NotificationInboxAPITest(APITestCase):
+    def setUp(self):
+        self.scrum_master = User.objects.create_user(
+            username='scrummaster',
+            email='scrum@example.com',
+            password='testpass123',
+            role='scrum_master'
+        )
+        self.other_master = User.objects.create_user(
+            username='othermaster', email='other@example.com', password='testpass123', role='scrum_master'
+        )
+        self.employee = User.objects.create_user(
+            username='employee', email='employee@example.com', password='testpass123', role='employee'
+        )
+        self.outsider = User.objects.create_user(
+            username='outsider', email='outsider@example.com', password='testpass123', role='employee'
+        )
+        self.project = Project.objects.create(name='Test Project', created_by=self.scrum_master)
+        self.task = Task.objects.create(
+            title='Write report', project=self.project, created_by=self.scrum_master, assignee=self.employee
+        )
+        self.url = reverse('notifications')
+
+    def get_auth_headers(self, user):
+        refresh = RefreshToken.for_user(user)
+        access_token = str(refresh.access_token)
+        return {'HTTP_AUTHORIZATION': f'Bearer {access_token}'}
+
+    def log_activity(self, user, description='Status changed'):
+        return TaskActivity.objects.create(
+            task=self.task, user=user, activity_type='status_changed', description=description
+        )
+
+    def inbox(self, user, **params):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url, params, **self.get_auth_headers(user))
+        queries = len(context.captured_queries)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data, queries
+
+    def test_activity_fans_out_to_everyone_who_sees_the_task(self):
+        activity = self.log_activity(self.scrum_master)
+        data, _queries = self.inbox(self.employee)
+        self.assertEqual([(item['type'], item['id']) for item in data['items']], [('activity', activity.id)])
+        self.assertEqual(data['unread_count'], 1)
+        self.assertEqual(self.inbox(self.other_master)[0]['unread_count'], 1)
+        # Nobody is notified of their own activity, nor of tasks they cannot see
+        self.assertEqual(self.inbox(self.scrum_master)[0]['items'], [])
+        self.assertEqual(self.inbox(self.outsider)[0]['items'], [])
+
+    def test_messages_reach_the_owner_and_members(self):
+        ProjectMember.objects.create(project=self.project, user=self.outsider)
+        message = ProjectMessage.objects.create(project=self.project, author=self.employee, content='Draft is ready')
+        for user in (self.scrum_master, self.outsider):
+            items = self.inbox(user)[0]['items']
+            self.assertEqual([(item['type'], item['id'], item['author_name']) for item in items], [
+                ('message', message.id, self.employee.get_full_name())
+            ])
+        self.assertEqual(self.inbox(self.other_master)[0]['items'], [])
+
+    def test_read_is_constant_queries_and_pages_back(self):
+        self.log_activity(self.scrum_master, 'First')
+        _data, few_queries = self.inbox(self.employee)
+        for index in range(30):
+            self.log_activity(self.scrum_master, f'Change {index}')
+        data, queries = self.inbox(self.employee, limit=10)
+        self.assertEqual(queries, few_queries)
+        self.assertEqual([item['description'] for item in data['items']][:2], ['Change 29', 'Change 28'])
+        self.assertEqual(data['unread_count'], 31)
+
+        older, _queries = self.inbox(self.employee, before=data['next_before'], limit=25)
+        self.assertEqual(len(older['items']), 21)
+        self.assertIsNone(older['next_before'])
+        self.assertEqual(older['items'][-1]['description'], 'First')
+
+    def test_mark_read_moves_the_cursor(self):
+        first = self.log_activity(self.scrum_master)
+        self.log_activity(self.scrum_master)
+        headers = self.get_auth_headers(self.employee)
+        oldest = self.inbox(self.employee)[0]['items'][-1]['notification_id']
+
+        response = self.client.post(reverse('mark_notifications_read'), {'up_to': oldest}, format='json', **headers)
+        self.assertEqual(response.data['unread_count'], 1)
+        response = self.client.post(reverse('mark_notifications_read'), {}, format='json', **headers)
+        self.assertEqual(response.data['unread_count'], 0)
+
+        self.log_activity(self.scrum_master)
+        data, _queries = self.inbox(self.employee)
+        self.assertEqual(data['unread_count'], 1)
+        self.assertEqual([item['read'] for item in data['items']], [False, True, True])
+        self.assertEqual(data['items'][-1]['id'], first.id)
+
+    def test_due_soon_entries_show_a_current_eta(self):
+        from tasks.inbox import notify_due
+        Task.objects.filter(id=self.task.id).update(due_date=timezone.now() + timedelta(hours=30))
+        notify_due(Task.objects.filter(id=self.task.id), 'due_soon')
+        item = self.inbox(self.employee)[0]['items'][0]
+        self.assertEqual(item['type'], 'due_soon')
+        self.assertEqual(item['content'], 'Task "Write report" is due in 1d')
+
+
 class UserManagementAPITest(APITestCase):
     def setUp(self):
         self.scrum_master = User.objects.create_user(
@@ -3,6 +3,7 @@ import { Routes, Route, Navigate } from 'react-router-dom';
 import { useAuth } from './contexts/AuthContext';
 import { ThemeProvider } from './contexts/ThemeContext';
 import { TimeTrackingProvider } from './contexts/TimeTrackingContext';
+import { EventStreamProvider } from './contexts/EventStreamContext';
 import Layout from './components/Layout/Layout';
 import Login from './pages/Auth/Login';
 import Register from './pages/Auth/Register';
@@ -39,21 +40,23 @@ function App() {
   return (
     <ThemeProvider>
       <TimeTrackingProvider>
-        <Layout>
-          <Routes>
-            <Route path="/" element={<Navigate to="/dashboard" replace />} />
-            <Route path="/dashboard" element={<Dashboard />} />
-            <Route path="/tasks" element={<Tasks />} />
-            <Route path="/tasks/:id" element={<TaskDetail />} />
-            <Route path="/kanban" element={<Kanban />} />
-            <Route path="/projects" element={<Projects />} />
-            {user?.role === 'scrum_master' && (
-              <Route path="/users" element={<Users />} />
-            )}
-            <Route path="/profile" element={<Profile />} />
-            <Route path="*" element={<Navigate to="/dashboard" replace />} />
-          </Routes>
-        </Layout>
+        <EventStreamProvider>
+          <Layout>
+            <Routes>
+              <Route path="/" element={<Navigate to="/dashboard" replace />} />
+              <Route path="/dashboard" element={<Dashboard />} />
+              <Route path="/tasks" element={<Tasks />} />
+              <Route path="/tasks/:id" element={<TaskDetail />} />
+              <Route path="/kanban" element={<Kanban />} />
+              <Route path="/projects" element={<Projects />} />
+              {user?.role === 'scrum_master' && (
+                <Route path="/users" element={<Users />} />
+              )}
+              <Route path="/profile" element={<Profile />} />
+              <Route path="*" element={<Navigate to="/dashboard" replace />} />
+            </Routes>
+          </Layout>
+        </EventStreamProvider>
       </TimeTrackingProvider>
     </ThemeProvider>
   );
@@ -1,9 +1,10 @@
 import React, { useMemo, useState } from 'react';
-import { useQuery } from 'react-query';
+import { useQuery, useQueryClient } from 'react-query';
 import { tasksAPI, projectsAPI, authAPI } from '../../services/api';
 import { Link, useLocation } from 'react-router-dom';
 import { useAuth } from '../../contexts/AuthContext';
 import { useTheme } from '../../contexts/ThemeContext';
+import { useEventStream } from '../../contexts/EventStreamContext';
 import {
   LayoutDashboard,
   CheckSquare,
@@ -40,12 +41,25 @@ const Layout = ({ children }) => {
   const [searchResults, setSearchResults] = useState([]);
   const [isSearching, setIsSearching] = useState(false);
 
+  const queryClient = useQueryClient();
+  const { connected: streamConnected } = useEventStream();
   const { data: notifResp } = useQuery(
     'notifications',
     tasksAPI.getNotifications,
-    { refetchInterval: 15000 }
+    // New inbox entries are pushed on the event stream; poll only while it is down
+    { refetchInterval: streamConnected ? false : 15000 }
   );
   const notificationsRaw = notifResp?.data?.items || notifResp?.items || [];
+  const unreadCount = notifResp?.data?.unread_count || 0;
+
+  const toggleNotifications = () => {
+    if (!showNotif && unreadCount > 0) {
+      tasksAPI.markNotificationsRead(notificationsRaw[0]?.notification_id)
+        .then(() => queryClient.invalidateQueries('notifications'))
+        .catch(() => {});
+    }
+    setShowNotif(!showNotif);
+  };
   const [clearedAt, setClearedAt] = useState(() => Number(window.localStorage.getItem('tf_cleared_at') || 0));
   const [clearedNotifications, setClearedNotifications] = useState(() => {
     const stored = window.localStorage.getItem('tf_cleared_notifications');
@@ -305,11 +319,11 @@ const Layout = ({ children }) => {
 
             {/* Notifications */}
             <div className="relative">
-              <button className={`relative ${isDarkMode ? 'text-gray-400 hover:text-gray-300' : 'text-gray-400 hover:text-gray-600'}`} onClick={() => setShowNotif(!showNotif)}>
+              <button className={`relative ${isDarkMode ? 'text-gray-400 hover:text-gray-300' : 'text-gray-400 hover:text-gray-600'}`} onClick={toggleNotifications}>
                 <Bell className="h-6 w-6" />
-                {notifications.length > 0 && (
+                {unreadCount > 0 && (
                   <span className="absolute -top-1 -right-1 inline-flex items-center justify-center px-1.5 py-0.5 text-[10px] font-medium leading-none text-white bg-red-600 rounded-full">
-                    {Math.min(notifications.length, 9)}+
+                    {unreadCount > 9 ? '9+' : unreadCount}
                   </span>
                 )}
               </button>
@@ -347,12 +361,12 @@ const Layout = ({ children }) => {
                       </div>
                     ) : (
                       notifications.slice(0, 20).map((n) => (
-                        <div key={`${n.type}-${n.id}`} className={`group p-4 rounded-xl border transition-all duration-200 hover:shadow-md ${isDarkMode ? 'bg-gray-700 border-gray-600 hover:bg-gray-600' : 'bg-gray-50 border-gray-100 hover:bg-white'}`}>
+                        <div key={n.notification_id || `${n.type}-${n.id}`} className={`group p-4 rounded-xl border transition-all duration-200 hover:shadow-md ${isDarkMode ? 'bg-gray-700 border-gray-600 hover:bg-gray-600' : 'bg-gray-50 border-gray-100 hover:bg-white'}`}>
                           <div className="flex items-start justify-between">
                             <div className="flex-1 min-w-0">
                               <div className="flex items-center gap-2 mb-2">
-                                <span className={`px-2 py-1 rounded-full text-xs font-semibold ${n.type === 'activity' ? (isDarkMode ? 'bg-blue-600 text-blue-100' : 'bg-blue-100 text-blue-700') : (n.type === 'due_soon' ? (isDarkMode ? 'bg-yellow-600 text-yellow-100' : 'bg-yellow-100 text-yellow-700') : (isDarkMode ? 'bg-green-600 text-green-100' : 'bg-green-100 text-green-700'))}`}>
-                                  {n.type === 'activity' ? 'Activity' : (n.type === 'due_soon' ? 'Due Soon' : 'Message')}
+                                <span className={`px-2 py-1 rounded-full text-xs font-semibold ${n.type === 'activity' ? (isDarkMode ? 'bg-blue-600 text-blue-100' : 'bg-blue-100 text-blue-700') : (n.type === 'due_soon' ? (isDarkMode ? 'bg-yellow-600 text-yellow-100' : 'bg-yellow-100 text-yellow-700') : (n.type === 'overdue' ? (isDarkMode ? 'bg-red-600 text-red-100' : 'bg-red-100 text-red-700') : (isDarkMode ? 'bg-green-600 text-green-100' : 'bg-green-100 text-green-700')))}`}>
+                                  {n.type === 'activity' ? 'Activity' : (n.type === 'due_soon' ? 'Due Soon' : (n.type === 'overdue' ? 'Overdue' : 'Message'))}
                                 </span>
                                 <span className={`text-xs ${isDarkMode ? 'text-gray-400' : 'text-gray-500'}`}>
                                   {new Date(n.created_at).toLocaleDateString()} {new Date(n.created_at).toLocaleTimeString([], {hour: '2-digit', minute:'2-digit'})}
@@ -364,7 +378,7 @@ const Layout = ({ children }) => {
                                     <p className="font-medium line-clamp-2">{n.description}</p>
                                     {n.task_title && (<p className={`text-xs mt-1 ${isDarkMode ? 'text-gray-400' : 'text-gray-500'}`}>Task: {n.task_title}</p>)}
                                   </>
-                                ) : n.type === 'due_soon' ? (
+                                ) : (n.type === 'due_soon' || n.type === 'overdue') ? (
                                   <>
                                     <p className="font-medium line-clamp-2">{n.content}</p>
                                     {n.project_name && (<p className={`text-xs mt-1 ${isDarkMode ? 'text-gray-400' : 'text-gray-500'}`}>Project: {n.project_name}</p>)}
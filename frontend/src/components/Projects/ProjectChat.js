@@ -1,7 +1,7 @@
 import React, { useState, useEffect, useRef } from 'react';
 import { useMutation, useQuery, useQueryClient } from 'react-query';
 import { useAuth } from '../../contexts/AuthContext';
-import { projectsAPI } from '../../services/api';
+import { projectsAPI, projectChatSocketUrl } from '../../services/api';
 import Button from '../UI/Button';
 import Input from '../UI/Input';
 import { Send, MessageSquare, Users, Clock, Paperclip, Mic, Image, Video, FileText, X } from 'lucide-react';
@@ -21,17 +21,28 @@ const ProjectChat = ({ projectId, projectName }) => {
   const messagesEndRef = useRef(null);
   const typingTimeoutRef = useRef(null);
   const [timeTick, setTimeTick] = useState(Date.now());
+  const [socketOpen, setSocketOpen] = useState(false);
+
+  // Fetch the latest page once, then poll only for messages after the last one we have
+  const fetchMessages = async () => {
+    const cached = queryClient.getQueryData(['project-messages', projectId]) || [];
+    const lastId = cached.length ? cached[cached.length - 1].id : null;
+    const response = await projectsAPI.getProjectMessages(
+      projectId,
+      lastId ? { after_id: lastId } : { pagination: 'window' }
+    );
+    const results = response.data?.results || [];
+    if (!lastId) return results;
+    return results.length ? [...cached, ...results] : cached;
+  };
 
-  // Fetch project messages with real-time updates
   const { data: messagesResp, isLoading, error: messagesError } = useQuery(
     ['project-messages', projectId],
-    () => {
-      console.log('Fetching messages for project:', projectId);
-      return projectsAPI.getProjectMessages(projectId);
-    },
+    fetchMessages,
     {
       enabled: !!projectId,
-      refetchInterval: 2000, // Refresh every 2 seconds for real-time feel
+      // Messages are pushed while the socket is open; poll only as a fallback
+      refetchInterval: socketOpen ? false : 2000,
       onSuccess: (data) => {
         console.log('Messages fetched successfully:', data);
       },
@@ -42,6 +53,59 @@ const ProjectChat = ({ projectId, projectName }) => {
     }
   );
 
+  // Live updates: merge pushed messages into the cached list
+  useEffect(() => {
+    if (!projectId || typeof WebSocket === 'undefined') return undefined;
+    const queryKey = ['project-messages', projectId];
+    let socket;
+    let retryTimeout;
+    let closed = false;
+
+    const connect = async () => {
+      const url = await projectChatSocketUrl(projectId).catch(() => null);
+      if (closed) return;
+      if (!url) {
+        retryTimeout = setTimeout(connect, 5000);
+        return;
+      }
+      socket = new WebSocket(url);
+      socket.onopen = () => {
+        setSocketOpen(true);
+        // Catch up on anything posted while disconnected
+        queryClient.invalidateQueries(queryKey);
+      };
+      socket.onmessage = (event) => {
+        const data = JSON.parse(event.data);
+        if (data.type === 'resync') {
+          queryClient.invalidateQueries(queryKey);
+          return;
+        }
+        if (!data.message) return;
+        queryClient.setQueryData(queryKey, (cached = []) => {
+          const index = cached.findIndex((message) => message.id === data.message.id);
+          if (index === -1) return [...cached, data.message];
+          const next = [...cached];
+          next[index] = data.message;
+          return next;
+        });
+      };
+      socket.onclose = (event) => {
+        setSocketOpen(false);
+        // 4401/4403: not allowed to follow this chat, so stay on polling
+        if (!closed && event.code !== 4401 && event.code !== 4403) {
+          retryTimeout = setTimeout(connect, 5000);
+        }
+      };
+    };
+
+    connect();
+    return () => {
+      closed = true;
+      clearTimeout(retryTimeout);
+      socket?.close();
+    };
+  }, [projectId, queryClient]);
+
   // Send message mutation
   const sendMessageMutation = useMutation(
     (messageData) => projectsAPI.createProjectMessage(projectId, messageData),
@@ -79,12 +143,7 @@ const ProjectChat = ({ projectId, projectName }) => {
     return () => clearInterval(interval);
   }, []);
 
-  // Normalize response
-  const messages = Array.isArray(messagesResp)
-    ? messagesResp
-    : (Array.isArray(messagesResp?.data)
-        ? messagesResp.data
-        : (messagesResp?.data?.results || []));
+  const messages = messagesResp || [];
 
   const handleSendMessage = (e) => {
     e.preventDefault();
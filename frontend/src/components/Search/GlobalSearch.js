@@ -1,7 +1,14 @@
 import React, { useState, useEffect } from 'react';
 import { Search, X, FileText, Users, FolderOpen, Clock, CheckCircle } from 'lucide-react';
 import Card from '../UI/Card';
-import { tasksAPI, projectsAPI, authAPI } from '../../services/api';
+import { searchAPI } from '../../services/api';
+
+const RESULT_STYLES = {
+  task: { icon: CheckCircle, color: 'text-blue-600' },
+  project: { icon: FolderOpen, color: 'text-green-600' },
+  message: { icon: FileText, color: 'text-orange-600' },
+  user: { icon: Users, color: 'text-purple-600' }
+};
 
 const GlobalSearch = ({ isOpen, onClose, onSearch }) => {
   const [searchQuery, setSearchQuery] = useState('');
@@ -17,76 +24,13 @@ const GlobalSearch = ({ isOpen, onClose, onSearch }) => {
 
     setIsLoading(true);
     try {
-      // Search across different data sources
-      const searchPromises = [
-        tasksAPI.getTasks({ search: query }),
-        projectsAPI.getProjects({ search: query }),
-        authAPI.getEmployees({ search: query })
-      ];
-
-      const [tasksRes, projectsRes, employeesRes] = await Promise.allSettled(searchPromises);
-      
-      const results = [];
-      
-      // Process tasks
-      if (tasksRes.status === 'fulfilled' && tasksRes.value?.data) {
-        const tasks = Array.isArray(tasksRes.value.data) ? tasksRes.value.data : tasksRes.value.data.results || [];
-        tasks.forEach(task => {
-          if (task.title?.toLowerCase().includes(query.toLowerCase()) || 
-              task.description?.toLowerCase().includes(query.toLowerCase())) {
-            results.push({
-              type: 'task',
-              id: task.id,
-              title: task.title,
-              description: task.description,
-              status: task.status,
-              project: task.project_name,
-              icon: CheckCircle,
-              color: 'text-blue-600'
-            });
-          }
-        });
-      }
-
-      // Process projects
-      if (projectsRes.status === 'fulfilled' && projectsRes.value?.data) {
-        const projects = Array.isArray(projectsRes.value.data) ? projectsRes.value.data : projectsRes.value.data.results || [];
-        projects.forEach(project => {
-          if (project.name?.toLowerCase().includes(query.toLowerCase()) || 
-              project.description?.toLowerCase().includes(query.toLowerCase())) {
-            results.push({
-              type: 'project',
-              id: project.id,
-              title: project.name,
-              description: project.description,
-              status: project.status,
-              progress: project.progress_percentage,
-              icon: FolderOpen,
-              color: 'text-green-600'
-            });
-          }
-        });
-      }
-
-      // Process employees
-      if (employeesRes.status === 'fulfilled' && employeesRes.value?.data) {
-        const employees = Array.isArray(employeesRes.value.data) ? employeesRes.value.data : employeesRes.value.data.results || [];
-        employees.forEach(employee => {
-          if (employee.first_name?.toLowerCase().includes(query.toLowerCase()) || 
-              employee.last_name?.toLowerCase().includes(query.toLowerCase()) ||
-              employee.email?.toLowerCase().includes(query.toLowerCase())) {
-            results.push({
-              type: 'user',
-              id: employee.id,
-              title: `${employee.first_name} ${employee.last_name}`,
-              description: employee.role || 'Team Member',
-              email: employee.email,
-              icon: Users,
-              color: 'text-purple-600'
-            });
-          }
-        });
-      }
+      // One ranked, permission-aware request across tasks, projects, messages and users
+      const response = await searchAPI.search(query);
+      const results = (response.data?.results || []).map(result => ({
+        ...result,
+        key: `${result.type}-${result.id}`,
+        ...RESULT_STYLES[result.type]
+      }));
 
       setSearchResults(results);
     } catch (error) {
@@ -150,7 +94,7 @@ const GlobalSearch = ({ isOpen, onClose, onSearch }) => {
                 const Icon = result.icon;
                 return (
                   <div
-                    key={result.id}
+                    key={result.key}
                     onClick={() => handleResultClick(result)}
                     className="flex items-center gap-3 p-3 hover:bg-gray-50 rounded-lg cursor-pointer transition-colors"
                   >
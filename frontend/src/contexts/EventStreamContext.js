@@ -0,0 +1,78 @@
+import React, { createContext, useContext, useEffect, useState } from 'react';
+import { useQueryClient } from 'react-query';
+import { eventStreamUrl } from '../services/api';
+
+const EventStreamContext = createContext({ connected: false });
+
+// Queries whose data changes when a task, its assignees, its activity or the inbox change
+const TASK_QUERIES = [
+  'tasks', 'task', 'taskAnalytics', 'kanbanTasks', 'projectTasks', 'project-tasks',
+  'projects', 'smProjects', 'assignedProjects', 'project-analytics',
+  'employeeProjectAnalytics', 'scrumMasterProjectAnalytics', 'notifications',
+];
+const EVENT_TYPES = [
+  'task.created', 'task.updated', 'task.assignment', 'activity.created', 'task.due_soon', 'task.overdue', 'notification.created',
+  'resync',
+];
+// Wait before reconnecting after the stream drops or a ticket cannot be had
+const RECONNECT_DELAY_MS = 3000;
+
+export const useEventStream = () => useContext(EventStreamContext);
+
+export const EventStreamProvider = ({ children }) => {
+  const queryClient = useQueryClient();
+  const [connected, setConnected] = useState(false);
+
+  useEffect(() => {
+    if (typeof EventSource === 'undefined') return undefined;
+    let source;
+    let closed = false;
+    let lastEventId = null;
+    let refreshTimeout;
+    let reconnectTimeout;
+
+    // Coalesce bursts (bulk status changes) into one refetch
+    const refresh = (event) => {
+      if (event.lastEventId) lastEventId = event.lastEventId;
+      clearTimeout(refreshTimeout);
+      refreshTimeout = setTimeout(() => {
+        TASK_QUERIES.forEach((key) => queryClient.invalidateQueries(key));
+      }, 500);
+    };
+
+    // Each connection needs a fresh single-use ticket, so reconnect here rather than
+    // letting the browser retry the spent URL; last_event_id replays what was missed
+    const connect = async () => {
+      const url = await eventStreamUrl(lastEventId).catch(() => null);
+      if (closed) return;
+      if (!url) {
+        reconnectTimeout = setTimeout(connect, RECONNECT_DELAY_MS);
+        return;
+      }
+      source = new EventSource(url);
+      source.onopen = () => setConnected(true);
+      source.onerror = () => {
+        source.close();
+        setConnected(false);
+        clearTimeout(reconnectTimeout);
+        reconnectTimeout = setTimeout(connect, RECONNECT_DELAY_MS);
+      };
+      EVENT_TYPES.forEach((type) => source.addEventListener(type, refresh));
+    };
+    connect();
+
+    return () => {
+      closed = true;
+      clearTimeout(refreshTimeout);
+      clearTimeout(reconnectTimeout);
+      if (source) source.close();
+      setConnected(false);
+    };
+  }, [queryClient]);
+
+  return (
+    <EventStreamContext.Provider value={{ connected }}>
+      {children}
+    </EventStreamContext.Provider>
+  );
+};
@@ -1,6 +1,7 @@
 import React, { useState } from 'react';
 import { useQuery } from 'react-query';
 import { useAuth } from '../../contexts/AuthContext';
+import { useEventStream } from '../../contexts/EventStreamContext';
 import { tasksAPI, projectsAPI } from '../../services/api';
 import Card from '../../components/UI/Card';
 import Badge from '../../components/UI/Badge';
@@ -46,6 +47,9 @@ ChartJS.register(
 
 const Dashboard = () => {
   const { user } = useAuth();
+  // Task changes are pushed while the event stream is connected; poll only as a fallback
+  const { connected: streamConnected } = useEventStream();
+  const fallbackInterval = streamConnected ? false : 30000;
 
   const [selectedProjectId, setSelectedProjectId] = useState('');
   const [showAnalytics, setShowAnalytics] = useState(false);
@@ -57,7 +61,7 @@ const Dashboard = () => {
     projectsAPI.getProjects,
     { 
       enabled: user?.role === 'scrum_master',
-      refetchInterval: 30000, // Refetch every 30 seconds
+      refetchInterval: fallbackInterval,
       onSuccess: (data) => {
         console.log('Scrum Master Projects Data:', data);
       }
@@ -70,7 +74,7 @@ const Dashboard = () => {
     projectsAPI.getAssignedProjects,
     { 
       enabled: user?.role === 'employee',
-      refetchInterval: 30000, // Refetch every 30 seconds
+      refetchInterval: fallbackInterval,
       onSuccess: (data) => {
         console.log('Employee Assigned Projects Data:', data);
       }
@@ -88,7 +92,7 @@ const Dashboard = () => {
       return data;
     },
     { 
-      refetchInterval: 30000, 
+      refetchInterval: fallbackInterval,
       retry: false,
       onSuccess: (data) => {
         console.log('Analytics query success:', data);
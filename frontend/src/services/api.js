@@ -104,6 +104,7 @@ export const tasksAPI = {
   createTaskComment: (taskId, commentData) => api.post(`/tasks/${taskId}/comments/`, commentData),
   getTaskAnalytics: () => api.get('/tasks/analytics/'),
   getNotifications: () => api.get('/tasks/notifications/'),
+  markNotificationsRead: (upTo) => api.post('/tasks/notifications/read/', upTo ? { up_to: upTo } : {}),
   getKanbanTasks: (projectId) => api.get('/tasks/kanban/', { params: cleanParams({ project: projectId }) }),
   updateTaskStatus: (taskId, status) => api.patch(`/tasks/${taskId}/status/`, { status }),
 };
@@ -119,16 +120,39 @@ export const projectsAPI = {
   deleteProject: (id) => api.delete(`/projects/${id}/`),
   getProjectAnalytics: (projectId) => api.get(`/projects/${projectId}/analytics/`),
   getProjectMemberPerformance: (projectId) => api.get(`/projects/${projectId}/member-performance/`),
+  getProjectStatusHistory: (projectId, params) => api.get(`/projects/${projectId}/status-history/`, { params: cleanParams(params) }),
   getProjectMembers: (projectId) => api.get(`/projects/${projectId}/members/`),
   addProjectMember: (projectId, memberData) => api.post(`/projects/${projectId}/members/`, memberData),
   removeProjectMember: (projectId, memberId) => api.delete(`/projects/${projectId}/members/${memberId}/`),
-  getProjectMessages: (projectId) => api.get(`/projects/${projectId}/messages/`),
+  getProjectMessages: (projectId, params) => api.get(`/projects/${projectId}/messages/`, { params: cleanParams(params) }),
   createProjectMessage: (projectId, messageData) => {
     console.log('API: Creating project message', { projectId, messageData });
     return api.post(`/projects/${projectId}/messages/`, messageData);
   },
 };
 
+// Single-use ticket for one stream or socket connection, so the access token stays out of URLs
+const getStreamTicket = () => api.post('/stream/ticket/').then((response) => response.data.ticket);
+
+// WebSocket URL for a project's live chat (same host as the API; a new URL per connection)
+export const projectChatSocketUrl = async (projectId) => {
+  const base = API_BASE_URL.replace(/^http/, 'ws').replace(/\/api\/?$/, '');
+  const ticket = await getStreamTicket();
+  return `${base}/ws/projects/${projectId}/chat/?ticket=${encodeURIComponent(ticket)}`;
+};
+
+// Server-Sent Events stream of task changes for the signed-in user (a new URL per connection)
+export const eventStreamUrl = async (lastEventId) => {
+  const params = new URLSearchParams({ ticket: await getStreamTicket() });
+  if (lastEventId) params.set('last_event_id', lastEventId);
+  return `${API_BASE_URL}/stream/?${params}`;
+};
+
+// Global search API
+export const searchAPI = {
+  search: (query, params) => api.get('/search/', { params: cleanParams({ q: query, ...params }) }),
+};
+
 // Time Tracking API
 export const timeTrackingAPI = {
   getTimeSessions: (params) => api.get('/time-tracking/sessions/', { params: cleanParams(params) }),